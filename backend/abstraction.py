@@ -0,0 +1,125 @@
+"""
+This module implements a level-of-detail abstraction of an event log, so that drawings of logs with hundreds of
+activities stay bounded in size and layout time.
+
+The most frequent activities are kept. The other activities are grouped into regions: the strongly connected
+components of the direct follows graph between them, so activities that loop into each other end up in the same
+region. Every region becomes one summary activity, and consecutive events of the same region are merged into one.
+If there are still more regions than the node budget allows, the least frequent regions are merged into a single
+remaining region. The Alpha and heuristic miner then run on the abstracted log, which has at most `budget` activities.
+
+A region can be expanded (drill-down): its activities are split again the same way, into at most `budget` kept
+activities and sub-regions, so every level of detail stays bounded.
+
+Example:
+    log, regions = abstraction.abstract(event_log, budget=30)
+    regions   --> {'region 1 (12 activities)': ['archive', 'check', ...], ...}
+    log, regions = abstraction.abstract(event_log, budget=30, expand=['region 1 (12 activities)'])   # region 1.1, ...
+"""
+
+import heuristic_miner as hm
+from event_store import VariantLog
+
+NODE_BUDGET = 40
+
+def _strongly_connected(nodes, edges):
+    """return the strongly connected components of a directed graph as a list of sets (iterative Tarjan)"""
+    successors = {n: [] for n in nodes}
+    for a, b in edges:
+        if a in successors and b in successors:
+            successors[a].append(b)
+    index, low, on_stack, stack, components = {}, {}, set(), [], []
+    for root in sorted(nodes):
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, i = work.pop()
+            if i == 0:
+                index[node] = low[node] = len(index)
+                stack.append(node)
+                on_stack.add(node)
+            recurse = False
+            for j in range(i, len(successors[node])):
+                succ = successors[node][j]
+                if succ not in index:
+                    work.append((node, j + 1))
+                    work.append((succ, 0))
+                    recurse = True
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+            if recurse:
+                continue
+            if low[node] == index[node]:
+                component = set()
+                while True:
+                    n = stack.pop()
+                    on_stack.discard(n)
+                    component.add(n)
+                    if n == node:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+    return components
+
+def _split(activities, counts, directFollows, budget, prefix=''):
+    """keep the most frequent activities and group the others into regions, return (kept, {region id: activities})"""
+    if len(activities) <= budget:
+        return set(activities), {}
+    ranked = sorted(activities, key=lambda t: (-counts[t], t))
+    kept = set(ranked[:budget // 2])
+    components = _strongly_connected(set(ranked[budget // 2:]), directFollows)
+    components.sort(key=lambda c: (-sum(counts[t] for t in c), min(c)))
+    # the least frequent regions are merged, so that kept activities + regions <= budget
+    slots = max(budget - len(kept), 1)
+    if len(components) > slots:
+        merged = set().union(*components[slots - 1:])
+        components = components[:slots - 1] + [merged]
+    return kept, {prefix + str(i + 1): sorted(c) for i, c in enumerate(components)}
+
+def _label(region_id, members):
+    return 'region {} ({} activities)'.format(region_id, len(members))
+
+def regions(event_log, budget=NODE_BUDGET, expand=()):
+    """return a dictionary of region label-activities pairs for the activities that are collapsed.
+    Empty if the log fits into the budget. The kept activities plus the regions are at most budget nodes.
+    expand: labels of regions to drill into, the activities of such a region are split again into at most budget
+    kept activities and sub-regions, e.g. 'region 2 (40 activities)' into 'region 2.1 (..)', 'region 2.2 (..)', ...
+    """
+    counts = hm.find_transitions(event_log)
+    directFollows = hm._direct_follows_of(event_log)
+    _, split = _split(list(counts), counts, directFollows, budget)
+    collapsed = {_label(i, members): (i, members) for i, members in split.items()}
+    expand = list(expand)
+    while True:
+        label = next((label for label in expand if label in collapsed), None)
+        if label is None:
+            break
+        expand.remove(label)
+        region_id, members = collapsed.pop(label)
+        _, split = _split(members, counts, directFollows, budget, region_id + '.')
+        collapsed.update({_label(i, sub): (i, sub) for i, sub in split.items()})
+    return {label: members for label, (_, members) in collapsed.items()}
+
+def abstract(event_log, budget=NODE_BUDGET, expand=()):
+    """return the abstracted event log (event_store.VariantLog) and the regions that were collapsed into one activity.
+    expand: labels of regions to drill into, see regions()
+    """
+    collapsed = regions(event_log, budget, expand)
+    if not collapsed:
+        return event_log, {}
+    label_of = {t: label for label, members in collapsed.items() for t in members}
+    variants = {}
+    for trace, freq in hm.traces(event_log).items():
+        abstracted = []
+        for t in trace:
+            label = label_of.get(t, t)
+            # consecutive events inside the same region become one summary event
+            if not (abstracted and label in collapsed and abstracted[-1] == label):
+                abstracted.append(label)
+        abstracted = tuple(abstracted)
+        variants[abstracted] = variants.get(abstracted, 0) + freq
+    return VariantLog(variants), collapsed
@@ -0,0 +1,68 @@
+"""
+This module implements a cheap pre-flight pass over a parsed event log, which estimates how expensive the
+heuristic miner will be before it runs.
+
+The causal net step enumerates the powerset of the ingoing and outgoing transitions of every activity
+(heuristic_miner.potential_bindings) and, for every binding with more than one transition, all permutations
+of it against every trace variant (_helper_*_binding_delete, *_binding_freq). For an activity with k
+successors that is sum_r C(k,r) * r! candidate strings per variant, which explodes for a large fan-out.
+estimate() computes this number from the direct follows graph in one pass over the log, decide() compares
+the estimate with configurable limits.
+"""
+
+from math import comb, factorial
+import heuristic_miner as hm
+
+# 'serialise_*': above this the causal net waits until the other costly causal nets are computed, one at a time
+# 'degrade_*': above this only the dependency graph is drawn, no causal net and bindings
+# 'reject_*': above this the job is refused
+DEFAULT_LIMITS = {
+    'serialise_binding_search': 10**6,
+    'degrade_binding_search': 10**8,
+    'reject_activities': 500,
+    'reject_variants': 100000,
+}
+
+def estimate(event_log):
+    """return a dictionary with the size of the log and the estimated binding search size. Example taken from L1.xes: \n
+    {events: 23, activities: 5, variants: 3, max_fan_in: 3, max_fan_out: 3, binding_search: 144}
+    """
+    trace = hm.traces(event_log)
+    directFollows = hm.direct_follows(trace)
+    fan_in, fan_out = {}, {}
+    for a, b in directFollows:
+        fan_out[a] = fan_out.get(a, 0) + 1
+        fan_in[b] = fan_in.get(b, 0) + 1
+    transitions = set(fan_in) | set(fan_out)
+    for t in trace:
+        transitions.update(t)
+    search = sum(_binding_candidates(k) for k in fan_in.values()) + sum(_binding_candidates(k) for k in fan_out.values())
+    return {
+        'events': sum(len(t) * trace[t] for t in trace),
+        'activities': len(transitions),
+        'variants': len(trace),
+        'max_fan_in': max(fan_in.values(), default=0),
+        'max_fan_out': max(fan_out.values(), default=0),
+        'binding_search': search * len(trace),
+    }
+
+def _binding_candidates(k):
+    """number of ordered candidate bindings of k transitions: sum over r of C(k,r) * r!"""
+    return sum(comb(k, r) * factorial(r) for r in range(1, k+1))
+
+def decide(cost, limits=None):
+    """return (decision, reason) where decision is one of 'accept', 'serialise', 'degrade' or 'reject'.
+    cost: result of estimate()
+    limits: dictionary overriding DEFAULT_LIMITS
+    """
+    limits = dict(DEFAULT_LIMITS, **(limits or {}))
+    if cost['activities'] > limits['reject_activities']:
+        return 'reject', 'the log has {} activities, at most {} are allowed'.format(cost['activities'], limits['reject_activities'])
+    if cost['variants'] > limits['reject_variants']:
+        return 'reject', 'the log has {} variants, at most {} are allowed'.format(cost['variants'], limits['reject_variants'])
+    if cost['binding_search'] > limits['degrade_binding_search']:
+        return 'degrade', 'the causal net would need about {:.1e} binding checks (max. fan-in {}, fan-out {}), only the dependency graph is drawn'.format(
+            cost['binding_search'], cost['max_fan_in'], cost['max_fan_out'])
+    if cost['binding_search'] > limits['serialise_binding_search']:
+        return 'serialise', 'the causal net needs about {:.1e} binding checks, it is computed after the other large causal nets'.format(cost['binding_search'])
+    return 'accept', ''
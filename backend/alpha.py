@@ -14,15 +14,18 @@ References
         IEEE Transactions on Knowledge and Data Engineering, vol.16, no. 9, 1128-1142, 2004. `DOI <https://doi.org/10.1109/TKDE.2004.47>`_.
 """
 
-import graphviz
-import pandas as pd
-import dataframe_image as dfi
+import graphviz, render_cache, metrics
+
+OUTPUT_DIRECTORY = '../frontend/static/output'
+# OUTPUT_DIRECTORY = 'frontend/static/output'   # for server
 
 # step_1
 def find_transitions(event_log):
     """return a set of transitions.
     event_log: 2D-array of transitions   
     """
+    if hasattr(event_log, 'transition_counts'):  # e.g. binary_log.BinaryLog counts by itself
+        return set(event_log.transition_counts())
     transitions = set()
     for case in event_log:
         for event in case:
@@ -35,6 +38,8 @@ def find_intial_transitions(event_log):
     """return a set of all initial transitions.
     event_log: 2D-array of transitions  
     """
+    if hasattr(event_log, 'start_counts'):
+        return set(event_log.start_counts())
     intial_transitions = set()
     for case in event_log:
         if case[0] not in intial_transitions:
@@ -46,6 +51,8 @@ def find_last_transitions(event_log):
     """return a set of all last transitions.
     event_log: 2D-array of transitions 
     """
+    if hasattr(event_log, 'end_counts'):
+        return set(event_log.end_counts())
     last_transitions = set()
     for case in event_log:
         if case[-1] not in last_transitions:
@@ -57,24 +64,23 @@ def find_AB_pairs(event_log):
     """return a list of AB-pairs, e.g. [({a},{b}), ({c},{d})].
     event_log: 2D-array of transitions 
     """
-    transitions = find_transitions(event_log)
     direct_follows = _direct_follows(event_log)
-    a = _simpify_choice(_choice(transitions, direct_follows))
-    b = a
     c = _causality(direct_follows)
-    last = find_last_transitions(event_log)
+    # choice is implicit, "no direct follow in either direction", so the candidates are only built along the causal
+    # edges: B is a choice set of successors of an activity, A a choice set of the common predecessors of B
+    successors, predecessors = {}, {}
+    for x, y in c:
+        successors.setdefault(x, set()).add(y)
+        predecessors.setdefault(y, set()).add(x)
+    targets = set()
+    for x in successors:
+        targets.update(_choice_sets(successors[x], direct_follows))
     pairs = []
-    for s1 in a:
-        for s2 in b:
-            not_Choice = 0
-            for i in s1:
-                for j in s2:
-                    if (i,j) not in c:
-                        not_Choice += 1   
-            if not_Choice == 0:
-                pairs.append((s1, s2))     
-    return pairs
-
+    for s2 in targets:
+        common = set.intersection(*(predecessors[j] for j in s2))
+        for s1 in _choice_sets(common, direct_follows):
+            pairs.append((set(s1), set(s2)))
+    return sorted(pairs, key=lambda p: (sorted(p[0]), sorted(p[1])))
 
 # ============ helpers for step_4 start ============ 
 
@@ -82,6 +88,8 @@ def _direct_follows(event_log):
     """return a set of direct-follow tuples, e.g. {(a,b)}.  
     event_log: 2D-array of transitions 
     """
+    if hasattr(event_log, 'direct_follows_counts'):
+        return set(event_log.direct_follows_counts())
     direct_follows = set()
     for case in event_log:
         for event_id in range(len(case)-1):
@@ -103,6 +111,7 @@ def _choice(transitions, direct_fllows):
     """return a set of choice tuples, e.g. {(a,b)}.
     transitions: set of transitions
     direct_follows: set of direct-follow tuples 
+    This set has up to n² tuples, find_AB_pairs uses _is_choice instead.
     """
     choice = set()
     for t in transitions:
@@ -112,6 +121,22 @@ def _choice(transitions, direct_fllows):
                 choice.add((l,t))
     return choice
 
+def _is_choice(direct_follows, t, l):
+    """return true if t # l, i.e. neither t > l nor l > t"""
+    return (t,l) not in direct_follows and (l,t) not in direct_follows
+
+def _choice_sets(transitions, direct_follows):
+    """return the sets of one or two transitions that are in choice with each other, as frozensets, e.g. {a} if not a > a.
+    The same sets as _simpify_choice(_choice(transitions, direct_follows)), without building _choice.
+    """
+    transitions = sorted(transitions)
+    sets = [frozenset([t]) for t in transitions if (t,t) not in direct_follows]
+    for i, t in enumerate(transitions):
+        for l in transitions[i+1:]:
+            if _is_choice(direct_follows, t, l):
+                sets.append(frozenset([t, l]))
+    return sets
+
 def _parallel(direct_fllows):
     """return a set of parallel tuples e.g. {(a,b)}.
     direct_follows: set of direct-follow tuples 
@@ -143,25 +168,17 @@ def delete_subsets(AB_pairs):
     AB_pairs: a list of AB-pairs
     Example: [({a}, {b}), ({a}, {b,e}), ({a}, {e})] --> [({a}, {b,e})]
     """
-    to_delete = [0]*len(AB_pairs) 
+    # a pair is not maximal if another pair with the same B has a larger A, or one with the same A has a larger B,
+    # so only the pairs sharing one side are compared
+    by_B, by_A = {}, {}
+    for p in AB_pairs:
+        by_B.setdefault(frozenset(p[1]), []).append(p[0])
+        by_A.setdefault(frozenset(p[0]), []).append(p[1])
     max_set = []
-    # find the to-delete minimal subset and mark 1 at its index   
     for p in AB_pairs:
-        for q in AB_pairs:
-            if p[1]==q[1]:
-                if p[0].issubset(q[0]) and len(p[0])<len(q[0]):
-                    to_delete[AB_pairs.index(p)] = 1
-                if q[0].issubset(p[0]) and len(p[0])>len(q[0]):
-                    to_delete[AB_pairs.index(q)] = 1
-            if p[0] == q[0]:
-                if p[1].issubset(q[1]) and len(p[1])<len(q[1]):
-                 to_delete[AB_pairs.index(p)] = 1   
-                if q[1].issubset(p[1]) and len(p[1])>len(q[1]):
-                 to_delete[AB_pairs.index(q)] = 1
-    # delete the subsets which is marked as 1
-    for i in range(len(to_delete)):
-        if to_delete[i]==0:
-            max_set.append(AB_pairs[i])
+        if any(p[0] < q for q in by_B[frozenset(p[1])]) or any(p[1] < q for q in by_A[frozenset(p[0])]):
+            continue
+        max_set.append(p)
     return max_set
 
 # Step_6
@@ -204,21 +221,34 @@ def add_flows(initial, last, AB_pairs_min, places):
     flows = []
     for i in initial:
         flows.append(('iL', i))
+    added = set()
     for i in range(len(AB_pairs_min)):
         for j in AB_pairs_min[i][0]:
             for k in AB_pairs_min[i][1]:
                 # the same arrow shouldn't be added twice
-                if (j, places[i]) not in flows:
-                    flows.append((j, places[i]))
-                if (places[i], k) not in flows:
-                    flows.append((places[i], k))
+                for flow in ((j, places[i]), (places[i], k)):
+                    if flow not in added:
+                        added.add(flow)
+                        flows.append(flow)
     for i in last:
         flows.append((i, 'oL'))
     return flows
 
 # step_8:
-def draw_petri_net(event_log):
-    """generate a Petri net as a png image."""
+def draw_petri_net(event_log, fmt='png', directory=OUTPUT_DIRECTORY):
+    """generate a Petri net as a png or svg image or as dot source in directory, return the path of the output file."""
+    g = petri_net_graph(event_log)
+    with metrics.stage('petri_net.render'):
+        return render_cache.export(g, directory, fmt)
+
+def petri_net_graph(event_log):
+    """discover the Petri net of the event log and return it as a graphviz graph, without rendering it"""
+    with metrics.stage('petri_net.discover'):
+        tran, places, flows = discover(event_log)
+    return _petri_net_digraph(tran, places, flows)
+
+def discover(event_log):
+    """run step_1 to step_7 and return the Petri net as (transitions, places, flows)"""
     tran = find_transitions(event_log)
     initial = find_intial_transitions(event_log)
     last = find_last_transitions(event_log)
@@ -226,13 +256,17 @@ def draw_petri_net(event_log):
     subSet = delete_subsets(pairs)
     places = add_places(subSet)
     flows = add_flows(initial,last,subSet,places)
-    petri_net(tran, places, flows)
+    return tran, places, flows
 
-def petri_net(transitions, places, flows):
+def petri_net(transitions, places, flows, fmt='png', directory=OUTPUT_DIRECTORY):
     """draw a Petri net using graphviz.
     places: list of places
     flows: list of flows (edges)
+    fmt: output format, 'png', 'svg' or 'dot' (see render_cache.export)
     """
+    return render_cache.export(_petri_net_digraph(transitions, places, flows), directory, fmt)
+
+def _petri_net_digraph(transitions, places, flows):
     g = graphviz.Digraph(format='png', filename='petri_net.gv')
     g.attr(rankdir = 'LR', height = '12', width='15',  nodesep = '0.8')
     # add rectangle nodes as transitions(activities)
@@ -259,8 +293,7 @@ def petri_net(transitions, places, flows):
         graph_label = graph_label[0: break_at] + '\n' + graph_label[break_at:]
     g.attr(overlap='false')
     g.attr(label='Places: '+ graph_label, fontsize='19' ) 
-    g.render(directory ='../frontend/static/output', view = False)
-    # g.render(directory ='frontend/static/output', view = False)   # for server
+    return g
 
 # help method to compare if two array are equal if order of elements is not considered
 def is_equal(actual, expected):
@@ -283,29 +316,28 @@ def is_equal(actual, expected):
     return not_in_expected == not_in_actual == 0
 
 # additional funtion
+def footprint_relation(direct_follows, row, column):
+    """return the footprint symbol of the pair (row, column): → causality, ← reversed causality, || parallel, # choice.
+    direct_follows: set of direct-follow tuples
+    """
+    forward = (row, column) in direct_follows
+    backward = (column, row) in direct_follows
+    if forward and not backward:
+        return '→'
+    if backward and not forward:
+        return '←'
+    return '||' if forward else '#'
+
 def footprint_matrix(event_log):
     """generare a footprint matrix for the user-uploaded event log"""
+    # pandas and dataframe_image (with matplotlib) take seconds to import, only load them when a png is wanted
+    import pandas as pd
+    import dataframe_image as dfi
     transitions = sorted(find_transitions(event_log))
     df = _direct_follows(event_log)
-    causality = _causality(df)
-    choice = _choice(transitions, df)
-    parallel = _parallel(df)
-    table =[]
-    for row in transitions:
-        r = []
-        for column in transitions:
-            if (row,column) in causality:
-                r.append('→')
-            elif (column,row) in causality:
-                r.append('←') 
-            elif (row,column) in choice:
-                r.append('#')
-            elif (row,column) in parallel:
-                r.append('||')
-        table.append(r)
+    table = [[footprint_relation(df, row, column) for column in transitions] for row in transitions]
     df = pd.DataFrame(table, columns=transitions, index=transitions)
     styles = [dict(selector="caption", props=[("text-align", "center"),("font-size", "15"),("color", 'dark')])]
     df = df.style.set_caption("The Footprint Matrix").set_table_styles(styles)
     dfi.export(df,"../frontend/static/output/footprint_matrix.png", table_conversion = 'matplotlib')
     # dfi.export(df,"frontend/static/output/footprint_matrix.png", table_conversion = 'matplotlib')  # for server
-    
\ No newline at end of file
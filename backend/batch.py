@@ -0,0 +1,191 @@
+"""
+This module mines many event logs in one go: every xes or csv file of a zip archive or a directory is mined with the
+Alpha or the heuristic miner in a process pool, and the models are written into one result bundle.
+json files are read as directly-follows graphs (see dfg.py) and mined without events.
+
+Bundle layout (a directory, or a zip file if the output path ends with .zip):
+    index.json              {algorithm, threshold_df, threshold_dm, format, seconds, ok, failed, files: [...]}
+    <log>/model.json        the mined model, see alpha_model and heuristic_model
+    <log>/petri_net.gv.png  optional image, or dependency_graph.gv.png, in the chosen format
+
+Every file is mined on its own, a file that cannot be parsed or mined is listed in the index with status 'error'
+and its error message, the others are not affected.
+An archive with more than max_members members, or whose logs unpack to more than max_size bytes, is refused with a
+ValueError before anything is extracted, so a small zip bomb cannot fill the disk.
+
+Example (from backend/):
+    python batch.py logs.zip results.zip --algorithm heuristic --threshold-df 2 --threshold-dm 0.5 --format svg
+"""
+
+import argparse, json, multiprocessing, os, shutil, sys, tempfile, time, zipfile
+from concurrent.futures import ProcessPoolExecutor
+import alpha, heuristic_miner as hm, import_xes, dfg
+
+ALGORITHMS = ('alpha', 'heuristic')
+EXTENSIONS = ('.xes', '.csv', '.json')
+# limits of an archive, the app passes smaller ones derived from its upload limit
+MAX_MEMBERS = 10000
+MAX_SIZE = 1024**3  # 1G unpacked
+
+def read(path):
+    """parse a xes or csv file into an event log, or read a json file as a directly-follows graph"""
+    if path.lower().endswith('.json'):
+        return dfg.read_json(path)
+    if path.lower().endswith('.csv'):
+        return import_xes.importer().read_csv(path)
+    return import_xes.importer().read_xes(path)
+
+def alpha_model(event_log):
+    """return the Petri net of the Alpha miner as a json-serializable dictionary"""
+    transitions, places, flows = alpha.discover(event_log)
+    return {'algorithm': 'alpha', 'transitions': sorted(transitions), 'places': places, 'flows': [list(f) for f in flows]}
+
+def heuristic_model(event_log, threshold_df=0, threshold_dm=0.0):
+    """return the dependency graph of the heuristic miner as a json-serializable dictionary, edges filtered by the thresholds"""
+    transitions = hm.find_transitions(event_log)
+    directFollows = hm._direct_follows_of(event_log)
+    dm = hm.denpendency_measure(event_log)
+    edges = [{'source': a, 'target': b, 'frequency': directFollows[(a, b)], 'dependency': dm[(a, b)]}
+             for a, b in sorted(directFollows) if directFollows[(a, b)] >= threshold_df and dm[(a, b)] >= threshold_dm]
+    return {'algorithm': 'heuristic', 'transitions': dict(sorted(transitions.items())), 'edges': edges}
+
+def mine_file(path, directory, algorithm='alpha', threshold_df=0, threshold_dm=0.0, fmt=None):
+    """mine one file and write its model (and image if fmt is 'png', 'svg' or 'dot') into directory.
+    Return its entry of the index, errors are reported in the entry instead of being raised.
+    """
+    entry = {'file': os.path.basename(path), 'directory': os.path.basename(directory), 'status': 'ok'}
+    start = time.perf_counter()
+    try:
+        event_log = read(path)
+        transitions = hm.find_transitions(event_log)
+        cases = sum(event_log.start_counts().values()) if hasattr(event_log, 'start_counts') else len(event_log)
+        entry.update(cases=cases, events=sum(transitions.values()), activities=len(transitions))
+        os.makedirs(directory, exist_ok=True)
+        if algorithm == 'alpha':
+            model = alpha_model(event_log)
+        else:
+            model = heuristic_model(event_log, threshold_df, threshold_dm)
+        with open(os.path.join(directory, 'model.json'), 'w') as f:
+            json.dump(model, f, indent=1)
+        entry['model'] = entry['directory'] + '/model.json'
+        if fmt:
+            if algorithm == 'alpha':
+                image = alpha.draw_petri_net(event_log, fmt, directory)
+            else:
+                image = hm.draw_denpendencyGraph(event_log, threshold_df, threshold_dm, fmt, directory=directory)
+            entry['image'] = entry['directory'] + '/' + os.path.basename(image)
+    except Exception as e:
+        entry.update(status='error', error='{}: {}'.format(type(e).__name__, e))
+    entry['seconds'] = time.perf_counter() - start
+    return entry
+
+def log_files(source, directory, max_members=MAX_MEMBERS, max_size=MAX_SIZE):
+    """return the paths of the xes/csv/json files of a directory or zip archive, members of an archive are extracted to directory.
+    Raise a ValueError if the archive has more than max_members members or its logs unpack to more than max_size bytes.
+    """
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, f) for f in os.listdir(source) if f.lower().endswith(EXTENSIONS))
+    paths = []
+    with zipfile.ZipFile(source) as archive:
+        members = archive.infolist()
+        if len(members) > max_members:
+            raise ValueError('the archive has {} members, at most {} are allowed'.format(len(members), max_members))
+        logs = [m for m in members if not m.is_dir() and os.path.basename(m.filename).lower().endswith(EXTENSIONS)]
+        # zipfile stops reading a member at its declared size, so the sum of the declared sizes bounds the extraction
+        size = sum(m.file_size for m in logs)
+        if size > max_size:
+            raise ValueError('the logs of the archive unpack to {} bytes, at most {} are allowed'.format(size, max_size))
+        for member in logs:
+            name = os.path.basename(member.filename)
+            # only the file name is used, so no member is written outside directory, one folder per member keeps equal names apart
+            folder = os.path.join(directory, str(len(paths)))
+            os.makedirs(folder)
+            path = os.path.join(folder, name)
+            with archive.open(member) as src, open(path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            paths.append(path)
+    return paths
+
+def _bundle_names(paths):
+    """return one directory name per file, unique even if two files share their name"""
+    names, used = [], set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, i = stem, 1
+        while name in used:
+            i += 1
+            name = '{}-{}'.format(stem, i)
+        used.add(name)
+        names.append(name)
+    return names
+
+def run(source, output, algorithm='alpha', threshold_df=0, threshold_dm=0.0, fmt=None, processes=None,
+        max_members=MAX_MEMBERS, max_size=MAX_SIZE):
+    """mine every xes/csv/json file of source (a directory or zip archive) and write the bundle to output
+    (a directory, or a zip file if output ends with .zip). Return the index.
+    processes: size of the process pool, None uses all cores, 1 mines in the calling process
+    max_members, max_size: limits of a zip archive, see log_files
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError('unknown algorithm: ' + str(algorithm))
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as work:
+        extracted = os.path.join(work, 'logs')
+        os.makedirs(extracted)
+        bundle = os.path.join(work, 'bundle') if output.lower().endswith('.zip') else output
+        os.makedirs(bundle, exist_ok=True)
+        paths = log_files(source, extracted, max_members, max_size)
+        directories = [os.path.join(bundle, name) for name in _bundle_names(paths)]
+        arguments = [(p, d, algorithm, threshold_df, threshold_dm, fmt) for p, d in zip(paths, directories)]
+        if processes == 1:
+            files = [mine_file(*a) for a in arguments]
+        else:
+            # spawn, not fork: the app calls this from a request thread, a forked child could inherit a lock held by
+            # another thread (logging, the render pool, sqlite) and hang forever
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = [pool.submit(mine_file, *a) for a in arguments]
+                files = []
+                for a, future in zip(arguments, futures):
+                    try:
+                        files.append(future.result())
+                    except Exception as e:  # the worker died, e.g. out of memory
+                        files.append({'file': os.path.basename(a[0]), 'status': 'error', 'error': '{}: {}'.format(type(e).__name__, e)})
+        index = {
+            'algorithm': algorithm,
+            'threshold_df': threshold_df,
+            'threshold_dm': threshold_dm,
+            'format': fmt,
+            'seconds': time.perf_counter() - start,
+            'ok': sum(1 for f in files if f['status'] == 'ok'),
+            'failed': sum(1 for f in files if f['status'] != 'ok'),
+            'files': files,
+        }
+        with open(os.path.join(bundle, 'index.json'), 'w') as f:
+            json.dump(index, f, indent=1)
+        if bundle != output:
+            with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for root, _, names in os.walk(bundle):
+                    for name in names:
+                        path = os.path.join(root, name)
+                        archive.write(path, os.path.relpath(path, bundle))
+    return index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='mine every xes/csv/json file of a directory or zip archive')
+    parser.add_argument('source', help='directory or zip archive of xes/csv files and json DFGs')
+    parser.add_argument('output', help='bundle directory, or a zip file if it ends with .zip')
+    parser.add_argument('--algorithm', choices=ALGORITHMS, default='alpha')
+    parser.add_argument('--threshold-df', type=int, default=0)
+    parser.add_argument('--threshold-dm', type=float, default=0.0)
+    parser.add_argument('--format', choices=('png', 'svg', 'dot'), help='also draw every model in this format')
+    parser.add_argument('--processes', type=int, help='size of the process pool, all cores by default')
+    args = parser.parse_args(argv)
+    index = run(args.source, args.output, args.algorithm, args.threshold_df, args.threshold_dm, args.format, args.processes)
+    print('{} mined, {} failed in {:.1f}s'.format(index['ok'], index['failed'], index['seconds']))
+    for entry in index['files']:
+        if entry['status'] != 'ok':
+            print('{}: {}'.format(entry['file'], entry['error']))
+    return 1 if index['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+This module benchmarks both miners on synthetic event logs.
+
+generate() builds a seeded random log: the activities are split into blocks of `width` activities that run
+concurrently (every activity of a block once, in random order), the blocks are executed one after another until a
+trace has `length` events, wrapping around to the first block. After each block the trace repeats it with probability
+`loop`, and every event is dropped, duplicated or replaced by a random activity with probability `noise`.
+
+run() times every stage of the miners separately, on inputs prepared beforehand, so a stage is measured on its own:
+the best of `repeat` wall-clock times and the peak of the memory allocated during one more run (tracemalloc).
+The renders write to a temporary folder, with an empty render cache and layout cache every time. They are png by default,
+so graphviz lays out and rasterises every graph; with the dot format only the source is written and graphviz never runs.
+Results are plain json, compare() reports the stages that got slower than a stored baseline of the same format.
+
+Example (from backend/):
+    python benchmark.py --traces 100 1000 --output results.json --baseline benchmark_baseline.json
+    python benchmark.py --traces 100 1000 --output benchmark_baseline.json   # store a new baseline
+"""
+
+import argparse, json, os, platform, random, sys, tempfile, time, tracemalloc
+from datetime import datetime, timedelta, timezone
+from xml.sax.saxutils import quoteattr
+import alpha, heuristic_miner as hm, import_xes, layout, render_cache
+
+VERSION = 1
+# the causal net's bindings are power sets of the inputs and outputs of an activity, so noise makes them explode
+DEFAULTS = dict(activities=12, traces=1000, length=12, width=3, loop=0.1, noise=0.0, seed=0)
+# a stage is a regression once it takes more than (1 + TOLERANCE) times its baseline
+TOLERANCE = 0.5
+# and more than MIN_SECONDS slower, the times of the fastest stages are mostly noise
+MIN_SECONDS = 0.001
+
+def generate(activities=12, traces=1000, length=12, width=3, loop=0.1, noise=0.0, seed=0):
+    """return a synthetic event log as a 2D-array of transitions, the same for the same arguments"""
+    rng = random.Random(seed)
+    names = ['a{}'.format(i) for i in range(activities)]
+    blocks = [names[i:i + width] for i in range(0, activities, width)]
+    event_log = []
+    for _ in range(traces):
+        trace, block = [], 0
+        while len(trace) < length:
+            events = rng.sample(blocks[block], len(blocks[block]))
+            trace.extend(events)
+            if rng.random() < loop:
+                trace.extend(rng.sample(blocks[block], len(blocks[block])))
+            block = (block + 1) % len(blocks)
+        event_log.append(_noise(trace[:length], names, noise, rng))
+    return event_log
+
+def _noise(trace, names, noise, rng):
+    noisy = []
+    for event in trace:
+        if rng.random() >= noise:
+            noisy.append(event)
+            continue
+        kind = rng.randrange(3)
+        if kind == 1:
+            noisy.extend((event, event))
+        elif kind == 2:
+            noisy.append(rng.choice(names))
+    return noisy
+
+def write_xes(event_log, path):
+    """write the event log as a minimal xes file with concept:name and one timestamp per second"""
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8" ?>\n<log xes.version="1.0" xmlns="http://www.xes-standard.org/">\n')
+        for case, trace in enumerate(event_log):
+            f.write('<trace><string key="concept:name" value="{}"/>\n'.format(case))
+            for i, event in enumerate(trace):
+                time_stamp = (start + timedelta(seconds=i)).isoformat()
+                f.write('<event><string key="concept:name" value={}/><date key="time:timestamp" value="{}"/></event>\n'
+                        .format(quoteattr(event), time_stamp))
+            f.write('</trace>\n')
+        f.write('</log>\n')
+
+def _fresh_render_caches(directory):
+    render_cache._cache = render_cache.RenderCache(directory, max_entries=0)
+    layout._layouts.clear()
+
+def _prepare(function, *args):
+    # a failing input is kept as its exception, the stages depending on it report the same error
+    try:
+        return function(*args)
+    except Exception as e:
+        return e
+
+def _prepared(value):
+    if isinstance(value, Exception):
+        raise value
+    return value
+
+def stages(event_log, xes_path, fmt, cache_directory, output_directory):
+    """return the benchmarked stages as a list of (name, function without arguments), inputs are prepared here.
+    The renders write their outputs to output_directory.
+    """
+    trace = hm.traces(event_log)
+    pairs = alpha.find_AB_pairs(event_log)
+    directFollows = hm.direct_follows(trace)
+    input_bind = _prepare(hm.input_binding, event_log)
+    output_bind = _prepare(hm.output_binding, event_log)
+
+    def render(draw):
+        def stage():
+            _fresh_render_caches(cache_directory)
+            return draw(event_log, fmt=fmt, directory=output_directory)
+        return stage
+
+    return [
+        ('read_xes', lambda: import_xes.importer().read_xes(xes_path)),
+        ('find_AB_pairs', lambda: alpha.find_AB_pairs(event_log)),
+        ('delete_subsets', lambda: alpha.delete_subsets(pairs)),
+        ('direct_follows', lambda: hm.direct_follows(hm.traces(event_log))),
+        ('denpendency_measure', lambda: hm.denpendency_measure(event_log)),
+        ('input_binding', lambda: hm.input_binding(event_log)),
+        ('output_binding', lambda: hm.output_binding(event_log)),
+        ('in_binding_freq', lambda: hm.in_binding_freq(trace, _prepared(input_bind), directFollows)),
+        ('out_binding_freq', lambda: hm.out_binding_freq(trace, _prepared(output_bind), directFollows)),
+        ('render_petri_net', render(alpha.draw_petri_net)),
+        ('render_dependency_graph', render(hm.draw_denpendencyGraph)),
+        ('render_cnet', render(hm.draw_cnet)),
+    ]
+
+def measure(function, repeat=3):
+    """return {seconds: best wall-clock time of repeat runs, peak_bytes: peak memory of one run},
+    or {error: message} if the stage fails (e.g. png/svg renders without the graphviz binary)
+    """
+    try:
+        seconds = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            seconds = min(seconds, time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        return {'error': '{}: {}'.format(type(e).__name__, e)}
+    return {'seconds': seconds, 'peak_bytes': peak}
+
+def run(sizes=(100, 1000), repeat=3, fmt='png', **generator):
+    """benchmark every stage on a synthetic log per number of traces in sizes, return the results as a dictionary"""
+    config = dict(DEFAULTS, **generator)
+    config.pop('traces')
+    runs = []
+    with tempfile.TemporaryDirectory() as directory:
+        saved = render_cache._cache
+        try:
+            for traces in sizes:
+                event_log = generate(traces=traces, **config)
+                xes_path = os.path.join(directory, 'synthetic.xes')
+                write_xes(event_log, xes_path)
+                results = {name: measure(f, repeat) for name, f in stages(event_log, xes_path, fmt, os.path.join(directory, 'cache'),
+                                                                          os.path.join(directory, 'output'))}
+                runs.append({'traces': traces, 'events': sum(len(t) for t in event_log), 'stages': results})
+        finally:
+            render_cache._cache = saved
+    return {'version': VERSION, 'python': platform.python_version(), 'config': dict(config, repeat=repeat, format=fmt), 'runs': runs}
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """return the regressions of results against baseline: [{traces, stage, seconds, baseline, ratio}].
+    Runs are matched by their number of traces, stages without time in either of them are skipped.
+    Raise a ValueError if the renders of results and baseline have different formats.
+    """
+    formats = results.get('config', {}).get('format'), baseline.get('config', {}).get('format')
+    if formats[0] != formats[1]:
+        raise ValueError('the results are rendered as {} and the baseline as {}'.format(*formats))
+    regressions = []
+    before = {r['traces']: r['stages'] for r in baseline['runs']}
+    for r in results['runs']:
+        for stage, value in r['stages'].items():
+            old = before.get(r['traces'], {}).get(stage, {})
+            if 'seconds' not in value or not old.get('seconds'):
+                continue
+            ratio = value['seconds'] / old['seconds']
+            if ratio > 1 + tolerance and value['seconds'] - old['seconds'] > MIN_SECONDS:
+                regressions.append({'traces': r['traces'], 'stage': stage, 'seconds': value['seconds'],
+                                    'baseline': old['seconds'], 'ratio': ratio})
+    return regressions
+
+def table(results):
+    """return the results as a text table, one row per stage and one column per size, to see how the stages scale"""
+    runs = results['runs']
+    lines = ['{:<26}'.format('stage / traces') + ''.join('{:>12}'.format(r['traces']) for r in runs)]
+    for stage in (runs[0]['stages'] if runs else {}):
+        cells = []
+        for r in runs:
+            value = r['stages'][stage]
+            cells.append('{:>11.4f}s'.format(value['seconds']) if 'seconds' in value else '{:>12}'.format('error'))
+        lines.append('{:<26}'.format(stage) + ''.join(cells))
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='benchmark the Alpha and heuristic miner on synthetic event logs')
+    parser.add_argument('--traces', type=int, nargs='+', default=[100, 1000], help='numbers of traces, one log per number')
+    for name in ('activities', 'length', 'width', 'seed'):
+        parser.add_argument('--' + name, type=int, default=DEFAULTS[name])
+    for name in ('loop', 'noise'):
+        parser.add_argument('--' + name, type=float, default=DEFAULTS[name])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--format', default='png', choices=render_cache.FORMATS, help='output format of the renders')
+    parser.add_argument('--output', help='write the results as json to this file')
+    parser.add_argument('--baseline', help='compare against the results in this json file')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+    results = run(args.traces, args.repeat, args.format, activities=args.activities, length=args.length, width=args.width,
+                  loop=args.loop, noise=args.noise, seed=args.seed)
+    print(table(results))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare(results, baseline, args.tolerance)
+        except ValueError as e:
+            parser.error(str(e))
+        for r in regressions:
+            print('regression: {stage} with {traces} traces took {seconds:.4f}s, baseline {baseline:.4f}s ({ratio:.2f}x)'.format(**r))
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
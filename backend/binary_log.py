@@ -0,0 +1,162 @@
+"""
+This module implements a compact binary format for parsed event logs, so that a log is parsed only once
+and then opened by any number of worker processes with memory mapping (zero copy, near-instant open).
+
+A log is stored column-wise: an activity table plus an int32 code per event and an int32 offset per case,
+optionally followed by one float64 timestamp (seconds since epoch) per event. File layout:
+
+    b'PMLOG001'                  magic
+    uint64                       length of the json header
+    json header                  {"activities": [...], "events": n, "cases": m, "timestamps": true/false}
+    padding to 8 bytes
+    int32 codes[n]               index into activities for every event
+    int32 offsets[m+1]           case k consists of codes[offsets[k]:offsets[k+1]]
+    padding to 8 bytes
+    float64 timestamps[n]        only if "timestamps" is true
+
+A BinaryLog iterates like the usual 2D-array of transitions, so every function of alpha.py and
+heuristic_miner.py accepts it. Besides, it offers the counting methods transition_counts, start_counts,
+end_counts, direct_follows_counts and variants, which both miners use instead of walking the events in Python.
+
+Example:
+    binary_log.convert("test_files/L4.xes", "L4.pmlog")   # once
+    log = binary_log.open_log("L4.pmlog")                 # in every worker
+    alpha.draw_petri_net(log)
+"""
+
+import json, struct
+import numpy as np
+import import_xes
+
+MAGIC = b'PMLOG001'
+
+class BinaryLog:
+    """columnar event log, the arrays may be numpy memmaps"""
+    def __init__(self, activities, codes, offsets, timestamps=None):
+        self.activities = list(activities)
+        self.codes = codes
+        self.offsets = offsets
+        self.timestamps = timestamps
+        self._variants = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, case):
+        if case < 0:
+            case += len(self)
+        return [self.activities[c] for c in self.codes[self.offsets[case]:self.offsets[case+1]].tolist()]
+
+    def __iter__(self):
+        for case in range(len(self)):
+            yield self[case]
+
+    def transition_counts(self):
+        """return a dictionary of transition-frequency pairs, like heuristic_miner.find_transitions"""
+        counts = np.bincount(self.codes, minlength=len(self.activities))
+        return {self.activities[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def start_counts(self):
+        """return a dictionary of first transition-frequency pairs over all non-empty cases"""
+        return self._boundary_counts(self.offsets[:-1])
+
+    def end_counts(self):
+        """return a dictionary of last transition-frequency pairs over all non-empty cases"""
+        return self._boundary_counts(self.offsets[1:] - 1)
+
+    def _boundary_counts(self, positions):
+        non_empty = self.offsets[1:] > self.offsets[:-1]
+        counts = np.bincount(self.codes[positions[non_empty]], minlength=len(self.activities))
+        return {self.activities[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def direct_follows_counts(self):
+        """return a dictionary of directFollow-frequency pairs, like heuristic_miner.direct_follows(traces(log))"""
+        n = len(self.activities)
+        if len(self.codes) < 2:
+            return {}
+        # a pair (codes[i], codes[i+1]) is a direct follow unless i is the last event of a case
+        valid = np.ones(len(self.codes) - 1, dtype=bool)
+        ends = self.offsets[1:-1] - 1
+        valid[ends[(ends >= 0) & (ends < len(valid))]] = False
+        keys = self.codes[:-1][valid].astype(np.int64) * n + self.codes[1:][valid]
+        pairs, counts = np.unique(keys, return_counts=True)
+        return {(self.activities[p // n], self.activities[p % n]): int(c) for p, c in zip(pairs.tolist(), counts.tolist())}
+
+    def variants(self):
+        """return a dictionary of trace-frequency pairs, like heuristic_miner.traces"""
+        if self._variants is None:
+            counts = {}
+            codes, offsets = self.codes, self.offsets.tolist()
+            for case in range(len(self)):
+                key = tuple(codes[offsets[case]:offsets[case+1]].tolist())
+                counts[key] = counts.get(key, 0) + 1
+            self._variants = {tuple(self.activities[c] for c in key): freq for key, freq in counts.items()}
+        return dict(self._variants)
+
+def from_arrays(activities, codes, offsets, timestamps=None):
+    """return a BinaryLog from the columnar output of import_xes.importer().read_xes_arrays/read_csv_arrays"""
+    return BinaryLog(activities, np.asarray(codes, dtype=np.int32), np.asarray(offsets, dtype=np.int32),
+                     None if timestamps is None else np.asarray(timestamps, dtype=np.float64))
+
+def from_event_log(event_log):
+    """return a BinaryLog from a 2D-array of transitions"""
+    index = {}
+    codes, offsets = [], [0]
+    for case in event_log:
+        for event in case:
+            codes.append(index.setdefault(event, len(index)))
+        offsets.append(len(codes))
+    return from_arrays(list(index), codes, offsets)
+
+def _padding(position):
+    return (-position) % 8
+
+def write(log, path):
+    """write a BinaryLog to path"""
+    header = json.dumps({'activities': log.activities, 'events': int(len(log.codes)), 'cases': len(log),
+                         'timestamps': log.timestamps is not None}).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        f.write(b'\0' * _padding(len(MAGIC) + 8 + len(header)))
+        f.write(np.ascontiguousarray(log.codes, dtype='<i4').tobytes())
+        f.write(np.ascontiguousarray(log.offsets, dtype='<i4').tobytes())
+        if log.timestamps is not None:
+            f.write(b'\0' * _padding(4 * (len(log.codes) + len(log.offsets))))
+            f.write(np.ascontiguousarray(log.timestamps, dtype='<f8').tobytes())
+
+def open_log(path):
+    """return a BinaryLog whose arrays are read-only memory maps of the file at path"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(path + ' is not a binary event log')
+        (length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(length).decode('utf-8'))
+    position = len(MAGIC) + 8 + length
+    position += _padding(position)
+    events, cases = header['events'], header['cases']
+    codes = _map(path, '<i4', position, events)
+    position += 4 * events
+    offsets = _map(path, '<i4', position, cases + 1)
+    position += 4 * (cases + 1)
+    timestamps = None
+    if header['timestamps']:
+        position += _padding(position)
+        timestamps = _map(path, '<f8', position, events)
+    return BinaryLog(header['activities'], codes, offsets, timestamps)
+
+def _map(path, dtype, offset, length):
+    # np.memmap refuses empty maps
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(length,))
+
+def convert(log_file_path, binary_file_path, timestamps=False):
+    """parse a xes or csv file once and store it as a binary log"""
+    parser = import_xes.importer()
+    if log_file_path.lower().endswith('.csv'):
+        arrays = parser.read_csv_arrays(log_file_path, timestamps=timestamps)
+    else:
+        arrays = parser.read_xes_arrays(log_file_path, timestamps=timestamps)
+    write(from_arrays(*arrays), binary_file_path)
@@ -0,0 +1,99 @@
+"""
+This module implements the data structure of a causal net (C-net) as it is drawn by heuristic_miner.cnet.
+
+Activities and binding points share one integer id space: CNet.nodes[id] is either an Activity or a BindingPoint.
+Every direct follow arc is an Arc between two activity ids. The blue dots of a binding are BindingPoints on the arcs
+of its members, numbered from the bound activity outwards, and grouped by a BindingGroup. Each drawn arc additionally
+gets plain points: one end point after the last dot of an output arc or before the last dot of an input arc, or an
+in/out pair on arcs without any dot. Lookups go through dictionaries of names and id pairs, labels are only assigned
+when the net is rendered, so activity names may contain any character.
+
+Example taken from L1.xes:
+    net = heuristic_miner.nodes_on_cnet(transitions, directFollows, parallel, out_binding_freq, in_binding_freq)
+    a, b = net.activity_id('a'), net.activity_id('b')
+    net.arc(a, b).points   --> ids of the two output binding points on a -> b, with frequency 1 and 4
+"""
+
+OUTPUT, INPUT = 0, 1
+
+class Activity:
+    __slots__ = ('id', 'name', 'freq')
+
+    def __init__(self, id, name, freq):
+        self.id = id
+        self.name = name
+        self.freq = freq
+
+class BindingPoint:
+    __slots__ = ('id', 'arc', 'freq')
+
+    def __init__(self, id, arc, freq):
+        self.id = id
+        self.arc = arc    # id of the arc the point lies on
+        self.freq = freq
+
+class Arc:
+    __slots__ = ('id', 'source', 'target', 'freq', 'parallel', 'side', 'points', 'bound', 'ends')
+
+    def __init__(self, id, source, target, freq, parallel):
+        self.id = id
+        self.source = source      # activity id
+        self.target = target      # activity id
+        self.freq = freq
+        self.parallel = parallel  # parallel arcs are not drawn
+        self.side = None          # OUTPUT or INPUT once the arc carries binding points
+        self.points = []          # binding point ids, the first one is next to the bound activity
+        self.bound = [0, 0]       # half the frequency of the larger output/input bindings over this arc
+        self.ends = []            # plain point ids
+
+class BindingGroup:
+    __slots__ = ('id', 'activity', 'side', 'points', 'freq')
+
+    def __init__(self, id, activity, side, points, freq):
+        self.id = id
+        self.activity = activity  # activity id of the bound activity
+        self.side = side
+        self.points = points      # binding point ids, one per member of the binding
+        self.freq = freq
+
+class CNet:
+    """activities, arcs, binding points and binding groups of a causal net"""
+    def __init__(self):
+        self.nodes = []    # Activity or BindingPoint, indexed by id
+        self.arcs = []
+        self.groups = []
+        self._activities = {}  # name -> id
+        self._arcs = {}        # (source id, target id) -> arc id
+
+    def add_activity(self, name, freq):
+        activity = Activity(len(self.nodes), name, freq)
+        self.nodes.append(activity)
+        self._activities[name] = activity.id
+        return activity.id
+
+    def activity_id(self, name):
+        return self._activities[name]
+
+    def activities(self):
+        return [n for n in self.nodes if isinstance(n, Activity)]
+
+    def add_arc(self, source, target, freq, parallel=False):
+        arc = Arc(len(self.arcs), source, target, freq, parallel)
+        self.arcs.append(arc)
+        self._arcs[(source, target)] = arc.id
+        return arc.id
+
+    def arc(self, source, target):
+        """return the arc between two activity ids, None if there is none"""
+        arc_id = self._arcs.get((source, target))
+        return None if arc_id is None else self.arcs[arc_id]
+
+    def add_point(self, arc_id, freq):
+        point = BindingPoint(len(self.nodes), arc_id, freq)
+        self.nodes.append(point)
+        return point.id
+
+    def add_group(self, activity, side, points, freq):
+        group = BindingGroup(len(self.groups), activity, side, points, freq)
+        self.groups.append(group)
+        return group.id
@@ -0,0 +1,134 @@
+"""
+This module implements token-based replay of an event log on the Petri net discovered by the Alpha miner
+(the places and flows of alpha.add_places and alpha.add_flows), as described in [1], chapter 8.2.
+
+Every trace is replayed on the net starting with one token in iL. An event fires its transition: a token is consumed
+from every input place, a missing token is counted if the place is empty, and a token is produced in every output
+place. At the end one token is consumed from oL and the tokens left behind are counted as remaining. With produced p,
+consumed c, missing m and remaining r tokens, the fitness is 1/2 (1 - m/c) + 1/2 (1 - r/p).
+
+A marking is a single integer with FIELD_BITS bits of token count per place, so firing a transition is a few shifts
+and additions. Identical traces give identical results, so only the distinct variants are replayed and weighted with
+their frequency. Large numbers of variants are split into chunks that are replayed in a process pool, one pool per
+process created on first use. Its workers are spawned, not forked, since the app replays from request threads.
+
+Example taken from L1.xes:
+    conformance.replay_alpha(log)['fitness']   --> 1.0
+
+References
+    [1] Wil.M.P. van der Aalst, Process Mining: Data Science in Action, vol. 2, Springer, 2016, doi: 10.1007/978-3-662-49851-4.
+"""
+
+import multiprocessing, threading
+from concurrent.futures import ProcessPoolExecutor
+import alpha, heuristic_miner as hm
+
+FIELD_BITS = 32
+FIELD_MASK = (1 << FIELD_BITS) - 1
+# below this number of variants the replay runs in the calling process
+PARALLEL_VARIANTS = 5000
+CHUNK_SIZE = 1000
+
+def compile_net(transitions, places, flows):
+    """return the net in the form used by the replay: (place names, {transition: (input places, output marking)}).
+    input places are tuples of bit offsets, the output marking is the integer added when the transition fires.
+    """
+    offset = {p: i * FIELD_BITS for i, p in enumerate(places)}
+    inputs = {t: [] for t in transitions}
+    outputs = {t: 0 for t in transitions}
+    for source, target in flows:
+        if source in offset and target in inputs:
+            inputs[target].append(offset[source])
+        elif source in outputs and target in offset:
+            outputs[source] += 1 << offset[target]
+    return list(places), {t: (tuple(inputs[t]), outputs[t]) for t in transitions}
+
+def replay_trace(net, trace):
+    """replay one trace, return (produced, consumed, missing per place, remaining per place, unknown events).
+    missing/remaining: dictionaries of place index-token count pairs
+    """
+    places, fire = net
+    start, end = places.index('iL') * FIELD_BITS, places.index('oL') * FIELD_BITS
+    marking, produced, consumed, unknown = 1 << start, 1, 0, 0
+    missing = {}
+    for event in trace:
+        if event not in fire:
+            unknown += 1
+            continue
+        inputs, output = fire[event]
+        for offset in inputs:
+            if (marking >> offset) & FIELD_MASK:
+                marking -= 1 << offset
+            else:
+                missing[offset // FIELD_BITS] = missing.get(offset // FIELD_BITS, 0) + 1
+        consumed += len(inputs)
+        marking += output
+        produced += bin(output).count('1')
+    # the final marking should be a single token in oL
+    if (marking >> end) & FIELD_MASK:
+        marking -= 1 << end
+    else:
+        missing[end // FIELD_BITS] = missing.get(end // FIELD_BITS, 0) + 1
+    consumed += 1
+    remaining = {}
+    index = 0
+    while marking:
+        if marking & FIELD_MASK:
+            remaining[index] = marking & FIELD_MASK
+        marking >>= FIELD_BITS
+        index += 1
+    return produced, consumed, missing, remaining, unknown
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool(processes=None):
+    """return the process-wide replay pool, created with processes workers (None: all cores) on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+def _replay_chunk(net, variants):
+    return [replay_trace(net, trace) for trace in variants]
+
+def _fitness(produced, consumed, missing, remaining):
+    return 0.5 * (1 - missing / consumed) + 0.5 * (1 - remaining / produced)
+
+def replay(event_log, transitions, places, flows, processes=None):
+    """replay the event log on the Petri net given by places and flows. Return a dictionary with
+    fitness, cases, produced, consumed, missing, remaining and unknown (events without transition) for the whole log,
+    'places': {place: {missing, remaining}} and 'variants': [{trace, cases, fitness, missing, remaining}].
+    processes: 1 replays in the calling process, otherwise the size of the process pool if it does not exist yet (see get_pool)
+    """
+    net = compile_net(transitions, places, flows)
+    trace = hm.traces(event_log)
+    variants = list(trace)
+    if processes == 1 or len(variants) < PARALLEL_VARIANTS:
+        results = _replay_chunk(net, variants)
+    else:
+        chunks = [variants[i:i + CHUNK_SIZE] for i in range(0, len(variants), CHUNK_SIZE)]
+        pool = get_pool(processes)
+        results = [r for chunk in pool.map(_replay_chunk, [net] * len(chunks), chunks) for r in chunk]
+    total = dict(produced=0, consumed=0, missing=0, remaining=0, unknown=0)
+    per_place = {p: {'missing': 0, 'remaining': 0} for p in places}
+    per_variant = []
+    for t, (produced, consumed, missing, remaining, unknown) in zip(variants, results):
+        freq = trace[t]
+        m, r = sum(missing.values()), sum(remaining.values())
+        for key, value in (('produced', produced), ('consumed', consumed), ('missing', m), ('remaining', r), ('unknown', unknown)):
+            total[key] += value * freq
+        for i in missing:
+            per_place[places[i]]['missing'] += missing[i] * freq
+        for i in remaining:
+            per_place[places[i]]['remaining'] += remaining[i] * freq
+        per_variant.append({'trace': list(t), 'cases': freq, 'fitness': _fitness(produced, consumed, m, r), 'missing': m, 'remaining': r})
+    cases = sum(trace.values())
+    fitness = _fitness(total['produced'], total['consumed'], total['missing'], total['remaining']) if cases else 1.0
+    return dict(fitness=fitness, cases=cases, places=per_place, variants=per_variant, **total)
+
+def replay_alpha(event_log, processes=None):
+    """discover the Petri net of the event log with the Alpha miner and replay the log on it"""
+    transitions, places, flows = alpha.discover(event_log)
+    return replay(event_log, transitions, places, flows, processes)
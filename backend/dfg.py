@@ -0,0 +1,154 @@
+"""
+This module mines from a directly-follows graph (DFG) instead of an event log, e.g. counts aggregated by a data warehouse
+query. The Alpha miner only needs the activities, the start and end activities and the direct follows, the dependency
+graph only the direct follows counts, so both run on a DirectlyFollowsGraph without any event: the cost of mining
+depends on the number of activities and edges, not on the number of events.
+The causal net, the length-two loop and long-distance measures, waiting times and token replay need the traces and
+are not available for a DFG.
+
+JSON format:
+    {
+        "activities": {"a": 6, "b": 5, ...},                             optional, derived from the other counts otherwise
+        "start_activities": {"a": 6},
+        "end_activities": {"d": 6},
+        "direct_follows": [{"source": "a", "target": "b", "frequency": 3}, ...]
+    }
+
+CSV format, one edge per row with the header source,target,frequency. A row with an empty source counts how often the
+target starts a trace, a row with an empty target how often the source ends a trace:
+    source,target,frequency
+    ,a,6
+    a,b,3
+    d,,6
+
+Example:
+    graph = dfg.read('warehouse_dfg.json')   # or .csv
+    alpha.draw_petri_net(graph)
+    hm.draw_denpendencyGraph(graph, threshold_df=10, threshold_dm=0.9)
+    dfg.write_json(dfg.from_log(event_log), 'L1_dfg.json')
+"""
+
+import csv, json
+import heuristic_miner as hm, event_store
+
+class DirectlyFollowsGraph:
+    """event log given only as its direct follows, start and end counts, accepted by alpha.py and the dependency graph
+    of heuristic_miner.py
+    direct_follows: {(a, b): |a > b|}, start/end: {a: number of traces starting/ending with a}
+    activities: {a: |a|}, None derives them from the counts
+    """
+    def __init__(self, direct_follows, start, end, activities=None):
+        self._direct_follows = dict(direct_follows)
+        self._start = dict(start)
+        self._end = dict(end)
+        self._activities = None if activities is None else dict(activities)
+
+    def transition_counts(self):
+        if self._activities is not None:
+            return dict(self._activities)
+        # every occurrence of a is entered by an edge or starts a trace, and is left by an edge or ends a trace
+        incoming, outgoing = dict(self._start), dict(self._end)
+        for (a, b), count in self._direct_follows.items():
+            outgoing[a] = outgoing.get(a, 0) + count
+            incoming[b] = incoming.get(b, 0) + count
+        return {t: max(incoming.get(t, 0), outgoing.get(t, 0)) for t in set(incoming) | set(outgoing)}
+
+    def start_counts(self):
+        return dict(self._start)
+
+    def end_counts(self):
+        return dict(self._end)
+
+    def direct_follows_counts(self):
+        # a copy, the dependency graph deletes the filtered edges from it
+        return dict(self._direct_follows)
+
+def from_log(event_log):
+    """return the DFG of an event log"""
+    if not hasattr(event_log, 'start_counts'):
+        event_log = event_store.VariantLog(hm.traces(event_log))
+    return DirectlyFollowsGraph(event_log.direct_follows_counts(), event_log.start_counts(), event_log.end_counts(),
+                                event_log.transition_counts())
+
+def _count(value, what):
+    if isinstance(value, bool) or not isinstance(value, int):
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError('the count of {} is not an integer: {!r}'.format(what, value))
+    if value < 0:
+        raise ValueError('the count of {} is negative: {}'.format(what, value))
+    return value
+
+def from_dict(data):
+    """return the DFG of a dictionary in the json format"""
+    try:
+        edges = data['direct_follows']
+        start = {a: _count(c, 'start activity ' + a) for a, c in data['start_activities'].items()}
+        end = {a: _count(c, 'end activity ' + a) for a, c in data['end_activities'].items()}
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError('a DFG needs direct_follows, start_activities and end_activities: {}'.format(e))
+    direct_follows = {}
+    for edge in edges:
+        try:
+            pair = (edge['source'], edge['target'])
+        except (KeyError, TypeError):
+            raise ValueError('every direct follow needs a source and a target: {!r}'.format(edge))
+        direct_follows[pair] = direct_follows.get(pair, 0) + _count(edge.get('frequency', 1), '{} > {}'.format(*pair))
+    activities = data.get('activities')
+    if activities is not None:
+        activities = {a: _count(c, 'activity ' + a) for a, c in activities.items()}
+    return DirectlyFollowsGraph(direct_follows, start, end, activities)
+
+def to_dict(graph):
+    """return the DFG in the json format"""
+    return {
+        'activities': dict(sorted(graph.transition_counts().items())),
+        'start_activities': dict(sorted(graph.start_counts().items())),
+        'end_activities': dict(sorted(graph.end_counts().items())),
+        'direct_follows': [{'source': a, 'target': b, 'frequency': c} for (a, b), c in sorted(graph.direct_follows_counts().items())],
+    }
+
+def read_json(path):
+    """read a DFG in the json format"""
+    with open(path, encoding='utf-8') as f:
+        return from_dict(json.load(f))
+
+def read_csv(path):
+    """read a DFG in the csv format"""
+    direct_follows, start, end = {}, {}, {}
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None or not {'source', 'target', 'frequency'} <= set(reader.fieldnames):
+            raise ValueError('a DFG csv file needs the columns source, target and frequency')
+        for row in reader:
+            source, target = row['source'], row['target']
+            count = _count(row['frequency'], '{} > {}'.format(source, target))
+            if not source and not target:
+                raise ValueError('line {}: source and target are empty'.format(reader.line_num))
+            if not source:
+                start[target] = start.get(target, 0) + count
+            elif not target:
+                end[source] = end.get(source, 0) + count
+            else:
+                direct_follows[(source, target)] = direct_follows.get((source, target), 0) + count
+    return DirectlyFollowsGraph(direct_follows, start, end)
+
+def read(path):
+    """read a DFG in the json or csv format, by the extension of path"""
+    return read_csv(path) if path.lower().endswith('.csv') else read_json(path)
+
+def write_json(graph, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(to_dict(graph), f, indent=1)
+
+def write_csv(graph, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['source', 'target', 'frequency'])
+        for a, c in sorted(graph.start_counts().items()):
+            writer.writerow(['', a, c])
+        for (a, b), c in sorted(graph.direct_follows_counts().items()):
+            writer.writerow([a, b, c])
+        for a, c in sorted(graph.end_counts().items()):
+            writer.writerow([a, '', c])
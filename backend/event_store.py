@@ -0,0 +1,247 @@
+"""
+This module implements a file-backed event store on SQLite for event logs that do not fit into memory.
+
+Xes and csv files are streamed into the store event by event, so parsing never holds the whole log.
+Variant, transition, start/end and direct follow counts are computed by SQL aggregations or by one streaming
+pass over the events ordered by case, hence peak memory depends on the number of activities and variants
+and not on the number of events.
+
+An EventStore offers the same counting methods as binary_log.BinaryLog (transition_counts, start_counts,
+end_counts, direct_follows_counts and variants), so alpha.py and heuristic_miner.py accept it directly.
+aggregate() returns the counts as a small in-memory VariantLog, which is handy to mine the same log several times.
+
+Example:
+    store = event_store.EventStore("big_log.db")
+    store.add_xes("big_log.xes")
+    hm.draw_denpendencyGraph(store.aggregate(), threshold_df=10, threshold_dm=0.9)
+"""
+
+import csv, sqlite3
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+BATCH_SIZE = 10000
+
+class EventStore:
+    """event log stored in a SQLite file, one row per event"""
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS activities (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS events (case_id TEXT NOT NULL, position INTEGER NOT NULL,
+                                               activity INTEGER NOT NULL, timestamp REAL);
+            CREATE INDEX IF NOT EXISTS events_case ON events (case_id, position);
+            CREATE INDEX IF NOT EXISTS events_activity ON events (activity);
+            CREATE TABLE IF NOT EXISTS csv_loads (id INTEGER PRIMARY KEY, path TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS empty_cases (case_id TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+        self._activities = dict(self.connection.execute('SELECT name, id FROM activities'))
+        self._names = {i: name for name, i in self._activities.items()}
+        self._next_case = self._stored_next_case()
+
+    def _stored_next_case(self):
+        """return the id of the next xes case, stored in meta since the case ids of csv loads and empty traces can't be counted"""
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'next_case'").fetchone()
+        if row is not None:
+            return row[0]
+        # a store written before the counter was kept, xes case ids are the numbers 0, 1, ...
+        return self.connection.execute("""
+            SELECT COALESCE(MAX(CAST(case_id AS INTEGER)) + 1, 0) FROM
+                (SELECT case_id FROM events WHERE case_id NOT LIKE 'csv%' UNION SELECT case_id FROM empty_cases)""").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def _activity_id(self, name):
+        if name not in self._activities:
+            i = len(self._activities)
+            self.connection.execute('INSERT INTO activities (id, name) VALUES (?, ?)', (i, name))
+            self._activities[name] = i
+            self._names[i] = name
+        return self._activities[name]
+
+    def _insert(self, rows):
+        self.connection.executemany('INSERT INTO events VALUES (?, ?, ?, ?)', rows)
+        rows.clear()
+
+    def add_xes(self, xes_file_path):
+        """stream the events of a xes file into the store, lifecycle states are filtered as in import_xes.
+        A trace without any complete event is kept as an empty case, like import_xes.read_xes does.
+        """
+        rows, empty = [], []
+        case, position, event, depth = None, 0, None, 0
+        root = None
+        for action, element in ET.iterparse(xes_file_path, events=('start', 'end')):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if action == 'start':
+                depth += 1
+                if root is None:
+                    root = element
+                if tag == 'trace':
+                    case, position = str(self._next_case), 0
+                    self._next_case += 1
+                elif tag == 'event':
+                    event = {}
+                elif event is not None and depth == 4:  # attribute directly below <log><trace><event>
+                    event[element.get('key')] = element.get('value')
+                continue
+            depth -= 1
+            if tag == 'event':
+                lifecycle = event.get('lifecycle:transition')
+                if lifecycle == 'complete' or lifecycle is None:
+                    rows.append((case, position, self._activity_id(event.get('concept:name')), _seconds(event.get('time:timestamp'))))
+                    position += 1
+                event = None
+                element.clear()
+                if len(rows) >= BATCH_SIZE:
+                    self._insert(rows)
+            elif tag == 'trace':
+                if position == 0:
+                    empty.append((case,))
+                root.clear()  # drop the finished trace, memory stays bounded by one trace
+        self._insert(rows)
+        self.connection.executemany('INSERT INTO empty_cases VALUES (?)', empty)
+        self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('next_case', ?)", (self._next_case,))
+        self.connection.commit()
+
+    def add_csv(self, csv_file_path, case_column='case:concept:name', activity_column='concept:name',
+                timestamp_column='time:timestamp', lifecycle_column='lifecycle:transition', sep=','):
+        """stream the rows of a csv file into the store, then order every case by timestamp like import_xes.read_csv.
+        The case ids of every load get their own prefix, so equal case ids of two csv files stay two cases.
+        """
+        load = self.connection.execute('INSERT INTO csv_loads (path) VALUES (?)', (csv_file_path,)).lastrowid
+        prefix = 'csv{}:'.format(load)
+        first = self.connection.execute('SELECT COALESCE(MAX(rowid), 0) FROM events').fetchone()[0]
+        rows = []
+        with open(csv_file_path, newline='') as f:
+            reader = csv.reader(f, delimiter=sep)
+            header = next(reader)
+            case_i, activity_i = header.index(case_column), header.index(activity_column)
+            time_i = header.index(timestamp_column) if timestamp_column in header else None
+            life_i = header.index(lifecycle_column) if lifecycle_column in header else None
+            for seq, row in enumerate(reader):
+                if life_i is not None and row[life_i] not in ('complete', ''):
+                    continue
+                timestamp = _seconds(row[time_i]) if time_i is not None else None
+                # cases are not contiguous in a csv file, the position is fixed after loading
+                rows.append((prefix + row[case_i], seq, self._activity_id(row[activity_i]), timestamp))
+                if len(rows) >= BATCH_SIZE:
+                    self._insert(rows)
+        self._insert(rows)
+        # renumber positions per case in timestamp order, only the rows of this load, SQLite sorts on disk
+        self.connection.execute('CREATE TEMP TABLE ordered (id INTEGER PRIMARY KEY, position INTEGER)')
+        self.connection.execute("""
+            INSERT INTO ordered
+                SELECT rowid, ROW_NUMBER() OVER (PARTITION BY case_id ORDER BY timestamp, position) - 1
+                FROM events WHERE rowid > ?""", (first,))
+        self.connection.execute("""
+            UPDATE events SET position = (SELECT position FROM ordered WHERE ordered.id = events.rowid)
+                WHERE rowid > ?""", (first,))
+        self.connection.execute('DROP TABLE ordered')
+        self.connection.commit()
+
+    def _counts(self, sql):
+        return {self._names[a]: n for a, n in self.connection.execute(sql)}
+
+    def transition_counts(self):
+        """return a dictionary of transition-frequency pairs"""
+        return self._counts('SELECT activity, COUNT(*) FROM events GROUP BY activity')
+
+    def start_counts(self):
+        """return a dictionary of first transition-frequency pairs"""
+        return self._counts('SELECT activity, COUNT(*) FROM events WHERE position = 0 GROUP BY activity')
+
+    def end_counts(self):
+        """return a dictionary of last transition-frequency pairs"""
+        return self._counts("""
+            SELECT e.activity, COUNT(*) FROM events e
+            JOIN (SELECT case_id, MAX(position) AS last FROM events GROUP BY case_id) m
+              ON e.case_id = m.case_id AND e.position = m.last
+            GROUP BY e.activity""")
+
+    def direct_follows_counts(self):
+        """return a dictionary of directFollow-frequency pairs"""
+        sql = """SELECT a.activity, b.activity, COUNT(*) FROM events a
+                 JOIN events b ON b.case_id = a.case_id AND b.position = a.position + 1
+                 GROUP BY a.activity, b.activity"""
+        return {(self._names[a], self._names[b]): n for a, b, n in self.connection.execute(sql)}
+
+    def variants(self):
+        """return a dictionary of trace-frequency pairs, streaming the events case by case"""
+        counts = {}
+        case, trace = None, []
+        for case_id, activity in self.connection.execute('SELECT case_id, activity FROM events ORDER BY case_id, position'):
+            if case_id != case:
+                if case is not None:
+                    counts[tuple(trace)] = counts.get(tuple(trace), 0) + 1
+                case, trace = case_id, []
+            trace.append(activity)
+        if case is not None:
+            counts[tuple(trace)] = counts.get(tuple(trace), 0) + 1
+        empty = self.connection.execute('SELECT COUNT(*) FROM empty_cases').fetchone()[0]
+        if empty:
+            counts[()] = empty
+        return {tuple(self._names[a] for a in key): freq for key, freq in counts.items()}
+
+    def __iter__(self):
+        """stream the cases as lists of transitions"""
+        for trace, freq in self.variants().items():
+            for _ in range(freq):
+                yield list(trace)
+
+    def aggregate(self):
+        """return the aggregated counts of the store as an in-memory VariantLog"""
+        return VariantLog(self.variants())
+
+class VariantLog:
+    """event log given only as trace-frequency pairs, accepted by alpha.py and heuristic_miner.py"""
+    def __init__(self, variants):
+        self._variants = dict(variants)
+
+    def __iter__(self):
+        for trace, freq in self._variants.items():
+            for _ in range(freq):
+                yield list(trace)
+
+    def __len__(self):
+        return sum(self._variants.values())
+
+    def variants(self):
+        return dict(self._variants)
+
+    def transition_counts(self):
+        counts = {}
+        for trace, freq in self._variants.items():
+            for t in trace:
+                counts[t] = counts.get(t, 0) + freq
+        return counts
+
+    def start_counts(self):
+        return self._boundary_counts(0)
+
+    def end_counts(self):
+        return self._boundary_counts(-1)
+
+    def _boundary_counts(self, index):
+        counts = {}
+        for trace, freq in self._variants.items():
+            if trace:
+                counts[trace[index]] = counts.get(trace[index], 0) + freq
+        return counts
+
+    def direct_follows_counts(self):
+        counts = {}
+        for trace, freq in self._variants.items():
+            for pair in zip(trace, trace[1:]):
+                counts[pair] = counts.get(pair, 0) + freq
+        return counts
+
+def _seconds(timestamp):
+    """convert a xes/iso timestamp string to seconds since epoch, None if missing"""
+    if not timestamp:
+        return None
+    value = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
@@ -0,0 +1,115 @@
+"""
+This module compares footprints [1] (chapter 8.4): of two event logs, or of an event log and a Petri net.
+
+A cell of a footprint is D + 2 D^T of the boolean direct follows matrix D, so it is 0 for choice (#), 1 for causality (→),
+2 for reversed causality (←) and 3 for parallel (||), the same relations as alpha.footprint_relation. Only a cell of a
+direct follows pair or of its reverse is not #, so a footprint is kept as a dictionary of these cells (relations())
+and its size grows with the direct follows pairs instead of the square of the activities. Both footprints are placed on
+the union of their activities and only the cells in either dictionary are compared, the others are # in both.
+The conformance is the share of equal cells, 1 - differing cells / all cells. relation_matrix() is the dense int8
+matrix of a footprint, for small numbers of activities.
+
+The footprint of a Petri net is taken from the direct successions of its firing sequences: the reachability graph is
+explored breadth first from the initial marking and (a, b) is a direct follows pair if b can fire right after a.
+The exploration stops after max_states states, the result then reports truncated=True and a pair that needs a longer
+firing sequence may be missing. An unbounded net (e.g. the Alpha net of running-example.xes) never ends otherwise,
+its pairs are usually found within the first few hundred states.
+
+Example taken from L1.xes:
+    footprint.compare_logs(log, log)   --> {'conformance': 1.0, 'activities': [a, b, c, d, e], 'differing': 0, 'differences': []}
+    footprint.compare_log_model(log, transitions, places, flows)   --> log against a Petri net
+
+References
+    [1] Wil.M.P. van der Aalst, Process Mining: Data Science in Action, vol. 2, Springer, 2016, doi: 10.1007/978-3-662-49851-4.
+"""
+
+from collections import deque
+import numpy as np
+import alpha, conformance
+
+SYMBOLS = np.array(['#', '→', '←', '||'])
+# about 10ms for the unbounded Alpha net of running-example.xes
+MAX_STATES = 2000
+MAX_DIFFERENCES = 1000
+
+def relations(direct_follows, activities):
+    """return the footprint of a set of direct follows pairs as dictionary of (row, column)-relation pairs over the given
+    activities, the cells that are # (0) are left out
+    """
+    cells = {}
+    for a, b in direct_follows:
+        if a in activities and b in activities:
+            cells[a, b] = cells.get((a, b), 0) | 1
+            cells[b, a] = cells.get((b, a), 0) | 2
+    return cells
+
+def relation_matrix(direct_follows, activities):
+    """return the footprint of a set of direct follows pairs as int8 matrix over the given activities"""
+    index = {t: i for i, t in enumerate(activities)}
+    matrix = np.zeros((len(activities), len(activities)), dtype=np.int8)
+    for (a, b), relation in relations(direct_follows, index).items():
+        matrix[index[a], index[b]] = relation
+    return matrix
+
+def model_direct_follows(transitions, places, flows, max_states=MAX_STATES):
+    """return (direct follows pairs, truncated) of the Petri net given by places and flows, from its reachability graph.
+    A state is a marking together with the last fired transition, truncated is True if more than max_states states
+    are reachable and the search stopped before visiting all of them.
+    """
+    names, fire = conformance.compile_net(transitions, places, flows)
+    rules = [(t, fire[t][0], sum(1 << o for o in fire[t][0]), fire[t][1]) for t in sorted(fire)]
+    initial = (1 << (names.index('iL') * conformance.FIELD_BITS), None)
+    visited, queue, direct_follows = {initial}, deque([initial]), set()
+    while queue and len(visited) <= max_states:
+        marking, last = queue.popleft()
+        for t, inputs, pre, post in rules:
+            if all((marking >> o) & conformance.FIELD_MASK for o in inputs):
+                if last is not None:
+                    direct_follows.add((last, t))
+                state = (marking - pre + post, t)
+                if state not in visited:
+                    visited.add(state)
+                    queue.append(state)
+    return direct_follows, bool(queue)
+
+def compare(transitions_1, direct_follows_1, transitions_2, direct_follows_2, max_differences=MAX_DIFFERENCES):
+    """compare two footprints given by their transitions and direct follows pairs. Return a dictionary with
+    conformance, activities, differing (number of differing cells) and
+    differences: [(row, column, relation in the first, relation in the second)], at most max_differences of them
+    """
+    known = set(transitions_1) | set(transitions_2)
+    activities = sorted(known)
+    first = relations(direct_follows_1, known)
+    second = relations(direct_follows_2, known)
+    # in the order of the rows and columns of the matrices
+    cells = sorted(cell for cell in first.keys() | second.keys() if first.get(cell, 0) != second.get(cell, 0))
+    differing = len(cells)
+    symbols = SYMBOLS.tolist()
+    differences = [(row, column, symbols[first.get((row, column), 0)], symbols[second.get((row, column), 0)])
+                   for row, column in cells[:max_differences]]
+    cells = len(activities) ** 2
+    return {
+        'conformance': 1 - differing / cells if cells else 1.0,
+        'activities': activities,
+        'differing': differing,
+        'differences': differences,
+    }
+
+def compare_logs(event_log_1, event_log_2):
+    """compare the footprints of two event logs"""
+    return compare(alpha.find_transitions(event_log_1), alpha._direct_follows(event_log_1),
+                   alpha.find_transitions(event_log_2), alpha._direct_follows(event_log_2))
+
+def compare_log_model(event_log, transitions, places, flows, max_states=MAX_STATES):
+    """compare the footprint of an event log with the footprint of a Petri net, see compare.
+    The result also has truncated, True if the footprint of the net only covers its first max_states states
+    """
+    direct_follows, truncated = model_direct_follows(transitions, places, flows, max_states)
+    result = compare(alpha.find_transitions(event_log), alpha._direct_follows(event_log), transitions, direct_follows)
+    result['truncated'] = truncated
+    return result
+
+def compare_log_alpha(event_log, model_log, max_states=MAX_STATES):
+    """compare the footprint of an event log with the Petri net the Alpha miner discovers from model_log"""
+    transitions, places, flows = alpha.discover(model_log)
+    return compare_log_model(event_log, transitions, places, flows, max_states)
@@ -11,17 +11,20 @@ References
     Chapter 3.2.7 and 7.2
 """
 
-import graphviz, copy
-import pandas as pd
-import dataframe_image as dfi
+import graphviz, copy, render_cache, layout, cnet_model, performance, metrics
 from itertools import chain, combinations, permutations
 
+OUTPUT_DIRECTORY = '../frontend/static/output'
+# OUTPUT_DIRECTORY = 'frontend/static/output'   # for server
+
 
 # step_1:
 def traces(event_log):
     """return a dictionary of trace-frequency pairs. Example taken from L1.xes: \n
     frequency_traces([[a, e, d], [a, c, b, d], [a, b, c, d], [a, b, c, d], [a, b, c, d], [a, c, b, d]]) --> {(a, e, d): 1, (a, c, b, d): 2, (a, b, c, d): 3}
     """
+    if hasattr(event_log, 'variants'):  # e.g. binary_log.BinaryLog counts by itself
+        return event_log.variants()
     frequency_trace = {}
     for log in event_log:
          if tuple(log) not in frequency_trace.keys():
@@ -35,6 +38,8 @@ def find_transitions(event_log):
     """return a dictionary of transition-frequency pairs. Example taken from L1.xes: \n
     find_transitions([[a, e, d], [a, c, b, d], [a, b, c, d], [a, b, c, d], [a, b, c, d], [a, c, b, d]]) --> {a: 6, e: 1, d: 6, c: 5, b: 5}
     """
+    if hasattr(event_log, 'transition_counts'):
+        return event_log.transition_counts()
     transitions = {}
     for trace in event_log:
         for event in trace:
@@ -56,14 +61,22 @@ def direct_follows(traces):
                 frequency_df[(trace[t], trace[t+1])] = traces[trace]+frequency_df[(trace[t], trace[t+1])]
     return frequency_df
 
+def _direct_follows_of(event_log):
+    """return the directFollow-frequency pairs of an event log, counted by the log itself if it can"""
+    if hasattr(event_log, 'direct_follows_counts'):
+        return event_log.direct_follows_counts()
+    return direct_follows(traces(event_log))
+
 # step_4:
 def denpendency_measure(event_log):
     """return a dictionary of DirectFollow-DependencyMeasure pairs. Example taken from L1.xes: \n
     directfollows: {(a, e): 1, (e, d): 1, (a, c): 2, (c, b): 2, (b, d): 2, (a, b): 3, (b, c): 3, (c, d): 3}
     return: {(a, e): 0.5, (e, d): 0.5, (a, c): 0.67, (c, b): -0.17, (b, d): 0.67, (a, b): 0.75, (b, c): 0.17, (c, d): 0.75}
     """
-    trace = traces(event_log)
-    directFollows = direct_follows(trace)
+    return _dependency_of(_direct_follows_of(event_log))
+
+def _dependency_of(directFollows):
+    """return the DirectFollow-DependencyMeasure pairs of a dictionary of directFollow-frequency pairs"""
     denpendency_measure = {}
     for pair in directFollows.keys():
         # implement the formula on page 204 in [1]:
@@ -74,65 +87,182 @@ def denpendency_measure(event_log):
         denpendency_measure[pair] = round(denpendency_measure[pair],2)
     return denpendency_measure
 
+def dependency_value(denpendency_measure, row, column):
+    """return the dependency measure of the pair (row, column) for the matrix, the negated reverse measure or 0"""
+    if (row, column) in denpendency_measure:
+        return denpendency_measure[(row, column)]
+    elif (column, row) in denpendency_measure:
+        return -denpendency_measure[(column, row)]
+    return 0
+
+def heuristic_statistics(event_log):
+    """return the counts of all heuristic measures, collected in a single scan over the variants:
+    transitions: {a: |a|}, direct_follows: {(a, b): |a > b|},
+    two_loop: {(a, b): |a >> b|}, the number of windows a b a,
+    eventually: {(a, b): |a >>> b|}, the number of occurrences of a that are followed by b later in the trace (a != b).
+    Every window of a variant is weighted with the frequency of the variant.
+    """
+    transitions, directFollows, two_loop, eventually = {}, {}, {}, {}
+    for trace, freq in traces(event_log).items():
+        for t in range(len(trace)):
+            transitions[trace[t]] = transitions.get(trace[t], 0) + freq
+            if t + 1 < len(trace):
+                pair = (trace[t], trace[t+1])
+                directFollows[pair] = directFollows.get(pair, 0) + freq
+            if t + 2 < len(trace) and trace[t] == trace[t+2] != trace[t+1]:
+                pair = (trace[t], trace[t+1])
+                two_loop[pair] = two_loop.get(pair, 0) + freq
+        # walk the trace backwards, later holds the activities after the current position
+        later = set()
+        for event in reversed(trace):
+            for b in later:
+                if b != event:
+                    eventually[(event, b)] = eventually.get((event, b), 0) + freq
+            later.add(event)
+    return {'transitions': transitions, 'direct_follows': directFollows, 'two_loop': two_loop, 'eventually': eventually}
+
+def length_two_loop_measure(statistics):
+    """return a dictionary of pair-measure pairs, a =>2 b = (|a >> b| + |b >> a|) / (|a >> b| + |b >> a| + 1).
+    Example: [[a, b, a, b, a]] --> {(a, b): 0.75, (b, a): 0.75}
+    """
+    two_loop = statistics['two_loop']
+    measure = {}
+    for a, b in two_loop:
+        count = two_loop[(a, b)] + two_loop.get((b, a), 0)
+        measure[(a, b)] = measure[(b, a)] = round(count / (count + 1), 2)
+    return measure
+
+def long_distance_measure(statistics):
+    """return a dictionary of pair-measure pairs,
+    a =>l b = 2 |a >>> b| / (|a| + |b| + 1) - 2 abs(|a| - |b|) / (|a| + |b| + 1)
+    """
+    transitions = statistics['transitions']
+    measure = {}
+    for (a, b), count in statistics['eventually'].items():
+        total = transitions[a] + transitions[b] + 1
+        measure[(a, b)] = round(2 * count / total - 2 * abs(transitions[a] - transitions[b]) / total, 2)
+    return measure
+
 def dm_matrix(event_log):
     """generate a dependency measure matrix """
-    transitions = sorted(find_transitions(event_log).keys())
-    dm = denpendency_measure(event_log)
-    table = []
-    for row in transitions:
-        r = []
-        for column in transitions:
-            if (row, column) in dm:
-                r.append(dm[(row, column)])
-            elif (column, row) in dm:
-                r.append(-dm[(column, row)])
-            else:
-                r.append(0)
-        table.append(r)
-    df = pd.DataFrame(table, columns=transitions, index=transitions)
-    styles = [dict(selector="caption", props=[("text-align", "center"),("font-size", "15"),("color", 'dark')])]
-    df = df.style.set_caption("Dependency Measure Matrix").set_table_styles(styles).format(precision=2)
-    dfi.export(df, "../frontend/static/output/dm_matrix.png", table_conversion = 'matplotlib')
-    # dfi.export(df, "frontend/static/output/dm_matrix.png", table_conversion = 'matplotlib')   # for server
+    # pandas and dataframe_image (with matplotlib) take seconds to import, only load them when a png is wanted
+    import pandas as pd
+    import dataframe_image as dfi
+    with metrics.stage('dm_matrix.measure'):
+        transitions = sorted(find_transitions(event_log).keys())
+        dm = denpendency_measure(event_log)
+        table = [[dependency_value(dm, row, column) for column in transitions] for row in transitions]
+    with metrics.stage('dm_matrix.export'):
+        df = pd.DataFrame(table, columns=transitions, index=transitions)
+        styles = [dict(selector="caption", props=[("text-align", "center"),("font-size", "15"),("color", 'dark')])]
+        df = df.style.set_caption("Dependency Measure Matrix").set_table_styles(styles).format(precision=2)
+        dfi.export(df, "../frontend/static/output/dm_matrix.png", table_conversion = 'matplotlib')
+        # dfi.export(df, "frontend/static/output/dm_matrix.png", table_conversion = 'matplotlib')   # for server
 
 # step_5:
-def draw_denpendencyGraph(log, threshold_df=0, threshold_dm=0.0):
-    """draw a dependency graph for the given event log."""
-    transitions = find_transitions(log)
-    t = traces(log)
-    directFollows = direct_follows(t)
-    dm = denpendency_measure(log)
-    denpendencyGraph(transitions, directFollows, dm, threshold_df, threshold_dm)
-
-def denpendencyGraph(transitions, directFollows, denpendency_measure, threshold_df=0, threshold_dm=0.0):
+def draw_denpendencyGraph(log, threshold_df=0, threshold_dm=0.0, fmt='png', waiting=None, statistic='median',
+                          threshold_l2l=None, threshold_ld=None, directory=OUTPUT_DIRECTORY):
+    """draw a dependency graph for the given event log, return the path of the output file.
+    threshold_l2l: length-two loops a b a with a measure ≥ threshold_l2l keep both of their edges, whatever threshold_dm is
+    threshold_ld: long-distance dependencies with a measure ≥ threshold_ld are added as dashed edges
+    None turns the measure off, otherwise all counts are taken from heuristic_statistics in one scan.
+    """
+    g = dependency_graph(log, threshold_df, threshold_dm, fmt, waiting, statistic, threshold_l2l, threshold_ld)
+    with metrics.stage('dependency_graph.render'):
+        return render_graph(g, directory, fmt)
+
+def dependency_graph(log, threshold_df=0, threshold_dm=0.0, fmt='png', waiting=None, statistic='median', threshold_l2l=None, threshold_ld=None):
+    """return the dependency graph of draw_denpendencyGraph as a graphviz graph without rendering it, see render_graph"""
+    if threshold_l2l is None and threshold_ld is None:
+        with metrics.stage('dependency_graph.measure'):
+            transitions = find_transitions(log)
+            directFollows = _direct_follows_of(log)
+            dm = denpendency_measure(log)
+        return _thresholded_digraph(transitions, directFollows, dm, threshold_df, threshold_dm, fmt, waiting, statistic)
+    with metrics.stage('dependency_graph.measure'):
+        statistics = heuristic_statistics(log)
+        directFollows = statistics['direct_follows']
+        loops, long_distance = set(), {}
+        if threshold_l2l is not None:
+            loops = {pair for pair, m in length_two_loop_measure(statistics).items() if m >= threshold_l2l and pair in directFollows}
+        if threshold_ld is not None:
+            long_distance = {pair: m for pair, m in long_distance_measure(statistics).items() if m >= threshold_ld and pair not in directFollows}
+    return _thresholded_digraph(statistics['transitions'], directFollows, _dependency_of(directFollows), threshold_df, threshold_dm, fmt,
+                                waiting, statistic, loops, long_distance)
+
+def render_graph(g, directory, fmt='png'):
+    """render a graph of dependency_graph, cnet_graph or alpha.petri_net_graph into directory, return the path of the output file.
+    The nodes of a dependency graph are pinned, neato draws them without a layout pass.
+    """
+    return render_cache.export(g, directory, fmt, neato_no_op=g.engine == 'neato')
+
+def denpendencyGraph(transitions, directFollows, denpendency_measure, threshold_df=0, threshold_dm=0.0, fmt='png', waiting=None, statistic='median',
+                     loops=(), long_distance=None, directory=OUTPUT_DIRECTORY):
     """draw a dependency graph using graphviz.
     transitions: a dictionary of transition-frequency pairs
     directfollows: a dictionary of directFollow-frequency pairs
     denpendency_measure: a dictionary of DirectFollow-DependencyMeasure pairs
     threshold_df: threshold for direct follow frequency, given by the user. Default value is zero
     threshold_dm: threshold for dependency measure, given by the user. Default value is zero
+    fmt: output format, 'png', 'svg' or 'dot' (see render_cache.export)
+    waiting: optional dictionary of directFollow-statistics pairs from performance.waiting_times, the given statistic
+    ('mean', 'median' or 'p95') is added to the edge labels and colors the edges from black to red
+    loops: directFollows that are kept whatever the thresholds are, e.g. both edges of a length-two loop
+    long_distance: optional dictionary of pair-measure pairs drawn as dashed edges
+    directory: where the output file is written
+    The first drawing is laid out by dot, the next ones keep the positions of the unfiltered graph (see layout.py),
+    so changing a threshold only redraws the edges.
     """
-    g = graphviz.Digraph(format='png', filename='dependency_graph.gv')
-    g.attr(rankdir = 'LR', height = '10', width='18',  nodesep = '0.5')
+    g = _thresholded_digraph(transitions, directFollows, denpendency_measure, threshold_df, threshold_dm, fmt, waiting, statistic,
+                             loops, long_distance)
+    # render a png/svg file for the dependency graph
+    with metrics.stage('dependency_graph.render'):
+        return render_graph(g, directory, fmt)
+
+def _thresholded_digraph(transitions, directFollows, denpendency_measure, threshold_df=0, threshold_dm=0.0, fmt='png', waiting=None,
+                         statistic='median', loops=(), long_distance=None):
+    positions = None
+    if fmt != 'dot':  # dot sources are laid out by the browser
+        with metrics.stage('dependency_graph.layout'):
+            positions = layout.positions(_dependency_digraph(transitions, directFollows, denpendency_measure, waiting=waiting, statistic=statistic,
+                                                             long_distance=long_distance))
     # filter out the edges below the given thresholds
-    _helper_DG_delete(directFollows, denpendency_measure, threshold_df, threshold_dm)
+    _helper_DG_delete(directFollows, denpendency_measure, threshold_df, threshold_dm, loops)
+    return _dependency_digraph(transitions, directFollows, denpendency_measure, positions, waiting, statistic, long_distance)
+
+def _dependency_digraph(transitions, directFollows, denpendency_measure, positions=None, waiting=None, statistic='median', long_distance=None):
+    """return the graphviz graph of a dependency graph, with positions the nodes are pinned for neato -n"""
+    g = graphviz.Digraph(format='png', filename='dependency_graph.gv', engine='dot' if positions is None else 'neato')
+    g.attr(rankdir = 'LR', height = '10', width='18',  nodesep = '0.5')
+    if positions is not None:
+        g.attr(splines = 'true')
     g.attr('node', shape = 'rectangle', fontsize='18',width='0.7', fixedsize='false', ordering='in') # transitions in rectangle
     for t in sorted(transitions):
-        g.node(t)
+        g.node(t, pos = None if positions is None else layout.pinned(positions, t))
     # add edges between nodes 
     g.attr(rankdir = 'LR', height = '10', width='18',  nodesep = '0.5')
     g.attr('edge', arrowsize='0.6', fontsize='12', forcelabels='true') 
     if len(directFollows) != 0: 
+        # the colors are scaled to the slowest edge of the whole graph, so they don't change with the thresholds
+        largest = max((w[statistic] for w in waiting.values()), default=0.0) if waiting else 0.0
         for edge in sorted(directFollows):
-            g.edge(edge[0], edge[1], label = str(directFollows[edge]) + '(' + str(denpendency_measure[edge]) +')')
-    # render a png file for the dependency graph
-    g.render(directory ='../frontend/static/output', view = False)
-    # g.render(directory ='frontend/static/output', view = False)   # for server
+            label = str(directFollows[edge]) + '(' + str(denpendency_measure[edge]) +')'
+            if waiting and edge in waiting:
+                value = waiting[edge][statistic]
+                g.edge(edge[0], edge[1], label = label + '\n' + statistic + ' ' + performance.duration(value),
+                       color = performance.color(value, largest), fontcolor = performance.color(value, largest))
+            else:
+                g.edge(edge[0], edge[1], label = label)
+    for edge in sorted(long_distance or {}):
+        g.edge(edge[0], edge[1], label = '(' + str(long_distance[edge]) + ')', style = 'dashed')
+    return g
 
-def _helper_DG_delete(frequency_df, denpendency_measure, threshold_df =0, threshold_dm =0.0):
-    """delete directFollows and denpendency_measure pairs that are ≤ given threshold respectively"""
+def _helper_DG_delete(frequency_df, denpendency_measure, threshold_df =0, threshold_dm =0.0, keep=()):
+    """delete directFollows and denpendency_measure pairs that are ≤ given threshold respectively, except the pairs in keep"""
     delete = dict.fromkeys(frequency_df.keys(), 0)
     for k in frequency_df:
+        if k in keep:
+            continue
         if frequency_df[k] < threshold_df or denpendency_measure[k] < threshold_dm:
             delete[k] = 1
     for k in delete:
@@ -145,6 +275,8 @@ def find_first_transitions(event_log):
     """return a set of all initial transitions. Example taken from L1.xes: \n
     find_first_transitions([[a, e, d], [a, c, b, d], [a, b, c, d], [a, b, c, d], [a, b, c, d], [a, c, b, d]]) --> {a}
     """
+    if hasattr(event_log, 'start_counts'):
+        return set(event_log.start_counts())
     intial_transitions = set()
     for case in event_log:
         if case[0] not in intial_transitions:
@@ -156,6 +288,8 @@ def find_last_transitions(event_log):
     """return a set of all last transitions. Example taken from L1.xes: \n
     find_last_transitions([[a, e, d], [a, c, b, d], [a, b, c, d], [a, b, c, d], [a, b, c, d], [a, c, b, d]]) --> {d}
     """
+    if hasattr(event_log, 'end_counts'):
+        return set(event_log.end_counts())
     last_transitions = set()
     for case in event_log:
         if case[-1] not in last_transitions:
@@ -165,23 +299,31 @@ def find_last_transitions(event_log):
 # ========= all the following methods serve for visualization of causal net ========
 
 # step_6:
-def draw_cnet(eventlog):
-    """draw causal net by calling all relevant functions"""
-    transitions = find_transitions(eventlog)
-    trace = traces(eventlog)
-    directFollows = direct_follows(trace)
-    parallel = find_parallel_transitions(directFollows)
-
-    input_bind = input_binding(eventlog)
-    output_bind = output_binding(eventlog)
-    in_bind_freq = in_binding_freq(trace, input_bind, directFollows)
-    out_bind_freq = out_binding_freq(trace, output_bind, directFollows)
-    inbind_labelled = label_input_binding(input_bind, in_bind_freq)
-    outbind_labelled = label_output_binding(output_bind, out_bind_freq)
+def draw_cnet(eventlog, fmt='png', directory=OUTPUT_DIRECTORY):
+    """draw causal net by calling all relevant functions into directory, return the path of the output file"""
+    g = cnet_graph(eventlog)
+    with metrics.stage('cnet.render'):
+        return render_graph(g, directory, fmt)
+
+def cnet_graph(eventlog):
+    """return the causal net of draw_cnet as a graphviz graph without rendering it, see render_graph"""
+    with metrics.stage('cnet.measure'):
+        transitions = find_transitions(eventlog)
+        trace = traces(eventlog)
+        directFollows = direct_follows(trace)
+        parallel = find_parallel_transitions(directFollows)
+
+    with metrics.stage('cnet.bindings'):
+        input_bind = input_binding(eventlog)
+        output_bind = output_binding(eventlog)
+    with metrics.stage('cnet.binding_freq'):
+        in_bind_freq = in_binding_freq(trace, input_bind, directFollows)
+        out_bind_freq = out_binding_freq(trace, output_bind, directFollows)
     
-    nodes = nodes_on_cnet(transitions, directFollows, parallel, out_bind_freq, in_bind_freq, outbind_labelled, inbind_labelled)
-    edges = edges_on_cnet(nodes, directFollows, parallel, outbind_labelled, inbind_labelled)
-    cnet(nodes, edges, directFollows)
+    with metrics.stage('cnet.model'):
+        net = nodes_on_cnet(transitions, directFollows, parallel, out_bind_freq, in_bind_freq)
+        edges = edges_on_cnet(net)
+    return _cnet_digraph(net, edges)
 
 def input_transitions(transitions, direct_follows):
     """return all ingoing transitions of each transition. \n
@@ -189,13 +331,11 @@ def input_transitions(transitions, direct_follows):
     direct_follows: {(a, e): 1, (e, d): 1, (a, c): 2, (c, b): 2, (b, d): 2, (a, b): 3, (b, c): 3, (c, d): 3} \n
     return: {a: [], e: [a], d: [e, b, c], c: [a, b], b: [c, a]}
     """
-    result = {}
-    for t in transitions:
-        input_arc = []
-        for df in direct_follows:
-            if t == df[1]:
-                input_arc.append(df[0])
-        result[t] = input_arc
+    result = {t: [] for t in transitions}
+    # one pass over the direct follows instead of one per transition
+    for df in direct_follows:
+        if df[1] in result:
+            result[df[1]].append(df[0])
     return result
 
 def output_transitions(transitions, direct_follows):
@@ -204,13 +344,10 @@ def output_transitions(transitions, direct_follows):
     direct_follows: {(a, e): 1, (e, d): 1, (a, c): 2, (c, b): 2, (b, d): 2, (a, b): 3, (b, c): 3, (c, d): 3} \n
     return: {a: [e, c, b], e: [d], d: [], c: [b, d], b: [d, c]}
     """
-    result = {}
-    for t in transitions:
-        output_arc = []
-        for df in direct_follows:
-            if t == df[0]:
-                output_arc.append(df[1])
-        result[t] = output_arc
+    result = {t: [] for t in transitions}
+    for df in direct_follows:
+        if df[0] in result:
+            result[df[0]].append(df[1])
     return result
 
 def potential_bindings(in_or_out_transitions):
@@ -368,29 +505,31 @@ def _helper_input_binding_delete(key, binding_set, trace):
             return True
     return False
 
-def cnet(nodes, edges, directFollows):
-    """draw a causal net with given nodes and edges"""
+def cnet(net, edges, fmt='png', directory=OUTPUT_DIRECTORY):
+    """draw a causal net (cnet_model.CNet) with the given edges into directory, fmt is the output format 'png', 'svg' or 'dot'"""
+    return render_cache.export(_cnet_digraph(net, edges), directory, fmt)
+
+def _cnet_digraph(net, edges):
     g = graphviz.Digraph(format='png', filename='cnet.gv')
     g.attr(rankdir = 'LR', height = '10', width='18',  nodesep = '0.5')
-    for n in nodes:
-        if '-' not in n:
-            l = n +'\n'+ str(nodes[n])
-            g.node(n, shape = 'rectangle', fontsize='22',width='0.8', label=l)
+    # graphviz nodes are named by the integer ids of the net, the labels are only assigned here
+    for n in net.nodes:
+        if isinstance(n, cnet_model.Activity):
+            g.node(str(n.id), shape = 'rectangle', fontsize='22',width='0.8', label=n.name +'\n'+ str(n.freq))
         else:
-            g.node(n, shape = 'circle', fontsize='15',width='0.4', fillcolor='lightblue', style='filled',label=str(nodes[n]), fixedsize= 'True')
-    for e in edges:
-        if len(e)==3:
-            g.edge(e[0],e[1], arrowhead = 'none', color='lightblue3',penwidth='2') # different color for binding edges
-        elif e[0][-1] == 'o' or e[0][0]=='1' and '-' not in e[1]:
-            g.edge(e[0],e[1])
-        elif e[0]==e[1]:
-            g.edge(e[0],e[1], label=str(directFollows[e]))
-        elif e[0][0] == 'o' or e[1][-1] == 'o':
-            g.edge(e[0],e[1], arrowhead = 'none', minlen= '5')
+            g.node(str(n.id), shape = 'circle', fontsize='15',width='0.4', fillcolor='lightblue', style='filled',label=str(n.freq), fixedsize= 'True')
+    for tail, head, style in edges:
+        if style == 'bind':
+            g.edge(str(tail), str(head), arrowhead = 'none', color='lightblue3',penwidth='2') # different color for binding edges
+        elif style == 'arrow':
+            g.edge(str(tail), str(head))
+        elif style == 'loop':
+            g.edge(str(tail), str(head), label=str(net.arc(tail, head).freq))
+        elif style == 'long':
+            g.edge(str(tail), str(head), arrowhead = 'none', minlen= '5')
         else:
-            g.edge(e[0],e[1], arrowhead = 'none')
-    g.render(directory ='../frontend/static/output', view = False)
-    # g.render(directory ='frontend/static/output', view = False)   for server
+            g.edge(str(tail), str(head), arrowhead = 'none')
+    return g
 
 def out_binding_freq(trace, out_binding, directFollows):
     """mark the binding nodes with their frequencies. Example from L1.xes: \n
@@ -498,217 +637,96 @@ def _helper_key_to_string(trace):
             str_trace[str_key] = trace[t]
     return str_trace
 
-def label_output_binding(out_binding, out_binding_freq):
-    """label only the output binding nodes with the order, in which it apprears in the out_bind. 
-    DirectFollow arcs without binding are ommitted. Example taken from L1.xes: \n
-    out_binding: {a: [{e}, {b}, {b, c}], e: [{d}], d: [], c: [{d}], b: [{d}, {c}]} \n
-    out_binding_freq: {a: [({e}, 1), ({b}, 1), ({b, c}, 4)], e: [({d}, 1)], d: [], c: [({d}, 3)], b: [({d}, 2), ({c}, 3)]} \n
-    return: {a: [[[a-b1], 1], [[a-b2, a-c1], 4]], e: [], d: [], c: [], b: []}
-    """
-    out_freq = _helper_freq(out_binding)
-    out_bind = _helper_set_to_list(out_binding_freq)
-    # label binding nodes
-    for key in out_freq:
-        for i in out_freq[key]:
-            j=1
-            for k in out_bind[key]:
-                if out_freq[key][i] == 1 and i in k[0] and len(k[0])==1: # direct follow arc without black dots
-                    k[0]=[]
-                else: 
-                    for t in range(len(k[0])):
-                        if i==k[0][t]:
-                            k[0][t] = key+'-'+i+str(j)
-                            j += 1 
-    # remove direct follow arcs that have no black dots
-    result = {}
-    for key in out_bind:
-        l = []
-        for pair in out_bind[key]:
-            if len(pair[0]) !=0 and pair[1] !=0:  # special case pair[1]!=0: exclude freq=1
-                l.append(pair)
-        result[key] = l
-    return result
-
-def label_input_binding(in_binding, in_binding_freq):
-    """label only the input binding nodes with the order, in which it apprears in the in_bind. 
-    DirectFollow arcs without binding are ommitted. Example taken from L1.xes: \n
-    in_binding: {a: [], e: [{a}], d: [{e}, {c}, {b, c}], c: [{a}, {b}], b: [{a}]} \n
-    in_binding_freq: {a: {a: [], e: [({a}, 1)], d: [({e}, 1), ({c}, 1), ({b, c}, 4)], c: [({a}, 2), ({b}, 3)], b: [({a}, 3)]} \n
-    return: {a: [], e: [], d: [[[1c-d], 1], [[1b-d, 2c-d], 4]], c: [], b: []} 
-    """
-    out_freq = _helper_freq(in_binding)
-    in_bind = _helper_set_to_list(in_binding_freq)
-    # label binding nodes
-    for key in out_freq:
-        for i in out_freq[key]:
-            j=1
-            for k in in_bind[key]:
-                 if out_freq[key][i] == 1 and i in k[0] and len(k[0])==1: # direct follow arc without black dots
-                    k[0]=[]
-                 else:
-                    for t in range(len(k[0])):
-                        if i==k[0][t]:
-                            k[0][t] = str(j)+i+'-'+key
-                            j += 1 
-    result = {}
-    for key in in_bind:
-        l = []
-        for pair in in_bind[key]:
-            if len(pair[0]) !=0 and pair[1] !=0:
-                l.append(pair)
-        result[key] = l
-    return result
-
-def _helper_freq(bindings):
-    """calculate the frequencies of transitions in the bindings. \n
-    _freq({a: [{b},{d},{c,d}, {b,c,d}], e: [{b},{d},{c,d},{b,c,d}]}) --> {a: {c: 2, d: 3, b: 2}, e: {c: 2, d: 3, b: 2}}
-    """
-    freq = {}
-    for key in bindings:
-        sub_freq = {}
-        flatt =  [t for subset in bindings[key] for t in subset]
-        s = set(flatt)
-        for i in s:
-            appear = 0
-            for j in flatt:
-                if i==j:
-                    appear += 1
-                sub_freq[i] = appear
-        freq[key] = sub_freq
-    return freq
-
-def _helper_set_to_list(binding_freq):
-    """convert for example {'a': [({'b'}, 8)} to {'a': [['b'], 8]}"""
-    out_bind = {}
-    for key in binding_freq:
-        li = []
-        for tuple in binding_freq[key]:
-            l = list(tuple)
-            l[0] = list(l[0])
-            li.append(l)
-        out_bind[key] = li
-    return out_bind
-
-def nodes_on_cnet(transitions, directFollows, parallel, out_binding_freq, in_binding_freq, output_bind_labelled, input_bind_labelled):
-    """create nodes for the causal net. Example taken from L1.xes \n
+def nodes_on_cnet(transitions, directFollows, parallel, out_binding_freq, in_binding_freq):
+    """create the nodes of the causal net: activities, arcs, binding points and binding groups (see cnet_model.py). 
+    Example taken from L1.xes \n
     transitions: {a: 6, e: 1, d: 6, c: 5, b: 5} \n
     directFollows: {(a, e): 1, (e, d): 1, (a, c): 2, (c, b): 2, (b, d): 2, (a, b): 3, (b, c): 3, (c, d): 3} \n
     parallel: {(c, b): 2, (b, c): 2} \n
     out_binding_freq: {a: [({e}, 1), ({b}, 1), ({b, c}, 4)], e: [({d}, 1)], d: [], c: [({d}, 3)], b: [({d}, 2), ({c}, 3)]} \n
     in_binding_freq: {a: [], e: [({a}, 1)], d: [({e}, 1), ({c}, 1), ({b, c}, 4)], c: [({a}, 2), ({b}, 3)], b: [({a}, 3)]} \n
-    output_bind_labelled: {a: [[[a-b1], 1], [[a-c1, a-b2], 4]], e: [], d: [], c: [], b: []} \n
-    input_bind_labelled: {a: [], e: [], d: [[[1c-d], 1], [[2c-d, 1b-d], 4]], c: [], b: []} \n
-    return: {a: 6, e: 1, d: 6, c: 5, b: 5, a-b1: 1, a-c1: 4, a-b2: 4, 1c-d: 1, 2c-d: 4, 1b-d: 4, a-e-i: 1, a-e-o: 1, e-d-i: 1, e-d-o: 1, a-co: 4, ob-d: 4, a-bo: 5, oc-d: 5}
+    return: a CNet with the activities a: 6, e: 1, d: 6, c: 5, b: 5, the binding points a->b: [1, 4], a->c: [4], c->d: [1, 4], 
+    b->d: [4], the end points a->b: 5, a->c: 4, b->d: 4, c->d: 5 and the plain point pairs a->e: 1, e->d: 1
     """
-    nodes = transitions
-    # add binding nodes onto output arcs
-    for key in output_bind_labelled:
-        for pair in output_bind_labelled[key]:
-            if not _helper_contain_parallel(pair, parallel): # bug fix for L5
-                for pair_0 in pair[0]:
-                    nodes[pair_0] = pair[1]
-    # add binding nodes onto input arcs
-    for key in input_bind_labelled:
-        for pair in input_bind_labelled[key]:
-            if not _helper_contain_parallel(pair, parallel): # bug fix for L5
-                for pair_0 in pair[0]:
-                    if pair_0[1:]+pair_0[0] not in nodes: # aviod dulpicates
-                        nodes[pair_0] = pair[1]
-    # add non binding nodes
+    net = cnet_model.CNet()
+    for t in transitions:
+        net.add_activity(t, transitions[t])
     for df in directFollows:
-        if df in parallel:
+        net.add_arc(net.activity_id(df[0]), net.activity_id(df[1]), directFollows[df], df in parallel)
+    # add binding points onto output arcs, then onto input arcs
+    _add_bindings(net, out_binding_freq, cnet_model.OUTPUT)
+    _add_bindings(net, in_binding_freq, cnet_model.INPUT)
+    # add non binding points
+    for arc in net.arcs:
+        if arc.parallel:
             pass
-        elif df[0]+'-'+df[1]+'1' in nodes: # on output arc
-            binded_freq = 0
-            for pair in out_binding_freq[df[0]]:
-                if len(pair[0])>1 and df[1] in pair[0]:
-                    binded_freq += int(pair[1]/2)
-            nodes[df[0]+'-'+df[1]+'o'] = directFollows[df]+binded_freq
-        elif '1'+df[0]+'-'+df[1] in nodes:   # on input arc
-            binded_freq = 0
-            for pair in in_binding_freq[df[1]]:
-                if len(pair[0])>1 and df[0] in pair[0]:
-                    binded_freq += int(pair[1]/2)
-            nodes['o'+df[0]+'-'+df[1]] = directFollows[df]+binded_freq
-        else:  # no binding nodes on this direct follow arcs
-            nodes[df[0]+'-'+df[1]+'-'+'i'] = nodes[df[0]+'-'+df[1]+'-'+'o'] = directFollows[df]
-    return nodes
-
-def _helper_contain_parallel(pair, parallel):
-    """return true if binding list contains transition that is parallel with the key"""
-    for i in pair[0]:
-        index = i.index('-')
-        if i[0].isnumeric() and (i[1:index], i[index+1:]) in parallel:   #input binding nodes like 1e-b
-            return True
-        elif i[-1].isnumeric() and (i[0:index],i[index+1:-1]) in parallel:  #output binding nodes like b-e1
-            return True
-    return False
+        elif arc.side is None:  # no binding points on this direct follow arc
+            arc.ends = [net.add_point(arc.id, arc.freq), net.add_point(arc.id, arc.freq)]
+        else:
+            arc.ends = [net.add_point(arc.id, arc.freq + arc.bound[arc.side])]
+    return net
 
-def edges_on_cnet(nodes, directFollows, parallel, output_bind_labelled, input_bind_labelled):
-    """create edges for the causal net. Example taken from L1.xes: \n
-    return: [('1b-d', 'd'), ('1c-d', 'd'), ('2c-d', '1b-d', 'bind'), ('2c-d', '1c-d'), ('a', 'a-e-i'), ('a', 'a-b1'), ('a', 'a-c1'), 
-    ('a-b1', 'a-b2'), ('a-b2', 'a-bo'), ('a-bo', 'b'), ('a-c1', 'a-b2', 'bind'), ('a-c1', 'a-co'), ('a-co', 'c'), ('a-e-i', 'a-e-o'), 
-    ('a-e-o', 'e'), ('b', 'ob-d'), ('c', 'oc-d'), ('e', 'e-d-i'), ('e-d-i', 'e-d-o'), ('e-d-o', 'd'), ('ob-d', '1b-d'), ('oc-d', '2c-d')]
-    [('2c-d', '1b-d', 'bind'), ('a-c1', 'a-b2', 'bind')]
+def _add_bindings(net, binding_freq, side):
+    """add the binding points and binding groups of all output (or input) bindings to the net.
+    binding_freq: result of out_binding_freq (or in_binding_freq)
     """
-    edges = set()
-    # connect nodes on direct follow arcs
-    for df in directFollows:
-        if df[0]==df[1]:
-            edges.add(df)
-        elif df in parallel:
-            pass
-        elif df[0]+'-'+df[1]+'-'+'i' in nodes: # direct follow arcs without binding on it
-            edges.add((df[0], df[0]+'-'+df[1]+'-'+'i'))
-            edges.add((df[0]+'-'+df[1]+'-'+'i',df[0]+'-'+df[1]+'-'+'o'))
-            edges.add((df[0]+'-'+df[1]+'-'+'o',df[1]))
-        elif df[0]+'-'+df[1]+'1' in nodes: # output arc with binding
-            j = 1
-            label = df[0]+'-'+df[1]
-            while True:  # connect blue dots on output arcs
-                if j==1:  
-                    edges.add((df[0],label+str(j))) # (a,a-b1)
-                elif j > 1 and label+str(j) in nodes:
-                    edges.add((label+str(j-1),label+str(j)))  # (a-b1, a-b2).
-                else:
-                    edges.add((label+str(j-1),label+'o')) # (a-b2, a-bo)
-                    edges.add((label+'o',df[1])) # (a-bo,b)
-                    break
-                j += 1  
-        elif '1'+df[0]+'-'+df[1] in nodes: # input arc with binding
-                j = 1
-                label = df[0]+'-'+df[1]
-                while True:  #  connect blue dots on input arcs
-                    if j==1:  
-                        edges.add((str(j)+label, df[1])) # (1b-e,e)
-                    elif j > 1 and str(j)+label in nodes:
-                        edges.add((str(j)+label, str(j-1)+label))  # (2b-e, 1b-e)
-                    else:                      
-                        edges.add(('o'+label, str(j-1)+label)) # (ob-e, 2b-e)
-                        edges.add((df[0],'o'+label)) # (b,ob-e)
-                        break
-                    j += 1  
-    # connect nodes that are binded as parallel pairs
-    edges.update(_helper_bind(parallel, output_bind_labelled, input_bind_labelled)) 
-    return sorted(edges, key=lambda x:x[0])
-    
-def _helper_bind(parallel, input_bind_labelled, output_bind_labelled):
-    """connect the binding nodes. Example taken from L1.xes: \n
-    parallel: {(c, b): 2, (b, c): 2} \n
-    output_bind_labelled: {a: [[[a-b1], 1], [[a-b2, a-c1], 4]], e: [], d: [], c: [], b: []} \n
-    input_bind_labelled: {a: [], e: [], d: [[[1c-d], 1], [[1b-d, 2c-d], 4]], c: [], b: []} \n
-    return: [(a-b2, a-c1, bind), (1b-d, 2c-d, bind)]
+    for key in binding_freq:
+        activity = net.activity_id(key)
+        if side == cnet_model.OUTPUT:
+            arc_to = lambda t: net.arc(activity, net.activity_id(t))
+        else:
+            arc_to = lambda t: net.arc(net.activity_id(t), activity)
+        # number of bindings each transition takes part in
+        appear = {}
+        for subset, _ in binding_freq[key]:
+            for t in subset:
+                appear[t] = appear.get(t, 0) + 1
+        for subset, freq in binding_freq[key]:
+            arcs = [arc_to(t) for t in subset]
+            if len(arcs) > 1:
+                for arc in arcs:
+                    arc.bound[side] += int(freq/2)
+            # a transition that is bound alone and only once is a direct follow arc without dots
+            if freq == 0 or len(subset) == 1 and appear[next(iter(subset))] == 1:
+                continue
+            if any(arc.parallel for arc in arcs): # bug fix for L5
+                continue
+            points = []
+            for arc in arcs:
+                if arc.side not in (None, side): # the arc already carries the dots of an output binding
+                    continue
+                arc.side = side
+                arc.points.append(net.add_point(arc.id, freq))
+                points.append(arc.points[-1])
+            if points:
+                net.add_group(activity, side, points, freq)
+
+def edges_on_cnet(net):
+    """create edges for the causal net as (tail id, head id, style) triples, style is one of 'arrow', 'line',
+    'long' (line with a minimum length), 'loop' or 'bind' (connects the dots of one binding). Example taken from L1.xes: \n
+    output arc a->b: a -line- dot 1 -line- dot 2 -long- end point -arrow-> b \n
+    input arc b->d: b -line- start point -long- dot 1 -arrow-> d \n
+    arc without dots a->e: a -line- in point -long- out point -arrow-> e \n
+    bindings: dot 1 of a->c -bind- dot 2 of a->b, dot 2 of c->d -bind- dot 1 of b->d
     """
     edges = []
-    for key in input_bind_labelled:
-        for i in input_bind_labelled[key]:
-            if len(i[0]) > 1 and not _helper_contain_parallel(i, parallel):
-                for j in range(len(i[0])-1):
-                    # 'bind' serves as an identifier of binding edges and later a different color used in method 'cnet'
-                    edges.append((i[0][j],i[0][j+1],'bind'))  
-    for key in output_bind_labelled:
-        for i in output_bind_labelled[key]:
-          if len(i[0]) > 1 and not _helper_contain_parallel(i, parallel):
-                for j in range(len(i[0])-1):
-                    edges.append((i[0][j],i[0][j+1],'bind')) 
+    for arc in net.arcs:
+        if arc.source == arc.target:
+            edges.append((arc.source, arc.target, 'loop'))
+        elif arc.parallel:
+            pass
+        elif arc.side is None:
+            i, o = arc.ends
+            edges += [(arc.source, i, 'line'), (i, o, 'long'), (o, arc.target, 'arrow')]
+        elif arc.side == cnet_model.OUTPUT:
+            chain = [arc.source] + arc.points
+            edges += [(a, b, 'line') for a, b in zip(chain, chain[1:])]
+            edges += [(arc.points[-1], arc.ends[0], 'long'), (arc.ends[0], arc.target, 'arrow')]
+        else:
+            edges += [(arc.source, arc.ends[0], 'line'), (arc.ends[0], arc.points[-1], 'long')]
+            edges += [(b, a, 'line') for a, b in zip(arc.points, arc.points[1:])]
+            edges.append((arc.points[0], arc.target, 'arrow'))
+    # connect the dots that belong to the same binding
+    for group in net.groups:
+        edges += [(a, b, 'bind') for a, b in zip(group.points, group.points[1:])]
     return edges
@@ -0,0 +1,108 @@
+"""
+This module helps the app to let browsers cache the mined artifacts and to compress its text responses.
+
+The images of the miners are written under fixed names (petri_net.gv.png, ...), so a browser cannot tell the model of
+one upload from the next. publish() copies an image to ARTIFACT_DIRECTORY under a name that contains the hash of its
+content: the same url always shows the same image, it can be cached forever (immutable) and validated by its hash (ETag).
+The directory keeps the MAX_ARTIFACTS most recently published files.
+
+compress() encodes html, json, svg and other text bodies with brotli if the client accepts it and the brotli package
+is installed, with gzip otherwise.
+
+Example:
+    name = http_cache.publish('../frontend/static/output/petri_net.gv.png')   # petri_net.gv-3f1c9a0b2d4e6f70.png
+    http_cache.etag_of(name)                                                   # 3f1c9a0b2d4e6f70
+    body, encoding = http_cache.compress(html.encode(), 'text/html', 'gzip, deflate, br')
+"""
+
+import gzip, hashlib, os, tempfile
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, responses are compressed with gzip without it
+    brotli = None
+
+ARTIFACT_DIRECTORY = '../frontend/static/output/artifacts'
+# ARTIFACT_DIRECTORY = 'frontend/static/output/artifacts'   # for server
+MAX_ARTIFACTS = 512
+DIGEST_LENGTH = 16
+# a year, the longest max-age browsers honour
+MAX_AGE = 365 * 24 * 60 * 60
+
+COMPRESSIBLE = ('text/html', 'text/plain', 'text/css', 'application/json', 'application/javascript', 'image/svg+xml')
+# smaller bodies don't get smaller enough to be worth the time
+MIN_SIZE = 512
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+def publish(path, directory=ARTIFACT_DIRECTORY, max_files=MAX_ARTIFACTS):
+    """copy the file to directory under a name with the hash of its content and return that name"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+    stem, extension = os.path.splitext(os.path.basename(path))
+    name = '{}-{}{}'.format(stem, digest, extension)
+    target = os.path.join(directory, name)
+    os.makedirs(directory, exist_ok=True)
+    if os.path.exists(target):
+        os.utime(target)  # published again, evicted last
+        return name
+    # write to a temporary file first, so a concurrent request never reads half an image
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(handle, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, target)
+    _evict(directory, max_files, keep=name)
+    return name
+
+def _evict(directory, max_files, keep):
+    files = [f for f in os.listdir(directory) if not f.endswith('.tmp') and f != keep]
+    if len(files) < max_files:
+        return
+    files.sort(key=lambda f: os.path.getmtime(os.path.join(directory, f)))
+    for f in files[:len(files) - max_files + 1]:
+        try:
+            os.remove(os.path.join(directory, f))
+        except FileNotFoundError:  # evicted by another request
+            pass
+
+def etag_of(name):
+    """return the content hash in the name of a published file"""
+    return os.path.splitext(name)[0].rsplit('-', 1)[-1]
+
+def accepted_encodings(accept_encoding):
+    """return the encodings of an Accept-Encoding header with their quality, e.g. 'gzip, br;q=0.5' --> {gzip: 1.0, br: 0.5}"""
+    encodings = {}
+    for part in accept_encoding.split(','):
+        name, _, parameters = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        parameter = parameters.strip()
+        if parameter.startswith('q='):
+            try:
+                quality = float(parameter[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+def choose_encoding(accept_encoding):
+    """return 'br', 'gzip' or None for an Accept-Encoding header, brotli first if it is installed"""
+    encodings = accepted_encodings(accept_encoding)
+    for encoding in ('br', 'gzip') if brotli is not None else ('gzip',):
+        if encodings.get(encoding, encodings.get('*', 0)) > 0:
+            return encoding
+    return None
+
+def compress(body, mimetype, accept_encoding):
+    """return (body, encoding) for a response, encoding is None if the body is sent as it is"""
+    if mimetype not in COMPRESSIBLE or len(body) < MIN_SIZE:
+        return body, None
+    encoding = choose_encoding(accept_encoding)
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY), encoding
+    if encoding == 'gzip':
+        return gzip.compress(body, GZIP_LEVEL, mtime=0), encoding
+    return body, None
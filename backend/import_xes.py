@@ -1,13 +1,102 @@
-import pm4py
+import numpy as np
+import metrics
+
+# pm4py and pandas are imported by the methods that need them, importing this module stays fast
 
 class importer:
-    def read_xes(self, xes_file_path):
-        log = pm4py.read_xes(xes_file_path)
-        event_log = []
-        for trace in log:
-            t = []
-            for event in trace:
-                if event.get('lifecycle:transition') == 'complete' or event.get('lifecycle:transition') is None:
-                    t.append(event.get('concept:name'))
-            event_log.append(t)
+    def read_xes(self, xes_file_path, variant_tree=None):
+        """return the event log of a xes file as a 2D-array of transitions.
+        variant_tree: optional variant_tree.VariantTree, every parsed trace is added to it in the same pass
+        """
+        import pm4py
+        with metrics.stage('read_xes.parse'):
+            log = pm4py.read_xes(xes_file_path)
+        with metrics.stage('read_xes.convert'):
+            event_log = []
+            events, activities = 0, set()
+            for trace in log:
+                t = []
+                for event in trace:
+                    if event.get('lifecycle:transition') == 'complete' or event.get('lifecycle:transition') is None:
+                        t.append(event.get('concept:name'))
+                event_log.append(t)
+                events += len(t)
+                activities.update(t)
+                if variant_tree is not None:
+                    variant_tree.add(t)
+        # the variants are only known from a variant tree, counting them here would take another pass over the log
+        variants = variant_tree.count_variants() if variant_tree is not None else None
+        metrics.observe_log(events, variants, len(activities))
         return event_log
+
+    def read_xes_arrays(self, xes_file_path, timestamps=False):
+        """return the xes file in columnar form: (activities, codes, offsets, timestamps).
+        activities: list of activity names, codes[i] is the index of the i-th event's activity
+        offsets: case k consists of codes[offsets[k]:offsets[k+1]]
+        timestamps: seconds since epoch aligned with codes (nan if missing), or None if not requested
+        Lifecycle states are filtered as in read_xes.
+        """
+        import pm4py
+        with metrics.stage('read_xes.parse'):
+            log = pm4py.read_xes(xes_file_path)
+        with metrics.stage('read_xes.convert'):
+            index = {}
+            codes, offsets, times = [], [0], []
+            for trace in log:
+                for event in trace:
+                    if event.get('lifecycle:transition') == 'complete' or event.get('lifecycle:transition') is None:
+                        codes.append(index.setdefault(event.get('concept:name'), len(index)))
+                        if timestamps:
+                            ts = event.get('time:timestamp')
+                            times.append(ts.timestamp() if ts is not None else np.nan)
+                offsets.append(len(codes))
+            times = np.asarray(times, dtype=np.float64) if timestamps else None
+        metrics.observe_log(events=len(codes), activities=len(index))
+        return list(index), np.asarray(codes, dtype=np.int32), np.asarray(offsets, dtype=np.int32), times
+
+    def read_csv(self, csv_file_path, case_column='case:concept:name', activity_column='concept:name',
+                 timestamp_column='time:timestamp', lifecycle_column='lifecycle:transition', sep=','):
+        """return the event log of a flat csv file (one event per row) as a 2D-array of transitions, just like read_xes.
+        Only the case, activity, timestamp and lifecycle columns are read; the last two are optional.
+        Events are filtered on their lifecycle the same way as in read_xes, then sorted by case and timestamp.
+        Cases keep the order in which they first appear in the file.
+        """
+        activities, codes, offsets, _ = self.read_csv_arrays(csv_file_path, case_column, activity_column,
+                                                             timestamp_column, lifecycle_column, sep)
+        if len(codes) == 0:
+            return []
+        names = np.asarray(activities, dtype=object)[codes]
+        return [trace.tolist() for trace in np.split(names, offsets[1:-1])]
+
+    def read_csv_arrays(self, csv_file_path, case_column='case:concept:name', activity_column='concept:name',
+                        timestamp_column='time:timestamp', lifecycle_column='lifecycle:transition', sep=',', timestamps=False):
+        """return the csv file in the same columnar form as read_xes_arrays: (activities, codes, offsets, timestamps)."""
+        import pandas as pd
+        wanted = (case_column, activity_column, timestamp_column, lifecycle_column)
+        with metrics.stage('read_csv.parse'):
+            df = pd.read_csv(csv_file_path, sep=sep, usecols=lambda c: c in wanted,
+                             dtype={case_column: str, activity_column: str, lifecycle_column: str})
+        with metrics.stage('read_csv.convert'):
+            # keep only events without lifecycle or with 'complete' lifecycle
+            if lifecycle_column in df.columns:
+                lifecycle = df[lifecycle_column].to_numpy()
+                df = df[pd.isna(lifecycle) | (lifecycle == 'complete')]
+            case_codes, _ = pd.factorize(df[case_column], sort=False)
+            activity_codes, activities = pd.factorize(df[activity_column], sort=False)
+            # stable sort by case, then by timestamp within a case
+            times = None
+            if timestamp_column in df.columns:
+                ts = pd.to_datetime(df[timestamp_column], utc=True)
+                order = np.lexsort((ts.dt.tz_convert(None).to_numpy().astype('int64'), case_codes))
+                if timestamps:
+                    times = (ts - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy(dtype=np.float64)[order]
+            else:
+                order = np.argsort(case_codes, kind='stable')
+            if timestamps and times is None:
+                times = np.full(len(order), np.nan)
+            case_codes = case_codes[order]
+            # a new trace starts wherever the case code changes
+            boundaries = np.flatnonzero(np.diff(case_codes)) + 1
+            offsets = np.concatenate(([0], boundaries, [len(case_codes)])) if len(case_codes) else np.zeros(1)
+        metrics.observe_log(events=len(order), activities=len(activities))
+        return list(activities), activity_codes[order].astype(np.int32), offsets.astype(np.int32), times
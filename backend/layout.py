@@ -0,0 +1,64 @@
+"""
+This module keeps the node positions of graphs that are drawn again and again with different filters.
+
+The dependency graph of a log is redrawn whenever the user changes threshold_df or threshold_dm. Every time, dot solved
+the whole layout again, which is slow and moves the nodes around between two renders. Instead, the layout of the full
+(unfiltered) graph is solved once with graphviz and its node positions are kept in memory, keyed by the hash of the
+full graph. A filtered graph pins its nodes to these positions and is drawn by `neato -n`, which only routes the edges.
+The first drawing of a graph is laid out by dot as usual, solving the full layout as well would run graphviz twice
+for one image. The layout is solved when the same graph is drawn again, e.g. after a threshold changed.
+
+Example:
+    positions = layout.positions(full_graph)          # None the first time, then a layout solve once and a lookup
+    g.node('a', pos=layout.pinned(positions, 'a'))    # pos="27,18!"
+    render_cache.export(g, directory, 'png', neato_no_op=True)
+"""
+
+import json, threading
+from collections import OrderedDict
+import render_cache
+
+MAX_LAYOUTS = 64
+
+_layouts = OrderedDict()  # graph key -> {node: (x, y)}, or None if drawn once, least recently used first
+_lock = threading.Lock()
+
+def parse_positions(layout_json):
+    """return a dictionary of node-(x, y) pairs from the json output of graphviz, positions are in points"""
+    positions = {}
+    for obj in json.loads(layout_json).get('objects', []):
+        # clusters are objects as well, only nodes carry a position
+        if 'pos' in obj and 'nodes' not in obj:
+            x, y = obj['pos'].split(',')
+            positions[obj['name']] = (float(x), float(y))
+    return positions
+
+def positions(graph):
+    """return the node positions of the graph, None the first time the graph is seen (dot lays out that drawing).
+    The layout is solved by graphviz the second time, then it is a dictionary lookup.
+    """
+    key = render_cache.graph_key(graph)
+    with _lock:
+        if key not in _layouts:
+            _layouts[key] = None
+            _evict()
+            return None
+        _layouts.move_to_end(key)
+        if _layouts[key] is not None:
+            return _layouts[key]
+    result = parse_positions(graph.pipe(format='json', encoding='utf-8'))
+    with _lock:
+        _layouts[key] = result
+        _evict()
+    return result
+
+def _evict():
+    while len(_layouts) > MAX_LAYOUTS:
+        _layouts.popitem(last=False)
+
+def pinned(positions, node):
+    """return the pos attribute that pins the node to its position, None if the node has no position"""
+    if node not in positions:
+        return None
+    x, y = positions[node]
+    return '{:g},{:g}!'.format(x, y)
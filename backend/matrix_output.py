@@ -0,0 +1,135 @@
+"""
+This module renders the footprint matrix (Alpha miner) and the dependency, length-two loop and long-distance measure
+matrices (heuristic miner) as HTML tables or JSON, directly from the relations, without pandas, dataframe_image or matplotlib.
+
+A matrix is given by its sorted labels and a cell function, so only the cells of the requested page are computed.
+Large alphabets are split into pages of PAGE_SIZE rows and PAGE_SIZE columns.
+The relations are sparse, with thousands of activities almost every cell is '#' or 0: coo() lists only the other cells,
+found from the observed pairs, in time and size proportional to the direct follows instead of the n² cells.
+
+Example:
+    m = matrix_output.footprint(event_log)
+    p = matrix_output.page(m, row_page=0, col_page=1)
+    html = matrix_output.to_html(p, 'The Footprint Matrix')
+"""
+
+from html import escape
+import alpha, heuristic_miner as hm
+
+PAGE_SIZE = 40
+
+class Matrix:
+    """square matrix over the sorted transitions, cell(row, column) returns the value of one cell.
+    pairs: the (row, column) pairs whose cell may differ from default, every other cell is default
+    """
+    def __init__(self, kind, labels, cell, pairs=(), default=0):
+        self.kind = kind
+        self.labels = labels
+        self.cell = cell
+        self.pairs = pairs
+        self.default = default
+
+def _both_directions(pairs):
+    return set(pairs) | {(c, r) for r, c in pairs}
+
+def footprint(event_log):
+    """return the footprint matrix of the event log"""
+    df = alpha._direct_follows(event_log)
+    return Matrix('footprint', sorted(alpha.find_transitions(event_log)), lambda r, c: alpha.footprint_relation(df, r, c),
+                  _both_directions(df), '#')
+
+def dependency(event_log):
+    """return the dependency measure matrix of the event log"""
+    dm = hm.denpendency_measure(event_log)
+    return Matrix('dependency', sorted(hm.find_transitions(event_log)), lambda r, c: hm.dependency_value(dm, r, c),
+                  _both_directions(dm))
+
+def heuristic(event_log):
+    """return the dependency, length-two loop and long-distance matrices of the event log as a dictionary kind-Matrix,
+    all counted in a single scan (see heuristic_miner.heuristic_statistics)
+    """
+    statistics = hm.heuristic_statistics(event_log)
+    labels = sorted(statistics['transitions'])
+    dm = hm._dependency_of(statistics['direct_follows'])
+    l2l = hm.length_two_loop_measure(statistics)
+    ld = hm.long_distance_measure(statistics)
+    return {
+        'dependency': Matrix('dependency', labels, lambda r, c: hm.dependency_value(dm, r, c), _both_directions(dm)),
+        'length_two_loop': Matrix('length_two_loop', labels, lambda r, c: l2l.get((r, c), 0), l2l.keys()),
+        'long_distance': Matrix('long_distance', labels, lambda r, c: ld.get((r, c), 0), ld.keys()),
+    }
+
+def _pages(n, page_size):
+    return max(1, -(-n // page_size))
+
+def page(matrix, row_page=0, col_page=0, page_size=PAGE_SIZE):
+    """return one page of the matrix as a dictionary: rows, columns, cells and the paging information"""
+    pages = _pages(len(matrix.labels), page_size)
+    row_page = min(max(row_page, 0), pages - 1)
+    col_page = min(max(col_page, 0), pages - 1)
+    rows = matrix.labels[row_page * page_size:(row_page + 1) * page_size]
+    columns = matrix.labels[col_page * page_size:(col_page + 1) * page_size]
+    return {
+        'kind': matrix.kind,
+        'rows': rows,
+        'columns': columns,
+        'cells': [[matrix.cell(r, c) for c in columns] for r in rows],
+        'row_page': row_page,
+        'col_page': col_page,
+        'pages': pages,
+    }
+
+def coo(matrix):
+    """return the cells that differ from the default in coordinate format, sorted by row and column:
+    {kind, labels, default, row: [label index], col: [label index], data: [value]}
+    """
+    index = {label: i for i, label in enumerate(matrix.labels)}
+    cells = []
+    for r, c in matrix.pairs:
+        value = matrix.cell(r, c)
+        if value != matrix.default:
+            cells.append((index[r], index[c], value))
+    cells.sort(key=lambda cell: cell[:2])
+    return {
+        'kind': matrix.kind,
+        'labels': matrix.labels,
+        'default': matrix.default,
+        'row': [cell[0] for cell in cells],
+        'col': [cell[1] for cell in cells],
+        'data': [cell[2] for cell in cells],
+    }
+
+def _cell_html(kind, value):
+    if kind in ('dependency', 'length_two_loop', 'long_distance'):
+        # heatmap: positive measures green, negative measures red
+        color = '2, 186, 91' if value >= 0 else '214, 69, 65'
+        return '<td style="background-color: rgba({}, {:.2f})">{:.2f}</td>'.format(color, min(abs(value), 1), value)
+    return '<td>' + escape(str(value)) + '</td>'
+
+def to_html(matrix_page, caption, link=None):
+    """return the page as a HTML table.
+    link: optional url prefix, e.g. '/matrix/footprint?format=html', used for the links to the neighbouring pages
+    """
+    p = matrix_page
+    parts = ['<table class="matrix-table"><caption>', escape(caption), '</caption><tr><th></th>']
+    parts.extend('<th>' + escape(c) + '</th>' for c in p['columns'])
+    parts.append('</tr>')
+    for row, cells in zip(p['rows'], p['cells']):
+        parts.append('<tr><th>' + escape(row) + '</th>')
+        parts.extend(_cell_html(p['kind'], v) for v in cells)
+        parts.append('</tr>')
+    parts.append('</table>')
+    if link is not None and p['pages'] > 1:
+        parts.append('<p class="matrix-pages">rows {}/{}, columns {}/{}:'.format(p['row_page'] + 1, p['pages'], p['col_page'] + 1, p['pages']))
+        moves = [('↑', p['row_page'] - 1, p['col_page']), ('↓', p['row_page'] + 1, p['col_page']),
+                 ('←', p['row_page'], p['col_page'] - 1), ('→', p['row_page'], p['col_page'] + 1)]
+        for arrow, r, c in moves:
+            if 0 <= r < p['pages'] and 0 <= c < p['pages']:
+                href = '{}&row_page={}&col_page={}'.format(link, r, c)
+                parts.append(' <a href="{}">{}</a>'.format(escape(href), arrow))
+        parts.append('</p>')
+    return ''.join(parts)
+
+def to_json(matrix_page):
+    """return the page as a json-serializable dictionary for a client-side heatmap"""
+    return dict(matrix_page)
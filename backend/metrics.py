@@ -0,0 +1,97 @@
+"""
+This module records how long the stages of the miners take and how large the mined logs are, in in-process histograms
+that the app exposes in the Prometheus text format on /metrics.
+
+Recording a value is a bisect over the bucket bounds and a few additions under a lock, the text is only built when
+/metrics is read. Every process keeps its own histograms, they start empty and are never reset.
+
+Example:
+    with metrics.stage('petri_net.render'):
+        ...
+    metrics.observe_log(events=1200, variants=30, activities=12)
+    print(metrics.render())
+"""
+
+import bisect, threading, time
+from contextlib import contextmanager
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000, 10000000)
+
+class Histogram:
+    """cumulative histogram with one series per label value"""
+    def __init__(self, name, documentation, buckets, label=None):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.label = label
+        self.series = {}  # label value -> [counts per bucket (+Inf last), sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value, label_value=''):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_value)
+            if series is None:
+                series = self.series[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _labels(self, label_value, le=None):
+        labels = []
+        if self.label is not None:
+            labels.append('{}="{}"'.format(self.label, _escape(label_value)))
+        if le is not None:
+            labels.append('le="{}"'.format(le))
+        return '{' + ','.join(labels) + '}' if labels else ''
+
+    def render(self):
+        """return the histogram in the Prometheus text format"""
+        lines = ['# HELP {} {}'.format(self.name, self.documentation), '# TYPE {} histogram'.format(self.name)]
+        with self.lock:
+            series = {k: (list(v[0]), v[1], v[2]) for k, v in self.series.items()}
+        for label_value in sorted(series):
+            counts, total, count = series[label_value]
+            cumulative = 0
+            for bound, n in zip(self.buckets + ('+Inf',), counts):
+                cumulative += n
+                lines.append('{}_bucket{} {}'.format(self.name, self._labels(label_value, bound), cumulative))
+            lines.append('{}_sum{} {}'.format(self.name, self._labels(label_value), repr(total)))
+            lines.append('{}_count{} {}'.format(self.name, self._labels(label_value), count))
+        return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+STAGE_SECONDS = Histogram('process_mining_stage_seconds', 'Duration of a pipeline stage in seconds.', SECONDS_BUCKETS, 'stage')
+LOG_EVENTS = Histogram('process_mining_log_events', 'Number of events of a mined event log.', SIZE_BUCKETS)
+LOG_VARIANTS = Histogram('process_mining_log_variants', 'Number of variants of a mined event log.', SIZE_BUCKETS)
+LOG_ACTIVITIES = Histogram('process_mining_log_activities', 'Number of activities of a mined event log.', SIZE_BUCKETS)
+HISTOGRAMS = (STAGE_SECONDS, LOG_EVENTS, LOG_VARIANTS, LOG_ACTIVITIES)
+
+# objects with enter(name) and exit(name), called around every stage, e.g. by profiling.Session
+stage_hooks = []
+
+@contextmanager
+def stage(name):
+    """time the block as one run of the stage name, also when it raises"""
+    for hook in stage_hooks:
+        hook.enter(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, name)
+        for hook in stage_hooks:
+            hook.exit(name)
+
+def observe_log(events=None, variants=None, activities=None):
+    """record the size of a parsed event log, sizes that are None are not known and skipped"""
+    for histogram, value in ((LOG_EVENTS, events), (LOG_VARIANTS, variants), (LOG_ACTIVITIES, activities)):
+        if value is not None:
+            histogram.observe(value)
+
+def render():
+    """return all histograms in the Prometheus text format"""
+    return ''.join(h.render() for h in HISTOGRAMS)
@@ -0,0 +1,68 @@
+"""
+This module computes the waiting time on every direct follows edge of an event log: for every pair of consecutive
+events (a, b) of a case, the time between their timestamps is a waiting time of the edge a --> b.
+
+The log is taken in columnar form (a binary_log.BinaryLog with timestamps, or the arrays of
+import_xes.importer().read_xes_arrays(path, timestamps=True)), so all edges are computed in a few numpy operations:
+the pairs crossing a case boundary or missing a timestamp are masked out, the remaining waiting times are sorted by
+(edge, waiting time) and the statistics are read off the sorted groups. The statistics of an edge are
+count, mean, median and p95 in seconds, the percentiles are interpolated linearly like numpy.percentile.
+
+Example taken from running-example.xes:
+    log = binary_log.from_arrays(*import_xes.importer().read_xes_arrays(path, timestamps=True))
+    performance.waiting_times(log)[('check ticket', 'decide')]   --> {'count': 6, 'mean': ..., 'median': ..., 'p95': ...}
+"""
+
+import numpy as np
+
+STATISTICS = ('mean', 'median', 'p95')
+
+def waiting_times(log):
+    """return a dictionary of directFollow-statistics pairs, statistics: {count, mean, median, p95} in seconds.
+    log: anything with the columns activities, codes, offsets and timestamps, like binary_log.BinaryLog
+    """
+    if log.timestamps is None:
+        raise ValueError('the log has no timestamps')
+    codes = np.asarray(log.codes, dtype=np.int64)
+    offsets = np.asarray(log.offsets, dtype=np.int64)
+    times = np.asarray(log.timestamps, dtype=np.float64)
+    n = len(log.activities)
+    if len(codes) < 2:
+        return {}
+    # a pair (i, i+1) is an edge unless i is the last event of a case
+    valid = np.ones(len(codes) - 1, dtype=bool)
+    ends = offsets[1:-1] - 1
+    valid[ends[(ends >= 0) & (ends < len(valid))]] = False
+    waits = np.diff(times)
+    valid &= ~np.isnan(waits)
+    keys = codes[:-1][valid] * n + codes[1:][valid]
+    waits = waits[valid]
+    if len(keys) == 0:
+        return {}
+    order = np.lexsort((waits, keys))
+    keys, waits = keys[order], waits[order]
+    edges, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+    means = np.add.reduceat(waits, starts) / counts
+    medians = _percentile(waits, starts, counts, 0.5)
+    p95s = _percentile(waits, starts, counts, 0.95)
+    return {(log.activities[e // n], log.activities[e % n]): {'count': int(c), 'mean': float(m), 'median': float(md), 'p95': float(p)}
+            for e, c, m, md, p in zip(edges.tolist(), counts.tolist(), means.tolist(), medians.tolist(), p95s.tolist())}
+
+def _percentile(values, starts, counts, q):
+    """return the q-th percentile of every group values[starts[k]:starts[k]+counts[k]], each group sorted ascending"""
+    position = starts + (counts - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def duration(seconds):
+    """return a short human readable duration like 45s, 12m, 3.5h or 2.1d"""
+    for unit, size in (('d', 86400), ('h', 3600), ('m', 60)):
+        if seconds >= size:
+            return '{:.3g}{}'.format(seconds / size, unit)
+    return '{:.3g}s'.format(seconds)
+
+def color(value, largest):
+    """return a graphviz color from black (no waiting) to red (the largest waiting time)"""
+    share = value / largest if largest > 0 else 0.0
+    return '#{:02x}0000'.format(int(round(255 * min(max(share, 0.0), 1.0))))
@@ -0,0 +1,173 @@
+"""
+This module profiles single requests on demand: a sampling profiler for the call stacks and tracemalloc for the
+memory, both only running while a Session is open.
+
+The sampler is a thread that looks at the stack of the profiled thread every `interval` seconds and counts every
+distinct stack. The counts are written in the collapsed-stack format of flame graphs ("a;b;c 12" per line), and
+summed per function: self samples (the function was running) and total samples (it was on the stack).
+The stages of metrics.stage in the profiled thread report their peak allocation, nested stages included.
+Only one session runs at a time, the work of the request should run in the profiled thread (see profiled()).
+tracemalloc traces the whole process: the peaks and allocations also count the memory of other threads that allocate
+while the session is open, e.g. unprofiled requests of the app. Profile on an otherwise idle server for exact numbers.
+
+Every session writes two files to the profile directory:
+    <name>.folded   collapsed stacks
+    <name>.json     {name, started, seconds, samples, interval, functions, stages, allocations}
+stages are the peak bytes per stage, allocations the source lines that hold the most memory when the session ends.
+
+Example:
+    with profiling.Session('heuristic_miner', 'profiles'):
+        hm.draw_cnet(event_log)
+    profiling.list_profiles('profiles')
+"""
+
+import json, os, sys, threading, time, tracemalloc
+from datetime import datetime
+import metrics
+
+PROFILE_DIRECTORY = 'profiles'
+INTERVAL = 0.005
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 25
+
+_lock = threading.Lock()
+_current = None
+
+def profiled():
+    """return true if the calling thread is being profiled, it should then run its work itself instead of in a pool"""
+    current = _current
+    return current is not None and current.thread == threading.get_ident()
+
+def _function(frame):
+    code = frame.f_code
+    return os.path.splitext(os.path.basename(code.co_filename))[0] + ':' + code.co_name
+
+class _StagePeaks:
+    """stage hook for metrics.stage, records the peak traced memory above its start of every stage of one thread"""
+    def __init__(self, thread):
+        self.thread = thread
+        self.peaks = {}
+        self.stack = []  # [stage, memory at the start, peak so far]
+
+    def enter(self, name):
+        if threading.get_ident() != self.thread:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self.stack:
+            self.stack[-1][2] = max(self.stack[-1][2], peak)
+        tracemalloc.reset_peak()
+        self.stack.append([name, current, current])
+
+    def exit(self, name):
+        if threading.get_ident() != self.thread or not self.stack or self.stack[-1][0] != name:
+            return
+        _, start, peak = self.stack.pop()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        self.peaks[name] = max(self.peaks.get(name, 0), peak - start)
+        if self.stack:
+            self.stack[-1][2] = max(self.stack[-1][2], peak)
+
+class Session:
+    """profile the calling thread from __enter__ to __exit__ and write the reports.
+    If another session is open, this one does nothing and profiling is False.
+    """
+    def __init__(self, name, directory=PROFILE_DIRECTORY, interval=INTERVAL):
+        self.name = '{}-{}'.format(datetime.now().strftime('%Y%m%d-%H%M%S-%f'), name)
+        self.directory = directory
+        self.interval = interval
+        self.profiling = False
+        self.thread = None
+        self.stacks = {}
+        self.samples = 0
+
+    def __enter__(self):
+        global _current
+        with _lock:
+            if _current is not None:
+                return self
+            _current = self
+        self.profiling = True
+        self.started = datetime.now()
+        self.start = time.perf_counter()
+        self.thread = threading.get_ident()
+        self.peaks = _StagePeaks(self.thread)
+        # tracing that was already running (e.g. python -X tracemalloc) is left on when the session ends
+        self.tracing = not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start()
+        metrics.stage_hooks.append(self.peaks)
+        self.stop = threading.Event()
+        self.sampler = threading.Thread(target=self._sample, daemon=True)
+        self.sampler.start()
+        return self
+
+    def _sample(self):
+        while not self.stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread)
+            stack = []
+            while frame is not None:
+                stack.append(_function(frame))
+                frame = frame.f_back
+            key = ';'.join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def __exit__(self, *exc):
+        global _current
+        if not self.profiling:
+            return False
+        self.stop.set()
+        self.sampler.join()
+        snapshot = tracemalloc.take_snapshot()
+        if self.tracing:
+            tracemalloc.stop()
+        metrics.stage_hooks.remove(self.peaks)
+        self.seconds = time.perf_counter() - self.start
+        try:
+            self._write(snapshot)
+        finally:
+            with _lock:
+                _current = None
+        return False
+
+    def functions(self):
+        """return [{function, self, total}] sorted by self samples, total counts a recursive function once per sample"""
+        own, total = {}, {}
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] = own.get(frames[-1], 0) + count
+            for f in set(frames):
+                total[f] = total.get(f, 0) + count
+        rows = [{'function': f, 'self': own.get(f, 0), 'total': total[f]} for f in total]
+        return sorted(rows, key=lambda r: (-r['self'], -r['total'], r['function']))
+
+    def _write(self, snapshot):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, self.name + '.folded'), 'w') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write('{} {}\n'.format(stack, count))
+        allocations = [{'line': '{}:{}'.format(s.traceback[0].filename, s.traceback[0].lineno), 'size_bytes': s.size, 'count': s.count}
+                       for s in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]]
+        report = {
+            'name': self.name,
+            'started': self.started.isoformat(timespec='seconds'),
+            'seconds': self.seconds,
+            'samples': self.samples,
+            'interval': self.interval,
+            'functions': self.functions()[:TOP_FUNCTIONS],
+            'stages': dict(sorted(self.peaks.peaks.items())),
+            'allocations': allocations,
+        }
+        with open(os.path.join(self.directory, self.name + '.json'), 'w') as f:
+            json.dump(report, f, indent=1)
+
+def list_profiles(directory=PROFILE_DIRECTORY):
+    """return the reports in the profile directory, newest first"""
+    if not os.path.isdir(directory):
+        return []
+    reports = []
+    for file in sorted(os.listdir(directory), reverse=True):
+        if file.endswith('.json'):
+            with open(os.path.join(directory, file)) as f:
+                reports.append(json.load(f))
+    return reports
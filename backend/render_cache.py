@@ -0,0 +1,154 @@
+"""
+This module implements a size-bounded cache for images rendered by graphviz.
+
+Drawing a Petri net, dependency graph or causal net spawns the graphviz `dot` binary, even if the same model was
+rendered seconds ago (the same log uploaded again, or thresholds that don't remove any edge). The cache key is a
+hash of the canonical graph source: engine, format and all node, edge and attribute statements, where every run of
+node/edge statements between two attribute statements is sorted, so the key does not depend on set iteration order.
+Cached images are kept in CACHE_DIRECTORY and evicted least recently used once MAX_ENTRIES or MAX_BYTES is exceeded.
+A hit copies the cached image to the output path without launching any subprocess.
+A miss renders into a directory of its own, so concurrent renders of graphs with the same file name never see each
+other's image, and files are replaced atomically, so no reader sees half an image.
+
+export() additionally lets the caller choose the output: 'png' and 'svg' are rendered by graphviz (through the cache),
+'dot' only writes the source, which the browser lays out and renders itself.
+"""
+
+import hashlib, os, re, shutil, tempfile, threading
+from collections import OrderedDict
+
+CACHE_DIRECTORY = '../frontend/static/output/cache'
+# CACHE_DIRECTORY = 'frontend/static/output/cache'   # for server
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 1024 * 1024
+
+_attribute_statement = re.compile(r'\t(graph|node|edge) \[|\t\w+=')
+
+def canonical_source(graph):
+    """return the source of a graphviz graph with sorted node/edge statements between attribute statements"""
+    lines, run = [graph.engine, graph.format or '', str(graph.graph_attr), str(graph.node_attr), str(graph.edge_attr)], []
+    for statement in graph.body:
+        if _attribute_statement.match(statement):
+            lines.extend(sorted(run))
+            lines.append(statement)
+            run = []
+        else:
+            run.append(statement)
+    lines.extend(sorted(run))
+    return ''.join(lines)
+
+def graph_key(graph):
+    """return the cache key of a graphviz graph"""
+    return hashlib.sha256(canonical_source(graph).encode('utf-8')).hexdigest()
+
+class RenderCache:
+    """least recently used store of rendered images, bounded by number of entries and total size"""
+    def __init__(self, directory=CACHE_DIRECTORY, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (path, size), least recently used first
+        self.size = 0
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # pick up images of a previous run, oldest first
+        files = [os.path.join(directory, f) for f in os.listdir(directory) if not f.endswith('.tmp')]
+        for path in sorted(files, key=os.path.getmtime):
+            key = os.path.basename(path).split('.', 1)[0]
+            self.entries[key] = (path, os.path.getsize(path))
+            self.size += os.path.getsize(path)
+        self._evict()
+
+    def get(self, key):
+        """return the path of the cached image for key, None if it is not cached"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or not os.path.exists(entry[0]):
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, rendered_path):
+        """copy a freshly rendered image into the cache"""
+        extension = os.path.splitext(rendered_path)[1]
+        path = os.path.join(self.directory, key + extension)
+        _replace(rendered_path, path)
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries[key][1]
+            self.entries[key] = (path, os.path.getsize(path))
+            self.size += self.entries[key][1]
+            self._evict()
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_bytes):
+            _, (path, size) = self.entries.popitem(last=False)
+            self.size -= size
+            if os.path.exists(path):
+                os.remove(path)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """return the process-wide render cache, created on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RenderCache()
+    return _cache
+
+def _replace(source, target):
+    """copy source to target through a temporary file in the target's directory, readers see the old or the new file"""
+    directory = os.path.dirname(target) or '.'
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(handle)
+    try:
+        shutil.copyfile(source, temporary)
+        os.replace(temporary, target)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+def render(graph, directory, neato_no_op=None):
+    """render a graphviz graph into directory, just like graph.render(directory=directory, view=False),
+    but serve identical graphs from the render cache. Return the path of the image.
+    neato_no_op: passed on to graph.render, True draws the given node positions without a layout pass (neato -n)
+    """
+    cache = get_cache()
+    key = graph_key(graph) + ('-n' if neato_no_op else '')
+    target = os.path.join(directory, graph.filename + '.' + graph.format)
+    cached = cache.get(key)
+    if cached is not None:
+        try:
+            _replace(cached, target)
+            graph.save(directory=directory)  # keep the .gv source next to the image like render() does
+            return target
+        except FileNotFoundError:  # evicted by another thread since get(), render it again
+            pass
+    # the fixed file name (e.g. cnet.gv.png) is shared by all requests, render into a directory of this call only,
+    # so the image put into the cache under this key is the image of this graph
+    with tempfile.TemporaryDirectory() as scratch:
+        path = graph.render(directory=scratch, view=False, neato_no_op=neato_no_op)
+        cache.put(key, path)
+        graph.save(directory=directory)
+        _replace(path, target)
+    return target
+
+FORMATS = ('png', 'svg', 'dot')
+
+def export(graph, directory, fmt='png', neato_no_op=None):
+    """write a graphviz graph into directory in the given output format and return the path.
+    fmt: 'png' or 'svg' image rendered by graphviz, or 'dot' source for client-side rendering
+    neato_no_op: see render()
+    """
+    if fmt not in FORMATS:
+        raise ValueError('unknown output format: ' + str(fmt))
+    if fmt == 'dot':
+        return graph.save(directory=directory)
+    graph.format = fmt
+    return render(graph, directory, neato_no_op)
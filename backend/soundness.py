@@ -0,0 +1,125 @@
+"""
+This module checks whether a Petri net discovered by the Alpha miner is a sound workflow net [1], by a bounded
+exploration of its reachability graph. Starting from one token in iL, the net is sound if
+    option to complete: the final marking (one token in oL) can be reached from every reachable marking,
+    proper completion: whenever oL is marked, it holds one token and no other place is marked,
+    no dead transitions: every transition can fire in some reachable marking.
+
+Markings are encoded like in conformance.py, one integer with a token count field per place, and the visited set is
+a dictionary from marking to (previous marking, transition), so the firing sequence leading to any marking can be
+rebuilt. The search stops at the first counterexample: a marking with oL and further tokens, a dead end that is not the
+final marking, or a marking that strictly covers one of its predecessors (the net is unbounded). It also stops once
+max_states markings are stored or max_seconds have passed, then the result is undecided.
+
+Example taken from L1.xes:
+    soundness.check_alpha(log)   --> {'sound': True, 'reason': '', 'witness': [], 'dead_transitions': [], 'states': 6, ...}
+
+References
+    [1] Wil.M.P. van der Aalst, Process Mining: Data Science in Action, vol. 2, Springer, 2016, doi: 10.1007/978-3-662-49851-4.
+"""
+
+import time
+from collections import deque
+import alpha, conformance
+
+MAX_STATES = 100000
+MAX_SECONDS = 5.0
+
+def _fields(marking):
+    """return the token counts of a marking as a dictionary of place index-count pairs"""
+    counts, index = {}, 0
+    while marking:
+        if marking & conformance.FIELD_MASK:
+            counts[index] = marking & conformance.FIELD_MASK
+        marking >>= conformance.FIELD_BITS
+        index += 1
+    return counts
+
+def _covers(larger, smaller):
+    """return true if every place holds at least as many tokens in larger as in smaller"""
+    small = _fields(smaller)
+    large = _fields(larger)
+    return all(large.get(p, 0) >= n for p, n in small.items())
+
+def check(transitions, places, flows, max_states=MAX_STATES, max_seconds=MAX_SECONDS):
+    """explore the reachability graph of the net given by places and flows. Return a dictionary with
+    sound: True, False or None (undecided, a limit was reached), reason, witness (firing sequence to the counterexample),
+    dead_transitions, states (number of reachable markings stored) and complete (the whole graph was explored)
+    """
+    names, fire = conformance.compile_net(transitions, places, flows)
+    transitions = sorted(fire)
+    rules = [(t, fire[t][0], sum(1 << o for o in fire[t][0]), fire[t][1]) for t in transitions]
+    initial = 1 << (names.index('iL') * conformance.FIELD_BITS)
+    end = names.index('oL') * conformance.FIELD_BITS
+    final = 1 << end
+    visited = {initial: (None, None)}
+    successors = {}
+    fired = set()
+    queue = deque([initial])
+    deadline = time.monotonic() + max_seconds
+
+    def witness(marking):
+        path = []
+        while visited[marking][0] is not None:
+            marking, t = visited[marking]
+            path.append(t)
+        return path[::-1]
+
+    def result(sound, reason='', marking=None, complete=False, dead=()):
+        return dict(sound=sound, reason=reason, witness=witness(marking) if marking is not None else [],
+                    dead_transitions=sorted(dead), states=len(visited), complete=complete)
+
+    while queue:
+        marking = queue.popleft()
+        # the token count of oL, not only its lowest bit, so two tokens in oL are no deadlock
+        tokens = (marking >> end) & conformance.FIELD_MASK
+        if tokens > 1:
+            return result(False, 'improper completion: oL holds {} tokens'.format(tokens), marking)
+        if tokens and marking != final:
+            return result(False, 'improper completion: oL is marked together with other places', marking)
+        enabled = [(t, m) for t, inputs, pre, post in rules
+                   if all((marking >> o) & conformance.FIELD_MASK for o in inputs)
+                   for m in (marking - pre + post,)]
+        if not enabled and marking != final:
+            return result(False, 'deadlock: no transition is enabled and oL is not reached', marking)
+        successors[marking] = []
+        for t, m in enabled:
+            fired.add(t)
+            successors[marking].append(m)
+            if m in visited:
+                continue
+            visited[m] = (marking, t)
+            # a marking covering one of its predecessors can be pumped up forever
+            previous = marking
+            while previous is not None:
+                if previous != m and _covers(m, previous):
+                    return result(False, 'unbounded: the firing sequence can be repeated to add tokens forever', m)
+                previous = visited[previous][0]
+            queue.append(m)
+        if len(visited) > max_states:
+            return result(None, 'undecided: more than {} reachable markings'.format(max_states))
+        if time.monotonic() > deadline:
+            return result(None, 'undecided: the state space was not explored within {} seconds'.format(max_seconds))
+    # option to complete: walk the reachability graph backwards from the final marking
+    predecessors = {}
+    for m, succ in successors.items():
+        for n in succ:
+            predecessors.setdefault(n, []).append(m)
+    can_complete, stack = {final}, [final] if final in visited else []
+    while stack:
+        for m in predecessors.get(stack.pop(), []):
+            if m not in can_complete:
+                can_complete.add(m)
+                stack.append(m)
+    stuck = [m for m in visited if m not in can_complete]
+    if stuck:
+        return result(False, 'no option to complete: oL cannot be reached any more', min(stuck, key=lambda m: len(witness(m))), True)
+    dead = set(transitions) - fired
+    if dead:
+        return result(False, 'dead transitions: ' + ', '.join(sorted(dead)), complete=True, dead=dead)
+    return result(True, complete=True)
+
+def check_alpha(event_log, max_states=MAX_STATES, max_seconds=MAX_SECONDS):
+    """discover the Petri net of the event log with the Alpha miner and check its soundness"""
+    transitions, places, flows = alpha.discover(event_log)
+    return check(transitions, places, flows, max_states, max_seconds)
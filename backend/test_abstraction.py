@@ -0,0 +1,65 @@
+"""
+This test file tests the level-of-detail abstraction of large event logs.
+"""
+
+import random, unittest as ut
+import abstraction, alpha, heuristic_miner as hm
+import test_data
+
+
+def large_log(activities=150, cases=200, seed=7):
+    """a log with a frequent backbone start -> x -> end and many rare activities in between"""
+    rng = random.Random(seed)
+    rare = ['r{}'.format(i) for i in range(activities)]
+    return [['start'] + rng.sample(rare, 3) + ['x', 'end'] for _ in range(cases)]
+
+
+class test_abstraction(ut.TestCase):
+
+    def test_small_log_is_unchanged(self):
+        log = test_data.event_logs['L1.xes']
+        self.assertIs(abstraction.abstract(log, budget=10)[0], log)
+        self.assertEqual(abstraction.regions(log, budget=10), {})
+
+    def test_budget(self):
+        log = large_log()
+        for budget in (6, 10, 40):
+            abstracted, regions = abstraction.abstract(log, budget)
+            self.assertLessEqual(len(hm.find_transitions(abstracted)), budget)
+            self.assertTrue({'start', 'x', 'end'} <= hm.find_transitions(abstracted).keys())
+            # every collapsed activity belongs to exactly one region
+            members = [t for m in regions.values() for t in m]
+            self.assertEqual(len(members), len(set(members)))
+            self.assertEqual(len(members) + len(hm.find_transitions(abstracted)) - len(regions), len(hm.find_transitions(log)))
+            self.assertEqual(len(abstracted), 200)
+
+    def test_strongly_connected_regions(self):
+        components = abstraction._strongly_connected({'a', 'b', 'c', 'd', 'e'},
+                                                     [('a', 'b'), ('b', 'a'), ('b', 'c'), ('c', 'd'), ('d', 'c'), ('d', 'e')])
+        self.assertEqual(sorted(map(sorted, components)), [['a', 'b'], ['c', 'd'], ['e']])
+        log = [['k', 'a', 'b', 'a', 'k'], ['k', 'c', 'd', 'c', 'k'], ['k', 'k']] * 5
+        abstracted, regions = abstraction.abstract(log, budget=3)
+        self.assertEqual(sorted(regions.values()), [['a', 'b'], ['c', 'd']])
+        # the events of a region are merged into one summary event
+        self.assertEqual(sorted(len(t) for t in hm.traces(abstracted)), [2, 3, 3])
+
+    def test_drill_down(self):
+        log = large_log()
+        _, regions = abstraction.abstract(log, budget=10)
+        label = max(regions, key=lambda l: len(regions[l]))
+        abstracted, expanded = abstraction.abstract(log, budget=10, expand=[label])
+        self.assertNotIn(label, expanded)
+        prefix = label.split(' (')[0] + '.'
+        self.assertTrue(any(l.startswith(prefix) for l in expanded))
+        # the drill-down adds at most one budget of nodes
+        self.assertLessEqual(len(hm.find_transitions(abstracted)), 20)
+
+    def test_miners_accept_abstracted_log(self):
+        abstracted, _ = abstraction.abstract(large_log(), budget=8)
+        self.assertEqual(alpha.find_intial_transitions(abstracted), {'start'})
+        self.assertEqual(hm.find_last_transitions(abstracted), {'end'})
+        self.assertTrue(alpha.find_AB_pairs(abstracted))
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,35 @@
+"""
+This test file tests the pre-flight cost estimation of the heuristic miner.
+"""
+
+import unittest as ut
+import admission, test_data
+
+
+class test_admission(ut.TestCase):
+
+    def test_estimate(self):
+        cost = admission.estimate(test_data.event_logs['L1.xes'])
+        self.assertEqual(cost, {'events': 11, 'activities': 5, 'variants': 3, 'max_fan_in': 3, 'max_fan_out': 3, 'binding_search': 144})
+
+    def test_binding_candidates(self):
+        # {b}, {c}, {b,c}, {c,b}
+        self.assertEqual(admission._binding_candidates(2), 4)
+        self.assertEqual(admission._binding_candidates(0), 0)
+
+    def test_decide(self):
+        cost = admission.estimate(test_data.event_logs['running-example.xes'])
+        self.assertEqual(admission.decide(cost)[0], 'accept')
+        self.assertEqual(admission.decide(cost, {'serialise_binding_search': 10})[0], 'serialise')
+        self.assertEqual(admission.decide(cost, {'degrade_binding_search': 10})[0], 'degrade')
+        self.assertEqual(admission.decide(cost, {'reject_activities': 3})[0], 'reject')
+
+    def test_fan_out_explodes(self):
+        # one activity followed by 12 different activities
+        log = [['a', str(i)] for i in range(12)]
+        cost = admission.estimate(log)
+        self.assertEqual(cost['max_fan_out'], 12)
+        self.assertEqual(admission.decide(cost)[0], 'degrade')
+
+if __name__ == "__main__":
+    ut.main()
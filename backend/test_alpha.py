@@ -43,6 +43,16 @@ class test_alpha(ut.TestCase):
             expected = test_data.AB_paris.get(file)  
             self.assertTrue(alpha.is_equal(actual, expected))
 
+    def test_find_AB_pairs_choice_sets(self):
+        # the pairs are built along the causal edges, they must equal all pairs of choice sets A, B with A -> B
+        for file in self.test_files:
+            log = self.event_log.get(file)
+            direct_follows = alpha._direct_follows(log)
+            choice = alpha._simpify_choice(alpha._choice(alpha.find_transitions(log), direct_follows))
+            causality = alpha._causality(direct_follows)
+            expected = [(a, b) for a in choice for b in choice if all((i, j) in causality for i in a for j in b)]
+            self.assertTrue(alpha.is_equal(alpha.find_AB_pairs(log), expected))
+
      # test step5
     def test_delete_subsets(self):
         for file in self.test_files:
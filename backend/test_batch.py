@@ -0,0 +1,78 @@
+"""
+This test file tests the batch mining of zip archives and directories of event logs.
+"""
+
+import json, os, shutil, tempfile, zipfile, unittest as ut
+import batch, heuristic_miner as hm, import_xes
+
+
+class test_batch(ut.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.archive = os.path.join(self.directory, 'logs.zip')
+        with zipfile.ZipFile(self.archive, 'w') as archive:
+            archive.write('test_files/L1.xes', 'logs/L1.xes')
+            archive.write('test_files/L2.xes', 'L2.xes')
+            archive.write('test_files/L1.xes', 'other/L1.xes')
+            archive.writestr('broken.xes', 'no xml')
+            archive.writestr('readme.txt', 'not a log')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_archive(self):
+        output = os.path.join(self.directory, 'results.zip')
+        index = batch.run(self.archive, output, 'alpha', fmt='dot', processes=2)
+        self.assertEqual((index['ok'], index['failed']), (3, 1))
+        self.assertEqual([f['file'] for f in index['files']], ['L1.xes', 'L2.xes', 'L1.xes', 'broken.xes'])
+        self.assertEqual([f['directory'] for f in index['files']], ['L1', 'L2', 'L1-2', 'broken'])
+        broken = index['files'][3]
+        self.assertEqual(broken['status'], 'error')
+        self.assertIn('error', broken)
+        with zipfile.ZipFile(output) as bundle:
+            names = bundle.namelist()
+            self.assertEqual(json.loads(bundle.read('index.json'))['ok'], 3)
+            model = json.loads(bundle.read('L1/model.json'))
+        self.assertIn('L1/petri_net.gv', names)
+        self.assertIn('L1-2/model.json', names)
+        self.assertEqual(model['algorithm'], 'alpha')
+        self.assertEqual(sorted(model['transitions']), ['a', 'b', 'c', 'd', 'e'])
+        self.assertIn(['iL', 'a'], model['flows'])
+
+    def test_directory(self):
+        source = os.path.join(self.directory, 'logs')
+        os.makedirs(source)
+        for name in ('L1.xes', 'L5.xes', 'running-example.csv'):
+            shutil.copy(os.path.join('test_files', name), source)
+        output = os.path.join(self.directory, 'results')
+        index = batch.run(source, output, 'heuristic', threshold_df=2, threshold_dm=0.5, processes=1)
+        self.assertEqual((index['ok'], index['failed']), (3, 0))
+        with open(os.path.join(output, 'L5', 'model.json')) as f:
+            model = json.load(f)
+        self.assertNotIn('image', index['files'][1])
+        dm = hm.denpendency_measure(import_xes.importer().read_xes('test_files/L5.xes'))
+        for edge in model['edges']:
+            self.assertGreaterEqual(edge['frequency'], 2)
+            self.assertGreaterEqual(edge['dependency'], 0.5)
+            self.assertEqual(edge['dependency'], dm[(edge['source'], edge['target'])])
+
+    def test_archive_limits(self):
+        output = os.path.join(self.directory, 'results')
+        with self.assertRaises(ValueError):
+            batch.run(self.archive, output, 'alpha', processes=1, max_members=4)
+        # the sizes declared in the archive are checked before anything is extracted
+        size = sum(os.path.getsize(os.path.join('test_files', f)) for f in ('L1.xes', 'L2.xes', 'L1.xes')) + len('no xml')
+        with self.assertRaises(ValueError):
+            batch.run(self.archive, output, 'alpha', processes=1, max_size=size - 1)
+        self.assertFalse(os.path.exists(os.path.join(output, 'index.json')))
+        index = batch.run(self.archive, output, 'alpha', processes=1, max_members=5, max_size=size)
+        self.assertEqual(index['ok'], 3)
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            batch.run(self.archive, os.path.join(self.directory, 'results'), 'inductive')
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,46 @@
+"""
+This test file tests the synthetic event logs and the result handling of the benchmark suite.
+"""
+
+import os, tempfile, unittest as ut
+import benchmark, import_xes
+
+
+class test_benchmark(ut.TestCase):
+
+    def test_generate(self):
+        log = benchmark.generate(activities=7, traces=50, length=10, width=2, loop=0.0, noise=0.0, seed=1)
+        self.assertEqual(log, benchmark.generate(activities=7, traces=50, length=10, width=2, loop=0.0, noise=0.0, seed=1))
+        self.assertNotEqual(log, benchmark.generate(activities=7, traces=50, length=10, width=2, loop=0.0, noise=0.0, seed=2))
+        self.assertEqual(len(log), 50)
+        self.assertTrue(all(len(trace) == 10 for trace in log))
+        # the blocks a0, a1 and a2, a3 run concurrently and one after the other
+        self.assertEqual({tuple(sorted(trace[:2])) for trace in log}, {('a0', 'a1')})
+        self.assertEqual({tuple(sorted(trace[2:4])) for trace in log}, {('a2', 'a3')})
+        self.assertEqual(len({tuple(trace[:2]) for trace in log}), 2)
+        noisy = benchmark.generate(activities=7, traces=50, length=10, noise=0.5, seed=1)
+        self.assertTrue(any(len(trace) != 10 for trace in noisy))
+
+    def test_write_xes(self):
+        log = benchmark.generate(activities=5, traces=3, length=6)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'benchmark.xes')
+            benchmark.write_xes(log, path)
+            self.assertEqual(import_xes.importer().read_xes(path), log)
+
+    def test_run_and_compare(self):
+        # dot needs no graphviz binary
+        results = benchmark.run(sizes=(5,), repeat=1, fmt='dot', activities=4, length=4)
+        stages = results['runs'][0]['stages']
+        self.assertIn('find_AB_pairs', stages)
+        self.assertIn('render_cnet', stages)
+        self.assertTrue(all('seconds' in s and 'peak_bytes' in s for s in stages.values()))
+        self.assertEqual(benchmark.compare(results, results), [])
+        slower = {'config': results['config'], 'runs': [{'traces': 5, 'stages': {'read_xes': {'seconds': stages['read_xes']['seconds'] + 1}}}]}
+        self.assertEqual([r['stage'] for r in benchmark.compare(slower, results)], ['read_xes'])
+        with self.assertRaises(ValueError):
+            benchmark.compare(results, dict(results, config=dict(results['config'], format='png')))
+
+
+if __name__ == '__main__':
+    ut.main()
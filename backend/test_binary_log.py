@@ -0,0 +1,63 @@
+"""
+This test file checks that a log converted to the binary format and opened with memory mapping
+gives the same mining results as the parsed 2D-array.
+"""
+
+import os, tempfile, unittest as ut
+import alpha, heuristic_miner as hm, import_xes, binary_log
+import test_data
+
+
+class test_binary_log(ut.TestCase):
+    test_files = [f for f in test_data.file_names if os.path.exists("test_files/" + f)]
+    parser = import_xes.importer()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _roundtrip(self, file, timestamps=False):
+        path = os.path.join(self.tmp.name, file + '.pmlog')
+        binary_log.convert("test_files/" + file, path, timestamps)
+        return binary_log.open_log(path)
+
+    def test_iterates_like_event_log(self):
+        for file in self.test_files:
+            log = self._roundtrip(file)
+            self.assertEqual(list(log), self.parser.read_xes("test_files/" + file))
+
+    def test_heuristic_counts(self):
+        for file in self.test_files:
+            expected = self.parser.read_xes("test_files/" + file)
+            log = self._roundtrip(file)
+            self.assertEqual(hm.traces(log), hm.traces(expected))
+            self.assertEqual(hm.find_transitions(log), hm.find_transitions(expected))
+            self.assertEqual(log.direct_follows_counts(), hm.direct_follows(hm.traces(expected)))
+            self.assertEqual(hm.denpendency_measure(log), hm.denpendency_measure(expected))
+
+    def test_alpha_steps(self):
+        for file in self.test_files:
+            log = self._roundtrip(file)
+            self.assertEqual(alpha.find_transitions(log), test_data.transitions[file])
+            self.assertEqual(alpha.find_intial_transitions(log), test_data.init_transitions[file])
+            self.assertEqual(alpha.find_last_transitions(log), test_data.last_transitions[file])
+            self.assertTrue(alpha.is_equal(alpha.find_AB_pairs(log), test_data.AB_paris[file]))
+
+    def test_timestamps(self):
+        log = self._roundtrip('running-example.xes', timestamps=True)
+        self.assertEqual(len(log.timestamps), len(log.codes))
+        # every case is ordered in time
+        for case in range(len(log)):
+            times = log.timestamps[log.offsets[case]:log.offsets[case+1]]
+            self.assertTrue((times[1:] >= times[:-1]).all())
+
+    def test_from_event_log(self):
+        log = binary_log.from_event_log([['a', 'b'], [], ['b', 'a', 'a']])
+        self.assertEqual(log.direct_follows_counts(), {('a', 'b'): 1, ('b', 'a'): 1, ('a', 'a'): 1})
+        self.assertEqual(log.start_counts(), {'a': 1, 'b': 1})
+        self.assertEqual(log.end_counts(), {'b': 1, 'a': 1})
+
+if __name__ == "__main__":
+    ut.main()
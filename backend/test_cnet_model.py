@@ -0,0 +1,66 @@
+"""
+This test file tests the typed causal net built by nodes_on_cnet and edges_on_cnet.
+"""
+
+import unittest as ut
+import heuristic_miner as hm, cnet_model, import_xes
+
+
+def build(log):
+    transitions = hm.find_transitions(log)
+    trace = hm.traces(log)
+    directFollows = hm.direct_follows(trace)
+    parallel = hm.find_parallel_transitions(directFollows)
+    out_bind_freq = hm.out_binding_freq(trace, hm.output_binding(log), directFollows)
+    in_bind_freq = hm.in_binding_freq(trace, hm.input_binding(log), directFollows)
+    net = hm.nodes_on_cnet(transitions, directFollows, parallel, out_bind_freq, in_bind_freq)
+    return net, hm.edges_on_cnet(net)
+
+
+def summary(net, edges):
+    """the net in terms of activity names: {(source, target): (side, point frequencies, end point frequencies)}, edge styles"""
+    name = lambda i: net.nodes[i].name
+    arcs = {}
+    for arc in net.arcs:
+        arcs[(name(arc.source), name(arc.target))] = (arc.side, [net.nodes[p].freq for p in arc.points], [net.nodes[p].freq for p in arc.ends])
+    styles = sorted(style for _, _, style in edges)
+    return arcs, styles
+
+
+class test_cnet_model(ut.TestCase):
+    log = import_xes.importer().read_xes('test_files/L1.xes')
+
+    def test_L1(self):
+        net, edges = build(self.log)
+        arcs, styles = summary(net, edges)
+        self.assertEqual({(a.name, a.freq) for a in net.activities()}, {('a', 6), ('b', 5), ('c', 5), ('d', 6), ('e', 1)})
+        self.assertEqual(arcs[('a', 'b')], (cnet_model.OUTPUT, [1, 4], [5]))
+        self.assertEqual(arcs[('a', 'c')], (cnet_model.OUTPUT, [4], [4]))
+        self.assertEqual(arcs[('c', 'd')], (cnet_model.INPUT, [1, 4], [5]))
+        self.assertEqual(arcs[('b', 'd')], (cnet_model.INPUT, [4], [4]))
+        self.assertEqual(arcs[('a', 'e')], (None, [], [1, 1]))
+        self.assertEqual(arcs[('b', 'c')], (None, [], []))  # parallel, not drawn
+        self.assertEqual(styles.count('bind'), 2)
+        self.assertEqual(styles.count('arrow'), 6)
+        self.assertEqual(len(net.nodes), 19)
+
+    def test_names_with_dashes_and_digits(self):
+        rename = {'a': 'x-1', 'b': 'b2', 'c': '1c', 'd': 'd-o', 'e': 'o'}
+        log = [[rename[t] for t in trace] for trace in self.log]
+        expected, expected_styles = summary(*build(self.log))
+        arcs, styles = summary(*build(log))
+        self.assertEqual(arcs, {(rename[s], rename[t]): v for (s, t), v in expected.items()})
+        self.assertEqual(styles, expected_styles)
+
+    def test_lookups(self):
+        net, edges = build(self.log)
+        a, b = net.activity_id('a'), net.activity_id('b')
+        self.assertEqual(net.nodes[net.arc(a, b).points[0]].arc, net.arc(a, b).id)
+        self.assertIsNone(net.arc(net.activity_id('d'), a))
+        for group in net.groups:
+            self.assertEqual({net.nodes[p].freq for p in group.points}, {group.freq})
+            self.assertEqual({net.arcs[net.nodes[p].arc].side for p in group.points}, {group.side})
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,67 @@
+"""
+This test file tests the token replay of event logs on Alpha Petri nets.
+"""
+
+import unittest as ut
+import alpha, conformance, import_xes
+import test_data
+
+
+class test_conformance(ut.TestCase):
+    parser = import_xes.importer()
+
+    def test_perfect_fit(self):
+        for file in ['L1.xes', 'L2.xes', 'billinstances.xes']:
+            result = conformance.replay_alpha(self.parser.read_xes('test_files/' + file))
+            self.assertEqual(result['fitness'], 1.0)
+            self.assertEqual((result['missing'], result['remaining']), (0, 0))
+
+    def test_running_example(self):
+        # the same numbers as pm4py's token based replay on this net
+        result = conformance.replay_alpha(self.parser.read_xes('test_files/running-example.xes'))
+        self.assertAlmostEqual(result['fitness'], 0.94)
+        self.assertEqual(result['cases'], 6)
+        self.assertEqual(sum(p['remaining'] for p in result['places'].values()), result['remaining'])
+        self.assertAlmostEqual(conformance.replay_alpha(self.parser.read_xes('test_files/L8.xes'))['fitness'], 0.927536231884058)
+
+    def test_missing_and_remaining_tokens(self):
+        log = test_data.event_logs['L1.xes']
+        transitions = alpha.find_transitions(log)
+        pairs = alpha.delete_subsets(alpha.find_AB_pairs(log))
+        places = alpha.add_places(pairs)
+        flows = alpha.add_flows(alpha.find_intial_transitions(log), alpha.find_last_transitions(log), pairs, places)
+        # d without a preceding b/c or e misses tokens, a without an ending leaves tokens behind
+        result = conformance.replay([['a', 'd'], ['a'], ['a', 'x', 'e', 'd']], transitions, places, flows)
+        self.assertEqual(result['unknown'], 1)
+        variants = {tuple(v['trace']): v for v in result['variants']}
+        self.assertEqual(variants[('a', 'x', 'e', 'd')]['fitness'], 1.0)
+        self.assertGreater(variants[('a', 'd')]['missing'], 0)
+        self.assertGreater(variants[('a',)]['remaining'], 0)
+        self.assertEqual(result['places']['oL']['missing'], 1)
+        self.assertLess(result['fitness'], 1.0)
+
+    def test_variants_are_weighted(self):
+        log = test_data.event_logs['L1.xes']
+        single = conformance.replay_alpha(log)
+        repeated = conformance.replay_alpha(log * 1000)
+        self.assertEqual(len(repeated['variants']), len(single['variants']))
+        self.assertEqual(repeated['cases'], 1000 * single['cases'])
+        self.assertEqual(repeated['produced'], 1000 * single['produced'])
+
+    def test_process_pool(self):
+        log = self.parser.read_xes('test_files/running-example.xes')
+        saved = conformance.PARALLEL_VARIANTS, conformance.CHUNK_SIZE
+        conformance.PARALLEL_VARIANTS, conformance.CHUNK_SIZE = 1, 2
+        try:
+            pooled = conformance.replay_alpha(log, processes=2)
+            pool = conformance.get_pool()
+            # the next replay reuses the pool instead of starting new workers
+            self.assertEqual(conformance.replay_alpha(log, processes=2), pooled)
+            self.assertIs(conformance.get_pool(), pool)
+        finally:
+            conformance.PARALLEL_VARIANTS, conformance.CHUNK_SIZE = saved
+        self.assertEqual(pooled, conformance.replay_alpha(log, processes=1))
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,73 @@
+"""
+This test file tests mining from a directly-follows graph instead of an event log.
+"""
+
+import json, os, shutil, tempfile, unittest as ut
+import alpha, heuristic_miner as hm, batch, dfg
+import test_data
+
+
+class test_dfg(ut.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_same_as_log(self):
+        for file in test_data.file_names:
+            log = test_data.event_logs[file]
+            for write in (dfg.write_json, dfg.write_csv):
+                path = os.path.join(self.directory, 'dfg.' + ('json' if write is dfg.write_json else 'csv'))
+                write(dfg.from_log(log), path)
+                graph = dfg.read(path)
+                transitions, places, flows = alpha.discover(graph)
+                expected = alpha.discover(log)
+                self.assertEqual(transitions, expected[0])
+                self.assertEqual(sorted(places), sorted(expected[1]))
+                self.assertEqual(sorted(flows), sorted(expected[2]))
+                self.assertEqual(hm.find_transitions(graph), hm.find_transitions(log))
+                self.assertEqual(hm.denpendency_measure(graph), hm.denpendency_measure(log))
+
+    def test_csv(self):
+        path = os.path.join(self.directory, 'dfg.csv')
+        with open(path, 'w') as f:
+            f.write('source,target,frequency\n,a,2\na,b,1\na,c,1\nb,d,1\nc,d,1\nd,,2\n')
+        graph = dfg.read(path)
+        self.assertEqual(graph.start_counts(), {'a': 2})
+        self.assertEqual(graph.end_counts(), {'d': 2})
+        self.assertEqual(graph.transition_counts(), {'a': 2, 'b': 1, 'c': 1, 'd': 2})
+        self.assertEqual(alpha.delete_subsets(alpha.find_AB_pairs(graph)), [({'a'}, {'b', 'c'}), ({'b', 'c'}, {'d'})])
+
+    def test_thresholds_keep_graph(self):
+        graph = dfg.from_log(test_data.event_logs['L1.xes'])
+        before = graph.direct_follows_counts()
+        hm.draw_denpendencyGraph(graph, threshold_df=3, threshold_dm=0.5, fmt='dot', directory=self.directory)
+        self.assertEqual(graph.direct_follows_counts(), before)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            dfg.from_dict({'direct_follows': []})
+        with self.assertRaises(ValueError):
+            dfg.from_dict({'direct_follows': [{'source': 'a', 'target': 'b', 'frequency': -1}], 'start_activities': {}, 'end_activities': {}})
+        path = os.path.join(self.directory, 'dfg.csv')
+        with open(path, 'w') as f:
+            f.write('a,b\n')
+        with self.assertRaises(ValueError):
+            dfg.read(path)
+
+    def test_batch(self):
+        source = os.path.join(self.directory, 'logs')
+        os.makedirs(source)
+        dfg.write_json(dfg.from_log(test_data.event_logs['L1.xes']), os.path.join(source, 'L1.json'))
+        with open(os.path.join(source, 'broken.json'), 'w') as f:
+            json.dump({'direct_follows': 'none'}, f)
+        index = batch.run(source, os.path.join(self.directory, 'results'), 'heuristic', processes=1)
+        self.assertEqual((index['ok'], index['failed']), (1, 1))
+        log = test_data.event_logs['L1.xes']
+        self.assertEqual((index['files'][0]['cases'], index['files'][0]['events']), (len(log), sum(len(t) for t in log)))
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,79 @@
+"""
+This test file checks that the SQLite event store aggregates the 11 test files exactly like the in-memory miners.
+"""
+
+import os, tempfile, unittest as ut
+import alpha, heuristic_miner as hm, import_xes, event_store
+import test_data
+
+
+class test_event_store(ut.TestCase):
+    test_files = [f for f in test_data.file_names if os.path.exists("test_files/" + f)]
+    parser = import_xes.importer()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _store(self, name):
+        return event_store.EventStore(os.path.join(self.tmp.name, name + '.db'))
+
+    def test_xes_counts(self):
+        for file in self.test_files:
+            expected = self.parser.read_xes("test_files/" + file)
+            store = self._store(file)
+            store.add_xes("test_files/" + file)
+            self.assertEqual(store.variants(), hm.traces(expected))
+            self.assertEqual(store.transition_counts(), hm.find_transitions(expected))
+            self.assertEqual(store.direct_follows_counts(), hm.direct_follows(hm.traces(expected)))
+            self.assertEqual(set(store.start_counts()), alpha.find_intial_transitions(expected))
+            self.assertEqual(set(store.end_counts()), alpha.find_last_transitions(expected))
+            store.close()
+
+    def test_csv_counts(self):
+        expected = self.parser.read_xes("test_files/running-example.xes")
+        store = self._store('csv')
+        store.add_csv("test_files/running-example.csv")
+        self.assertEqual(store.variants(), hm.traces(expected))
+        self.assertEqual(store.direct_follows_counts(), hm.direct_follows(hm.traces(expected)))
+        # the case ids of a second file are not merged into the cases of the first
+        store.add_csv("test_files/running-example.csv")
+        self.assertEqual(store.variants(), {trace: 2 * n for trace, n in hm.traces(expected).items()})
+        store.close()
+
+    def test_reopen_and_append(self):
+        # the second trace has no complete event, it is an empty case in read_xes as in the store
+        path = os.path.join(self.tmp.name, 'empty.xes')
+        with open(path, 'w') as f:
+            f.write('<log>'
+                    '<trace><event><string key="concept:name" value="a"/></event><event><string key="concept:name" value="b"/></event></trace>'
+                    '<trace><event><string key="concept:name" value="a"/><string key="lifecycle:transition" value="start"/></event></trace>'
+                    '<trace><event><string key="concept:name" value="c"/></event></trace>'
+                    '</log>')
+        expected = hm.traces(self.parser.read_xes(path))
+        self.assertEqual(expected, {('a', 'b'): 1, (): 1, ('c',): 1})
+        store = self._store('reopen')
+        store.add_xes(path)
+        store.add_csv("test_files/running-example.csv")
+        self.assertEqual(store.variants(), {**hm.traces(self.parser.read_xes("test_files/running-example.xes")), **expected})
+        store.close()
+        # the case ids of the appended log continue after the stored ones, no trace is merged into another
+        store = self._store('reopen')
+        store.connection.execute("DELETE FROM events WHERE case_id LIKE 'csv%'")
+        store.add_xes(path)
+        self.assertEqual(store.variants(), {trace: 2 * n for trace, n in expected.items()})
+        store.close()
+
+    def test_miners_consume_aggregate(self):
+        for file in self.test_files:
+            store = self._store(file)
+            store.add_xes("test_files/" + file)
+            log = store.aggregate()
+            self.assertEqual(hm.denpendency_measure(log), hm.denpendency_measure(store))
+            self.assertTrue(alpha.is_equal(alpha.find_AB_pairs(log), test_data.AB_paris[file]))
+            store.close()
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,67 @@
+"""
+This test file tests the footprint comparison of logs and Petri nets.
+"""
+
+import unittest as ut
+import alpha, footprint, import_xes
+import test_data
+
+
+class test_footprint(ut.TestCase):
+    parser = import_xes.importer()
+
+    def test_relation_matrix(self):
+        for file in test_data.file_names:
+            log = test_data.event_logs[file]
+            direct_follows = alpha._direct_follows(log)
+            activities = sorted(alpha.find_transitions(log))
+            matrix = footprint.relation_matrix(direct_follows, activities)
+            for i, row in enumerate(activities):
+                for j, column in enumerate(activities):
+                    self.assertEqual(footprint.SYMBOLS[matrix[i, j]], alpha.footprint_relation(direct_follows, row, column))
+            # the dictionary holds exactly the cells that are not #
+            cells = footprint.relations(direct_follows, set(activities))
+            self.assertEqual(cells, {(activities[i], activities[j]): matrix[i, j] for i, j in zip(*matrix.nonzero())})
+
+    def test_compare_logs(self):
+        log = test_data.event_logs['L1.xes']
+        self.assertEqual(footprint.compare_logs(log, log)['conformance'], 1.0)
+        result = footprint.compare_logs(log, [['a', 'b', 'c', 'd'], ['a', 'c', 'b', 'd'], ['a', 'f']])
+        self.assertEqual(result['activities'], ['a', 'b', 'c', 'd', 'e', 'f'])
+        self.assertIn(('a', 'e', '→', '#'), result['differences'])
+        self.assertIn(('f', 'a', '#', '←'), result['differences'])
+        self.assertEqual(result['differing'], len(result['differences']))
+        self.assertAlmostEqual(result['conformance'], 1 - result['differing'] / 36)
+
+    def test_compare_log_model(self):
+        log = self.parser.read_xes('test_files/L1.xes')
+        result = footprint.compare_log_alpha(log, log)
+        self.assertEqual((result['conformance'], result['truncated']), (1.0, False))
+        # the Alpha net of L8 cannot replay the length-one loop of d
+        log = self.parser.read_xes('test_files/L8.xes')
+        result = footprint.compare_log_alpha(log, log)
+        self.assertIn(('d', 'd', '||', '#'), result['differences'])
+        self.assertLess(result['conformance'], 1.0)
+
+    def test_truncated(self):
+        # the Alpha net of running-example.xes is unbounded, its reachability graph never ends
+        log = self.parser.read_xes('test_files/running-example.xes')
+        transitions, places, flows = alpha.discover(log)
+        direct_follows, truncated = footprint.model_direct_follows(transitions, places, flows)
+        self.assertTrue(truncated)
+        self.assertEqual(footprint.compare_log_alpha(log, log, max_states=10)['truncated'], True)
+        # the first MAX_STATES states already show every direct succession of the net
+        self.assertEqual(direct_follows, footprint.model_direct_follows(transitions, places, flows, 20000)[0])
+
+    def test_max_differences(self):
+        first = [['a{}'.format(i), 'b{}'.format(i)] for i in range(50)]
+        second = [['b{}'.format(i), 'a{}'.format(i)] for i in range(50)]
+        result = footprint.compare_logs(first, second)
+        self.assertEqual(result['differing'], 100)
+        result = footprint.compare(*[x for log in (first, second) for x in (alpha.find_transitions(log), alpha._direct_follows(log))], max_differences=10)
+        self.assertEqual((result['differing'], len(result['differences'])), (100, 10))
+        self.assertEqual(result['differences'][:2], [('a0', 'b0', '→', '←'), ('a1', 'b1', '→', '←')])
+
+
+if __name__ == '__main__':
+    ut.main()
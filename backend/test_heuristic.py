@@ -55,5 +55,21 @@ class test_heuristic(ut.TestCase):
             actual_parallel = hm.find_parallel_transitions(self.df[file])
             self.assertEqual(expected_parallel, actual_parallel)
 
+    # test the single scan of the heuristic statistics
+    def test_heuristic_statistics(self):
+        for file in ['L1.xes', 'L2.xes']:
+            log = test_data.event_logs[file]
+            statistics = hm.heuristic_statistics(log)
+            self.assertEqual(statistics['transitions'], hm.find_transitions(log))
+            self.assertEqual(statistics['direct_follows'], hm.direct_follows(hm.traces(log)))
+        statistics = hm.heuristic_statistics([['a', 'b', 'a', 'b', 'a'], ['a', 'c', 'd']] * 2)
+        self.assertEqual(statistics['two_loop'], {('a', 'b'): 4, ('b', 'a'): 2})
+        self.assertEqual(statistics['eventually'][('a', 'd')], 2)
+        self.assertEqual(hm.length_two_loop_measure(statistics), {('a', 'b'): 0.86, ('b', 'a'): 0.86})
+        # c and d always occur together and in this order
+        long_distance = hm.long_distance_measure(statistics)
+        self.assertEqual(long_distance[('c', 'd')], 0.8)
+        self.assertLess(long_distance[('d', 'c')] if ('d', 'c') in long_distance else 0, long_distance[('c', 'd')])
+
 if __name__ == "__main__":
     ut.main()
@@ -0,0 +1,64 @@
+"""
+This test file tests the content-hashed artifacts and the compression of responses.
+"""
+
+import gzip, os, shutil, tempfile, time, unittest as ut
+import http_cache
+
+
+class test_http_cache(ut.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.artifacts = os.path.join(self.directory, 'artifacts')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_publish(self):
+        path = self.write('petri_net.gv.png', b'first model')
+        name = http_cache.publish(path, self.artifacts)
+        self.assertTrue(name.startswith('petri_net.gv-') and name.endswith('.png'))
+        self.assertEqual(http_cache.publish(path, self.artifacts), name)
+        # the next upload writes the same file name with another model, it gets another url
+        self.write('petri_net.gv.png', b'second model')
+        other = http_cache.publish(path, self.artifacts)
+        self.assertNotEqual(other, name)
+        self.assertEqual(len(http_cache.etag_of(other)), http_cache.DIGEST_LENGTH)
+        with open(os.path.join(self.artifacts, name), 'rb') as f:
+            self.assertEqual(f.read(), b'first model')
+
+    def test_evict(self):
+        names = []
+        for i in range(5):
+            names.append(http_cache.publish(self.write('g.png', str(i).encode()), self.artifacts, max_files=3))
+            past = time.time() - 100 + i
+            os.utime(os.path.join(self.artifacts, names[-1]), (past, past))
+        self.assertEqual(sorted(os.listdir(self.artifacts)), sorted(names[2:]))
+
+    def test_choose_encoding(self):
+        self.assertEqual(http_cache.choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(http_cache.choose_encoding('gzip;q=0, deflate'), None)
+        self.assertEqual(http_cache.choose_encoding('*'), 'br' if http_cache.brotli else 'gzip')
+        self.assertEqual(http_cache.choose_encoding(''), None)
+        self.assertEqual(http_cache.accepted_encodings('gzip, br;q=0.5'), {'gzip': 1.0, 'br': 0.5})
+
+    def test_compress(self):
+        body = b'<tr><td>a</td><td>b</td></tr>' * 100
+        compressed, encoding = http_cache.compress(body, 'text/html', 'gzip')
+        self.assertEqual(encoding, 'gzip')
+        self.assertEqual(gzip.decompress(compressed), body)
+        self.assertLess(len(compressed), len(body) / 10)
+        self.assertEqual(http_cache.compress(body, 'image/png', 'gzip'), (body, None))
+        self.assertEqual(http_cache.compress(b'{}', 'application/json', 'gzip'), (b'{}', None))
+        self.assertEqual(http_cache.compress(body, 'text/html', 'identity'), (body, None))
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,35 @@
+"""
+This test file tests the csv import path against the xes parser.
+running-example.csv holds the events of running-example.xes in shuffled order, every event once
+with lifecycle 'complete' and once with lifecycle 'start'.
+"""
+
+import os, tempfile, unittest as ut
+import alpha, heuristic_miner as hm, import_xes
+import test_data
+
+
+class test_import(ut.TestCase):
+    parser = import_xes.importer()
+
+    def test_read_csv_matches_xes(self):
+        expected = self.parser.read_xes("test_files/running-example.xes")
+        actual = self.parser.read_csv("test_files/running-example.csv")
+        # cases keep the order of their first appearance in the csv, which is shuffled here
+        self.assertEqual(sorted(expected), sorted(actual))
+
+    def test_read_csv_plugs_into_miners(self):
+        log = self.parser.read_csv("test_files/running-example.csv")
+        self.assertEqual(alpha.find_transitions(log), test_data.transitions['running-example.xes'])
+        self.assertEqual(hm.denpendency_measure(log), test_data.dependency_measures['running-example.xes'])
+
+    def test_read_csv_without_optional_columns(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'log.csv')
+            with open(path, 'w') as f:
+                f.write('case;activity;resource\n2;a;x\n1;a;y\n2;b;x\n1;c;y\n2;d;x\n')
+            actual = self.parser.read_csv(path, case_column='case', activity_column='activity', sep=';')
+        self.assertEqual(actual, [['a', 'b', 'd'], ['a', 'c']])
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,80 @@
+"""
+This test file tests the reuse of node positions between dependency graphs with different thresholds.
+"""
+
+import json, unittest as ut
+import heuristic_miner as hm, layout, render_cache
+import test_data
+
+
+class test_layout(ut.TestCase):
+    log = test_data.event_logs['L1.xes']
+
+    def setUp(self):
+        self.saved, layout._layouts = layout._layouts, layout.OrderedDict()
+
+    def tearDown(self):
+        layout._layouts = self.saved
+
+    def full_graph(self):
+        return hm._dependency_digraph(hm.find_transitions(self.log), hm._direct_follows_of(self.log), hm.denpendency_measure(self.log))
+
+    def test_parse_positions(self):
+        output = {'objects': [{'name': 'cluster_0', 'nodes': [1, 2], 'bb': '0,0,10,10'},
+                              {'_gvid': 1, 'name': 'a', 'pos': '27,18'},
+                              {'_gvid': 2, 'name': 'b c', 'pos': '99.5,18'}]}
+        self.assertEqual(layout.parse_positions(json.dumps(output)), {'a': (27.0, 18.0), 'b c': (99.5, 18.0)})
+
+    def test_positions_are_cached(self):
+        g = self.full_graph()
+        layout._layouts[render_cache.graph_key(g)] = {'a': (27.0, 18.0)}
+        # a hit needs no graphviz binary
+        self.assertEqual(layout.positions(self.full_graph()), {'a': (27.0, 18.0)})
+
+    def test_first_drawing_is_laid_out_by_dot(self):
+        graphs = []
+        def render_graph(g, directory, fmt='png'):
+            graphs.append(g)
+            return directory
+        saved, hm.render_graph = hm.render_graph, render_graph
+        self.addCleanup(setattr, hm, 'render_graph', saved)
+        # a miss runs no layout solve, the graph is drawn by dot once
+        hm.draw_denpendencyGraph(self.log, threshold_df=3, threshold_dm=0.7, directory='unused')
+        self.assertEqual(graphs[0].engine, 'dot')
+        self.assertNotIn('pos', graphs[0].source)
+        self.assertEqual(dict(layout._layouts), {render_cache.graph_key(self.full_graph()): None})
+
+    def test_pinned_graph(self):
+        positions = {t: (i * 100.0, 18.0) for i, t in enumerate(sorted(hm.find_transitions(self.log)))}
+        directFollows, dm = hm._direct_follows_of(self.log), hm.denpendency_measure(self.log)
+        hm._helper_DG_delete(directFollows, dm, 0, 0.7)
+        g = hm._dependency_digraph(hm.find_transitions(self.log), directFollows, dm, positions)
+        self.assertEqual(g.engine, 'neato')
+        self.assertIn('\ta [pos="0,18!"]\n', g.body)
+        self.assertIn('\te [pos="400,18!"]\n', g.body)
+        self.assertNotIn('pos', self.full_graph().source)
+
+    def test_full_graph_ignores_thresholds(self):
+        positions = {t: (i * 100.0, 18.0) for i, t in enumerate(sorted(hm.find_transitions(self.log)))}
+        layout._layouts[render_cache.graph_key(self.full_graph())] = positions
+        # keep the graphs instead of rendering them, so no graphviz binary is needed
+        graphs = []
+        def render_graph(g, directory, fmt='png'):
+            graphs.append(g)
+            return directory
+        saved, hm.render_graph = hm.render_graph, render_graph
+        self.addCleanup(setattr, hm, 'render_graph', saved)
+        hm.draw_denpendencyGraph(self.log, threshold_df=0, threshold_dm=0.0, directory='unused')
+        hm.draw_denpendencyGraph(self.log, threshold_df=3, threshold_dm=0.7, directory='unused')
+        # both drawings looked up the layout of the same unfiltered graph
+        self.assertEqual(list(layout._layouts.values()), [positions])
+        loose, strict = graphs
+        self.assertNotEqual(loose.body, strict.body)
+        for t in positions:
+            pinned = '\t{} [pos="{}"]\n'.format(t, layout.pinned(positions, t))
+            self.assertIn(pinned, loose.body)
+            self.assertIn(pinned, strict.body)
+
+
+if __name__ == '__main__':
+    ut.main()
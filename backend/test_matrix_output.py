@@ -0,0 +1,72 @@
+"""
+This test file tests the native footprint and dependency matrix output.
+"""
+
+import unittest as ut
+import alpha, heuristic_miner as hm, matrix_output, variant_tree
+import test_data
+
+
+class test_matrix_output(ut.TestCase):
+    log = test_data.event_logs['L1.xes']
+
+    def test_footprint(self):
+        p = matrix_output.page(matrix_output.footprint(self.log))
+        self.assertEqual(p['rows'], ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(p['cells'][0], ['#', '→', '→', '#', '→'])
+        self.assertEqual(p['cells'][1][2], '||')
+        self.assertEqual(p['cells'][3][1], '←')
+        self.assertEqual(p['pages'], 1)
+
+    def test_dependency(self):
+        dm = hm.denpendency_measure(self.log)
+        p = matrix_output.page(matrix_output.dependency(self.log))
+        self.assertEqual(p['cells'][0][1], dm[('a', 'b')])
+        self.assertEqual(p['cells'][1][0], -dm[('a', 'b')])
+        self.assertEqual(p['cells'][0][3], 0)
+
+    def test_heuristic(self):
+        matrices = matrix_output.heuristic([['a', 'b', 'a', 'c']])
+        self.assertEqual(matrix_output.page(matrices['dependency']), matrix_output.page(matrix_output.dependency([['a', 'b', 'a', 'c']])))
+        loops = matrix_output.page(matrices['length_two_loop'])
+        self.assertEqual(loops['cells'][0][1], 0.5)
+        self.assertEqual(loops['cells'][1][0], 0.5)
+        self.assertEqual(loops['cells'][0][2], 0)
+        self.assertIn('rgba', matrix_output.to_html(matrix_output.page(matrices['long_distance']), 'Long distance'))
+
+    def test_aggregated_log(self):
+        tree = variant_tree.VariantTree.from_log(self.log)
+        self.assertEqual(matrix_output.page(matrix_output.footprint(tree)), matrix_output.page(matrix_output.footprint(self.log)))
+        self.assertEqual(matrix_output.page(matrix_output.dependency(tree)), matrix_output.page(matrix_output.dependency(self.log)))
+
+    def test_paging(self):
+        m = matrix_output.footprint(self.log)
+        p = matrix_output.page(m, row_page=1, col_page=5, page_size=2)
+        self.assertEqual((p['rows'], p['columns'], p['pages']), (['c', 'd'], ['e'], 3))
+        self.assertEqual(p['cells'], [[alpha.footprint_relation(alpha._direct_follows(self.log), r, 'e')] for r in ['c', 'd']])
+        html = matrix_output.to_html(p, 'Footprint', '/matrix/footprint?format=html')
+        self.assertIn('<th>c</th>', html)
+        self.assertIn('row_page=0&amp;col_page=2', html)
+        self.assertNotIn('col_page=3', html)
+
+    def test_coo(self):
+        matrices = dict(matrix_output.heuristic(self.log), footprint=matrix_output.footprint(self.log))
+        for kind, m in matrices.items():
+            sparse = matrix_output.coo(m)
+            dense = [[sparse['default']] * len(m.labels) for _ in m.labels]
+            for r, c, value in zip(sparse['row'], sparse['col'], sparse['data']):
+                dense[r][c] = value
+            self.assertEqual(dense, matrix_output.page(m)['cells'], kind)
+        sparse = matrix_output.coo(matrices['footprint'])
+        self.assertEqual(sparse['row'], sorted(sparse['row']))
+        self.assertNotIn('#', sparse['data'])
+
+    def test_escape(self):
+        m = matrix_output.footprint([['<a>', 'b&c']])
+        html = matrix_output.to_html(matrix_output.page(m), 'x')
+        self.assertIn('&lt;a&gt;', html)
+        self.assertNotIn('<a>', html)
+
+
+if __name__ == '__main__':
+    ut.main()
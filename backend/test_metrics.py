@@ -0,0 +1,52 @@
+"""
+This test file tests the stage timing histograms and their Prometheus text format.
+"""
+
+import shutil, tempfile, unittest as ut
+import alpha, import_xes, metrics, variant_tree
+import test_data
+
+
+class test_metrics(ut.TestCase):
+
+    def count(self, histogram, label_value=''):
+        series = histogram.series.get(label_value)
+        return series[2] if series else 0
+
+    def test_histogram(self):
+        h = metrics.Histogram('test_seconds', 'Test.', (0.1, 1.0), 'stage')
+        for value in (0.05, 0.5, 0.5, 5.0):
+            h.observe(value, 'a"b')
+        text = h.render()
+        self.assertIn('# TYPE test_seconds histogram', text)
+        self.assertIn('test_seconds_bucket{stage="a\\"b",le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{stage="a\\"b",le="1.0"} 3', text)
+        self.assertIn('test_seconds_bucket{stage="a\\"b",le="+Inf"} 4', text)
+        self.assertIn('test_seconds_sum{stage="a\\"b"} 6.05', text)
+        self.assertIn('test_seconds_count{stage="a\\"b"} 4', text)
+
+    def test_stage_records_failures(self):
+        before = self.count(metrics.STAGE_SECONDS, 'test.failing')
+        with self.assertRaises(ZeroDivisionError):
+            with metrics.stage('test.failing'):
+                1 / 0
+        self.assertEqual(self.count(metrics.STAGE_SECONDS, 'test.failing'), before + 1)
+
+    def test_pipeline_stages(self):
+        before = self.count(metrics.STAGE_SECONDS, 'petri_net.discover'), self.count(metrics.LOG_EVENTS), self.count(metrics.LOG_VARIANTS)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        alpha.draw_petri_net(test_data.event_logs['L1.xes'], fmt='dot', directory=directory)
+        # the variants are counted by the variant tree filled while parsing
+        import_xes.importer().read_xes('test_files/L1.xes', variant_tree=variant_tree.VariantTree())
+        self.assertEqual(self.count(metrics.STAGE_SECONDS, 'petri_net.discover'), before[0] + 1)
+        self.assertEqual(self.count(metrics.LOG_EVENTS), before[1] + 1)
+        self.assertEqual(self.count(metrics.LOG_VARIANTS), before[2] + 1)
+        text = metrics.render()
+        for name in ('petri_net.render', 'read_xes.parse', 'read_xes.convert'):
+            self.assertIn('process_mining_stage_seconds_count{stage="' + name + '"}', text)
+        self.assertIn('process_mining_log_variants_bucket{le="+Inf"}', text)
+
+
+if __name__ == '__main__':
+    ut.main()
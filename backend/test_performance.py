@@ -0,0 +1,55 @@
+"""
+This test file tests the waiting time statistics of direct follows edges.
+"""
+
+import unittest as ut
+import numpy as np
+import binary_log, performance, import_xes, heuristic_miner as hm
+
+
+class test_performance(ut.TestCase):
+
+    def test_statistics(self):
+        # case 1: a(0) b(10) a(20) b(50), case 2: a(100) b(200); the pair b(50) -> a(100) crosses the case boundary
+        log = binary_log.from_arrays(['a', 'b'], [0, 1, 0, 1, 0, 1], [0, 4, 6], [0, 10, 20, 50, 100, 200])
+        waiting = performance.waiting_times(log)
+        self.assertEqual(set(waiting), {('a', 'b'), ('b', 'a')})
+        ab = waiting[('a', 'b')]
+        self.assertEqual(ab['count'], 3)
+        self.assertAlmostEqual(ab['mean'], (10 + 30 + 100) / 3)
+        self.assertAlmostEqual(ab['median'], np.percentile([10, 30, 100], 50))
+        self.assertAlmostEqual(ab['p95'], np.percentile([10, 30, 100], 95))
+        self.assertEqual(waiting[('b', 'a')], {'count': 1, 'mean': 10.0, 'median': 10.0, 'p95': 10.0})
+
+    def test_missing_timestamps(self):
+        log = binary_log.from_arrays(['a', 'b', 'c'], [0, 1, 2], [0, 3], [0, np.nan, 5])
+        self.assertEqual(performance.waiting_times(log), {})
+        with self.assertRaises(ValueError):
+            performance.waiting_times(binary_log.from_arrays(['a'], [0], [0, 1]))
+
+    def test_running_example(self):
+        arrays = import_xes.importer().read_xes_arrays('test_files/running-example.xes', timestamps=True)
+        log = binary_log.from_arrays(*arrays)
+        waiting = performance.waiting_times(log)
+        # every direct follows edge gets statistics, weighted by how often it occurs
+        self.assertEqual({e: w['count'] for e, w in waiting.items()}, log.direct_follows_counts())
+        for w in waiting.values():
+            self.assertLessEqual(w['median'], w['p95'])
+
+    def test_edge_labels(self):
+        arrays = import_xes.importer().read_xes_arrays('test_files/running-example.xes', timestamps=True)
+        log = binary_log.from_arrays(*arrays)
+        waiting = performance.waiting_times(log)
+        g = hm._dependency_digraph(hm.find_transitions(log), hm._direct_follows_of(log), hm.denpendency_measure(log),
+                                   waiting=waiting, statistic='p95')
+        self.assertIn('p95 ', g.source)
+        self.assertIn('color="#ff0000"', g.source)  # the slowest edge
+
+    def test_duration(self):
+        self.assertEqual(performance.duration(45), '45s')
+        self.assertEqual(performance.duration(90), '1.5m')
+        self.assertEqual(performance.duration(2 * 86400), '2d')
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,62 @@
+"""
+This test file tests the per-request profiles: collapsed stacks and peak allocations per stage.
+"""
+
+import json, os, shutil, tempfile, threading, unittest as ut
+import heuristic_miner as hm, metrics, profiling
+import test_data
+
+
+class test_profiling(ut.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_session(self):
+        log = test_data.event_logs['L1.xes'] * 50
+        with profiling.Session('cnet', self.directory, interval=0.001) as session:
+            self.assertTrue(profiling.profiled())
+            for _ in range(10):
+                hm.draw_cnet(log, fmt='dot', directory=self.directory)
+        self.assertFalse(profiling.profiled())
+        self.assertNotIn(session.peaks, metrics.stage_hooks)
+        reports = profiling.list_profiles(self.directory)
+        self.assertEqual(len(reports), 1)
+        report = reports[0]
+        self.assertTrue(report['name'].endswith('-cnet'))
+        self.assertIn('cnet.bindings', report['stages'])
+        self.assertGreater(report['stages']['cnet.bindings'], 0)
+        self.assertGreater(report['samples'], 0)
+        self.assertEqual(sum(f['self'] for f in session.functions()), report['samples'])
+        with open(os.path.join(self.directory, report['name'] + '.folded')) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(sum(int(line.rsplit(' ', 1)[1]) for line in lines), report['samples'])
+        self.assertTrue(any('heuristic_miner:draw_cnet' in line for line in lines))
+
+    def test_nested_stages(self):
+        with profiling.Session('nested', self.directory) as session:
+            with metrics.stage('test.outer'):
+                with metrics.stage('test.inner'):
+                    data = bytearray(1 << 20)
+                del data
+        self.assertGreaterEqual(session.peaks.peaks['test.inner'], 1 << 20)
+        self.assertGreaterEqual(session.peaks.peaks['test.outer'], 1 << 20)
+
+    def test_one_session_at_a_time(self):
+        with profiling.Session('first', self.directory):
+            with profiling.Session('second', self.directory) as second:
+                self.assertFalse(second.profiling)
+            # other threads are not profiled
+            result = []
+            thread = threading.Thread(target=lambda: result.append(profiling.profiled()))
+            thread.start()
+            thread.join()
+            self.assertEqual(result, [False])
+        self.assertEqual([r['name'][-5:] for r in profiling.list_profiles(self.directory)], ['first'])
+
+
+if __name__ == '__main__':
+    ut.main()
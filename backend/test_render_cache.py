@@ -0,0 +1,97 @@
+"""
+This test file tests the hash-keyed render cache. Cache hits must not need the graphviz binary at all.
+"""
+
+import os, tempfile, unittest as ut
+import graphviz, render_cache
+
+
+def petri_like_graph(nodes):
+    g = graphviz.Digraph(format='png', filename='graph.gv')
+    g.attr(rankdir='LR')
+    g.attr('node', shape='rectangle')
+    for n in nodes:
+        g.node(n)
+    g.attr('edge', arrowsize='0.6')
+    g.edges([('a', 'b'), ('b', 'c')])
+    return g
+
+
+class test_render_cache(ut.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+        self.saved, render_cache._cache = render_cache._cache, render_cache.RenderCache(self.cache_dir)
+
+    def tearDown(self):
+        render_cache._cache = self.saved
+        self.tmp.cleanup()
+
+    def _image(self, name, size):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        return path
+
+    def test_key_ignores_statement_order(self):
+        self.assertEqual(render_cache.graph_key(petri_like_graph(['a', 'b', 'c'])), render_cache.graph_key(petri_like_graph(['c', 'a', 'b'])))
+        self.assertNotEqual(render_cache.graph_key(petri_like_graph(['a', 'b'])), render_cache.graph_key(petri_like_graph(['a', 'b', 'c'])))
+        svg = petri_like_graph(['a', 'b', 'c'])
+        svg.format = 'svg'
+        self.assertNotEqual(render_cache.graph_key(svg), render_cache.graph_key(petri_like_graph(['a', 'b', 'c'])))
+
+    def test_hit_copies_without_rendering(self):
+        g = petri_like_graph(['a', 'b', 'c'])
+        render_cache.get_cache().put(render_cache.graph_key(g), self._image('rendered.png', 10))
+        out = os.path.join(self.tmp.name, 'out')
+        path = render_cache.render(g, out)
+        self.assertEqual(path, os.path.join(out, 'graph.gv.png'))
+        self.assertEqual(os.path.getsize(path), 10)
+        self.assertTrue(os.path.exists(os.path.join(out, 'graph.gv')))
+        self.assertEqual(render_cache.get_cache().hits, 1)
+
+    def test_miss_caches_its_own_image(self):
+        g = petri_like_graph(['a', 'b', 'c'])
+        out = os.path.join(self.tmp.name, 'out')
+        shared = os.path.join(out, 'graph.gv.png')
+        def render(directory, view, neato_no_op):
+            # graphviz writes the image, meanwhile another request renders its graph to the shared file name
+            path = os.path.join(directory, 'graph.gv.png')
+            with open(path, 'wb') as f:
+                f.write(b'this graph')
+            os.makedirs(out, exist_ok=True)
+            with open(shared, 'wb') as f:
+                f.write(b'another graph')
+            return path
+        g.render = render
+        self.assertEqual(render_cache.render(g, out), shared)
+        with open(render_cache.get_cache().get(render_cache.graph_key(g)), 'rb') as f:
+            self.assertEqual(f.read(), b'this graph')
+        with open(shared, 'rb') as f:
+            self.assertEqual(f.read(), b'this graph')
+
+    def test_lru_eviction(self):
+        cache = render_cache.RenderCache(os.path.join(self.tmp.name, 'small'), max_entries=2, max_bytes=25)
+        cache.put('k1', self._image('1.png', 10))
+        cache.put('k2', self._image('2.png', 10))
+        cache.get('k1')  # k2 is now least recently used
+        cache.put('k3', self._image('3.png', 10))
+        self.assertIsNotNone(cache.get('k1'))
+        self.assertIsNone(cache.get('k2'))
+        self.assertIsNotNone(cache.get('k3'))
+        cache.put('k4', self._image('4.png', 20))  # too large to keep anything else
+        self.assertEqual(list(cache.entries), ['k4'])
+        self.assertEqual(sorted(os.listdir(cache.directory)), ['k4.png'])
+
+    def test_export_dot_writes_source_only(self):
+        out = os.path.join(self.tmp.name, 'out')
+        path = render_cache.export(petri_like_graph(['a', 'b', 'c']), out, 'dot')
+        self.assertEqual(path, os.path.join(out, 'graph.gv'))
+        with open(path) as f:
+            self.assertIn('a -> b', f.read())
+        self.assertEqual(render_cache.get_cache().hits + render_cache.get_cache().misses, 0)
+        self.assertRaises(ValueError, render_cache.export, petri_like_graph(['a']), out, 'jpg')
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,73 @@
+"""
+This test file tests the bounded soundness check of Petri nets.
+"""
+
+import unittest as ut
+import soundness, import_xes
+import test_data
+
+
+class test_soundness(ut.TestCase):
+
+    def test_sound(self):
+        result = soundness.check_alpha(test_data.event_logs['L1.xes'])
+        self.assertTrue(result['sound'])
+        self.assertTrue(result['complete'])
+        self.assertEqual(result['witness'], [])
+
+    def test_deadlock(self):
+        # a and b both need a token from p, only one of them can get it, c waits for both
+        places = ['p', 'pa', 'pb', 'iL', 'oL']
+        flows = [('iL', 's'), ('s', 'p'), ('p', 'a'), ('p', 'b'), ('a', 'pa'), ('b', 'pb'), ('pa', 'c'), ('pb', 'c'), ('c', 'oL')]
+        result = soundness.check({'s', 'a', 'b', 'c'}, places, flows)
+        self.assertFalse(result['sound'])
+        self.assertTrue(result['reason'].startswith('deadlock'))
+        self.assertIn(result['witness'], [['s', 'a'], ['s', 'b']])
+
+    def test_improper_completion(self):
+        places = ['p1', 'p2', 'iL', 'oL']
+        flows = [('iL', 'a'), ('a', 'p1'), ('a', 'p2'), ('p1', 'b'), ('b', 'oL'), ('p2', 'c'), ('c', 'oL')]
+        result = soundness.check({'a', 'b', 'c'}, places, flows)
+        self.assertFalse(result['sound'])
+        self.assertTrue(result['reason'].startswith('improper completion'))
+        self.assertEqual(result['witness'][0], 'a')
+        self.assertEqual(len(result['witness']), 2)
+
+    def test_two_tokens_in_oL(self):
+        # the flow a -> oL is given twice, a puts two tokens into oL and nothing else is marked
+        flows = [('iL', 'a'), ('a', 'oL'), ('a', 'oL')]
+        result = soundness.check({'a'}, ['iL', 'oL'], flows)
+        self.assertFalse(result['sound'])
+        self.assertEqual(result['reason'], 'improper completion: oL holds 2 tokens')
+        self.assertEqual(result['witness'], ['a'])
+
+    def test_no_option_to_complete_and_dead_transition(self):
+        places = ['p1', 'p2', 'px', 'iL', 'oL']
+        flows = [('iL', 'a'), ('a', 'p1'), ('p1', 'b'), ('b', 'p2'), ('p2', 'c'), ('c', 'p1'), ('px', 'd'), ('d', 'oL')]
+        result = soundness.check({'a', 'b', 'c', 'd'}, places, flows)
+        self.assertFalse(result['sound'])
+        self.assertTrue(result['reason'].startswith('no option to complete'))
+        self.assertEqual(result['witness'], [])  # the initial marking itself cannot complete
+        places = ['p1', 'px', 'iL', 'oL']
+        flows = [('iL', 'a'), ('a', 'p1'), ('p1', 'b'), ('b', 'oL'), ('px', 'd'), ('d', 'oL')]
+        result = soundness.check({'a', 'b', 'd'}, places, flows)
+        self.assertEqual(result['dead_transitions'], ['d'])
+
+    def test_unbounded(self):
+        log = import_xes.importer().read_xes('test_files/running-example.xes')
+        result = soundness.check_alpha(log)
+        self.assertFalse(result['sound'])
+        self.assertTrue(result['reason'].startswith('unbounded'))
+        self.assertEqual(result['witness'][-1], 'reinitiate request')
+
+    def test_limits(self):
+        # the search stops once more than max_states markings are stored, one expansion adds at most one per transition
+        log = import_xes.importer().read_xes('test_files/L2.xes')
+        result = soundness.check_alpha(log, max_states=2)
+        self.assertIsNone(result['sound'])
+        self.assertFalse(result['complete'])
+        self.assertLessEqual(result['states'], 2 + len(set(t for trace in log for t in trace)))
+
+
+if __name__ == '__main__':
+    ut.main()
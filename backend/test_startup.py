@@ -0,0 +1,38 @@
+"""
+This test file checks that the backend modules and the app import fast, without pm4py, pandas, matplotlib and dataframe_image.
+"""
+
+import os, subprocess, sys, unittest as ut
+
+HEAVY = ('pm4py', 'pandas', 'matplotlib', 'dataframe_image')
+# seconds for a cold import in a fresh interpreter, generous against slow machines, far below the eager imports
+BUDGET = 1.5
+
+def cold_import(statement, cwd='.'):
+    """import in a fresh interpreter, return (seconds, heavy modules that got loaded)"""
+    code = ('import sys, time\nstart = time.perf_counter()\n' + statement + '\n'
+            'print(time.perf_counter() - start)\nprint(",".join(m for m in {!r} if m in sys.modules))'.format(HEAVY))
+    output = subprocess.run([sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True, check=True).stdout.split('\n')
+    return float(output[0]), [m for m in output[1].split(',') if m]
+
+
+class test_startup(ut.TestCase):
+
+    def test_backend_modules(self):
+        seconds, loaded = cold_import('import alpha, heuristic_miner, import_xes, matrix_output, conformance, soundness, footprint, '
+                                      'abstraction, admission, binary_log, event_store, variant_tree, performance, metrics, profiling')
+        self.assertEqual(loaded, [])
+        self.assertLess(seconds, BUDGET)
+
+    def test_app(self):
+        seconds, loaded = cold_import('import app', cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), '../frontend'))
+        self.assertEqual(loaded, [])
+        self.assertLess(seconds, BUDGET)
+
+    def test_loaded_on_first_use(self):
+        _, loaded = cold_import('import import_xes\nimport_xes.importer().read_xes("test_files/L1.xes")')
+        self.assertIn('pm4py', loaded)
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,38 @@
+"""
+This test file tests the prefix tree of trace variants against the heuristic miner's trace counting.
+"""
+
+import os, unittest as ut
+import alpha, heuristic_miner as hm, import_xes, variant_tree
+import test_data
+
+
+class test_variant_tree(ut.TestCase):
+    test_files = [f for f in test_data.file_names if os.path.exists("test_files/" + f)]
+    parser = import_xes.importer()
+
+    def test_built_while_parsing(self):
+        for file in self.test_files:
+            tree = variant_tree.VariantTree()
+            log = self.parser.read_xes("test_files/" + file, variant_tree=tree)
+            self.assertEqual(tree.variants(), hm.traces(log))
+            self.assertEqual(tree.count_variants(), len(hm.traces(log)))
+            self.assertEqual(tree.transition_counts(), hm.find_transitions(log))
+            self.assertEqual(tree.direct_follows_counts(), hm.direct_follows(hm.traces(log)))
+            self.assertEqual(hm.find_first_transitions(tree), test_data.init_transitions[file])
+            self.assertEqual(alpha.find_intial_transitions(tree), test_data.init_transitions[file])
+            self.assertEqual(alpha.find_last_transitions(tree), test_data.last_transitions[file])
+
+    def test_prefix_queries(self):
+        tree = variant_tree.VariantTree.from_log(test_data.event_logs['L1.xes'])
+        self.assertEqual(len(tree), 3)
+        self.assertEqual(tree.count_prefix(['a']), 3)
+        self.assertEqual(tree.count_prefix(['a', 'c']), 1)
+        self.assertEqual(tree.count_prefix(['b']), 0)
+        self.assertEqual(tree.continuations(['a']), {'e': 1, 'c': 1, 'b': 1})
+        self.assertEqual(tree.continuations(['x']), {})
+        self.assertEqual(tree.count_ends(['a', 'e', 'd']), 1)
+        self.assertEqual(tree.count_ends(['a', 'e']), 0)
+
+if __name__ == "__main__":
+    ut.main()
@@ -0,0 +1,131 @@
+"""
+This module implements a prefix tree (trie) of the trace variants of an event log.
+Every node stands for one prefix and stores how many cases start with it and how many cases end exactly there,
+so shared prefixes are stored once and prefix/continuation queries cost time proportional to the query length.
+
+A VariantTree offers the same counting methods as binary_log.BinaryLog, so alpha.py and heuristic_miner.py accept it,
+e.g. find_intial_transitions and find_first_transitions read the children of the root instead of scanning the log.
+
+Example taken from running-example.xes:
+    tree = variant_tree.VariantTree()
+    log = import_xes.importer().read_xes("test_files/running-example.xes", variant_tree=tree)   # filled while parsing
+    tree.count_prefix(['register request', 'examine casually'])   --> 3
+    tree.continuations(['register request'])   --> {'examine casually': 3, 'check ticket': 2, 'examine thoroughly': 1}
+"""
+
+class _Node:
+    __slots__ = ('children', 'count', 'ends')
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0  # cases whose trace starts with the prefix of this node
+        self.ends = 0   # cases whose trace is exactly the prefix of this node
+
+class VariantTree:
+    """frequency-annotated prefix tree of trace variants"""
+    def __init__(self):
+        self.root = _Node()
+
+    @classmethod
+    def from_log(cls, event_log):
+        """return the prefix tree of a 2D-array of transitions"""
+        tree = cls()
+        for trace in event_log:
+            tree.add(trace)
+        return tree
+
+    def add(self, trace, freq=1):
+        """insert a trace freq times"""
+        node = self.root
+        node.count += freq
+        for event in trace:
+            child = node.children.get(event)
+            if child is None:
+                child = node.children[event] = _Node()
+            child.count += freq
+            node = child
+        node.ends += freq
+
+    def _find(self, prefix):
+        node = self.root
+        for event in prefix:
+            node = node.children.get(event)
+            if node is None:
+                return None
+        return node
+
+    def __len__(self):
+        return self.root.count
+
+    def count_prefix(self, prefix):
+        """return the number of cases whose trace starts with prefix"""
+        node = self._find(prefix)
+        return node.count if node is not None else 0
+
+    def count_ends(self, prefix):
+        """return the number of cases whose trace is exactly prefix"""
+        node = self._find(prefix)
+        return node.ends if node is not None else 0
+
+    def continuations(self, prefix):
+        """return a dictionary of next transition-frequency pairs for all cases that start with prefix"""
+        node = self._find(prefix)
+        if node is None:
+            return {}
+        return {event: child.count for event, child in node.children.items()}
+
+    def _walk(self):
+        """yield (transition, node) for all nodes below the root, the transition is the last one of the node's prefix"""
+        stack = list(self.root.children.items())
+        while stack:
+            event, node = stack.pop()
+            yield event, node
+            stack.extend(node.children.items())
+
+    def variants(self):
+        """return a dictionary of trace-frequency pairs, like heuristic_miner.traces"""
+        result = {}
+        stack = [((), self.root)]
+        while stack:
+            prefix, node = stack.pop()
+            if node.ends:
+                result[prefix] = node.ends
+            stack.extend((prefix + (event,), child) for event, child in node.children.items())
+        return result
+
+    def count_variants(self):
+        """return the number of distinct traces"""
+        return sum(1 for _, node in self._walk() if node.ends) + (1 if self.root.ends else 0)
+
+    def __iter__(self):
+        for trace, freq in self.variants().items():
+            for _ in range(freq):
+                yield list(trace)
+
+    def transition_counts(self):
+        """return a dictionary of transition-frequency pairs"""
+        counts = {}
+        for event, node in self._walk():
+            counts[event] = counts.get(event, 0) + node.count
+        return counts
+
+    def start_counts(self):
+        """return a dictionary of first transition-frequency pairs"""
+        return self.continuations(())
+
+    def end_counts(self):
+        """return a dictionary of last transition-frequency pairs"""
+        counts = {}
+        for event, node in self._walk():
+            if node.ends:
+                counts[event] = counts.get(event, 0) + node.ends
+        return counts
+
+    def direct_follows_counts(self):
+        """return a dictionary of directFollow-frequency pairs, every edge of the tree is one direct follow"""
+        counts = {}
+        for event, node in self._walk():
+            for follower, child in node.children.items():
+                pair = (event, follower)
+                counts[pair] = counts.get(pair, 0) + child.count
+        return counts
@@ -1,14 +1,16 @@
-from flask import Flask, render_template,request
+from flask import Flask, render_template, request, jsonify, Response, send_from_directory, send_file, abort
 from flask_wtf import FlaskForm
 from flask_wtf.file import FileField, FileAllowed, FileRequired, FileSize
-from wtforms import FileField, SubmitField, IntegerField, DecimalField
-from wtforms.validators import InputRequired, NumberRange
+from wtforms import FileField, SubmitField, IntegerField, DecimalField, SelectField
+from wtforms.validators import InputRequired, NumberRange, Optional
 from werkzeug.utils import secure_filename
 
-import os, sys
+import os, sys, tempfile, functools, io, threading, zipfile
+from concurrent.futures import ThreadPoolExecutor, Future
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend/')))
-import alpha, heuristic_miner as hm, import_xes
+import alpha, heuristic_miner as hm, import_xes, variant_tree, admission, matrix_output, abstraction, conformance, soundness, footprint
+import binary_log, performance, metrics, profiling, batch, http_cache
 
 app = Flask(__name__)
 
@@ -18,30 +20,201 @@ app.config['SECRET_KEY'] = 'this_is_a_secret_key'
 # app.config['OUTPUT_FOLDER'] =  'frontend/static/output'   # for server
 
 app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5M
+# limits for the heuristic miner's pre-flight check, see admission.DEFAULT_LIMITS
+app.config['HEURISTIC_LIMITS'] = dict(admission.DEFAULT_LIMITS)
+
+# larger logs are drawn with their less frequent activities collapsed into regions, see abstraction.py
+app.config['NODE_BUDGET'] = abstraction.NODE_BUDGET
+
+# number of threads that render the independent outputs of one request at the same time
+app.config['RENDER_WORKERS'] = 4
+
+# 'flag' profiles the mining requests with ?profile=1, 'all' profiles every mining request, see profiling.py
+app.config['PROFILING'] = 'off'
+app.config['PROFILE_FOLDER'] = 'profiles'
+# the profiles show the code and data of the server, /admin/profiles serves them only if this is True
+app.config['PROFILE_PAGES'] = False
+# app.config['PROFILE_FOLDER'] = 'frontend/profiles'   # for server
+# every log of a batch archive is mined in its own process of the pool, None uses all cores
+app.config['BATCH_PROCESSES'] = None
+# a batch archive is refused (400) with more members, or if its logs unpack to more bytes, see batch.log_files
+app.config['BATCH_MAX_MEMBERS'] = 500
+app.config['BATCH_MAX_SIZE'] = 20 * app.config['MAX_CONTENT_LENGTH']
+# png outputs are copied here under content-hashed names and served as immutable, see http_cache.py
+app.config['ARTIFACT_FOLDER'] = 'static/output/artifacts'
+# app.config['ARTIFACT_FOLDER'] = 'frontend/static/output/artifacts'   # for server
+
+# graphviz runs as a subprocess, so the renders of a request overlap even in threads. Only the graphviz renders (render())
+# run here, the models are mined in the thread of the request
+render_pool = ThreadPoolExecutor(max_workers=app.config['RENDER_WORKERS'])
+# serialises the costly causal nets (admission decision 'serialise'): they are computed one after the other, so at most one of
+# them takes a worker of the server at a time. It is no background queue, the request waits for its causal net, and the
+# longer the more costly nets were submitted before it
+cnet_serialiser = ThreadPoolExecutor(max_workers=1)
+
+# png is rasterized on the server, svg is embedded inline, dot is laid out and drawn by the browser
+output_formats = [('png', 'PNG image'), ('svg', 'SVG image'), ('dot', 'Drawn in the browser')]
+
+def submit(pool, function, *args):
+    """run function in the pool, or right away in a profiled request, so the profile sees all of its work"""
+    if not profiling.profiled():
+        return pool.submit(function, *args)
+    done = Future()
+    done.set_result(function(*args))
+    return done
+
+def render(stage, graph, directory, fmt):
+    """render a mined graphviz graph into directory, timed as the metrics stage, return the path of the output file"""
+    with metrics.stage(stage):
+        return hm.render_graph(graph, directory, fmt)
+
+# tracemalloc traces the whole process, profiled requests wait for each other so every one gets a session of its own
+profile_lock = threading.Lock()
+
+def profile_request(view):
+    """profile the view according to app.config['PROFILING']"""
+    @functools.wraps(view)
+    def profiled_view(*args, **kwargs):
+        mode = app.config['PROFILING']
+        if mode == 'all' or (mode == 'flag' and request.args.get('profile')):
+            with profile_lock, profiling.Session(view.__name__, app.config['PROFILE_FOLDER']):
+                return view(*args, **kwargs)
+        return view(*args, **kwargs)
+    return profiled_view
 
 class uploadFile_alpha(FlaskForm):
-    file = FileField('File', validators=[FileRequired(), FileAllowed(['xes']), FileSize(app.config['MAX_CONTENT_LENGTH'])])  
+    file = FileField('File', validators=[FileRequired(), FileAllowed(['xes', 'csv']), FileSize(app.config['MAX_CONTENT_LENGTH'])])  
+    output_format = SelectField('Output format', choices=output_formats, default='png')
     submit = SubmitField('Submit')
 
+# statistics of performance.waiting_times shown on the edges of the dependency graph, '' shows none
+waiting_statistics = [('', 'None'), ('median', 'Median'), ('mean', 'Mean'), ('p95', '95th percentile')]
+
 class uploadFile_heuristic(FlaskForm):
-    file = FileField('File', validators=[FileRequired(), FileAllowed(['xes']), FileSize(app.config['MAX_CONTENT_LENGTH'])])  
+    file = FileField('File', validators=[FileRequired(), FileAllowed(['xes', 'csv']), FileSize(app.config['MAX_CONTENT_LENGTH'])])  
     threshold_df = IntegerField('Threshold for direct follows', validators=[InputRequired(), NumberRange(min=0)], render_kw={"placeholder": "Allowed value i ≥ 0"})
     threshold_dm = DecimalField('Threshold for dependency measure', validators =[InputRequired(), NumberRange(0, 1, 0.01)], render_kw={"placeholder": "Allowed value 0 ≤ i ≤ 1"})
+    # empty thresholds turn the length-two loop and long-distance measures off
+    threshold_l2l = DecimalField('Threshold for length-two loops', validators =[Optional(), NumberRange(0, 1)], render_kw={"placeholder": "Empty or 0 ≤ i ≤ 1"})
+    threshold_ld = DecimalField('Threshold for long-distance dependencies', validators =[Optional(), NumberRange(0, 1)], render_kw={"placeholder": "Empty or 0 ≤ i ≤ 1"})
+    output_format = SelectField('Output format', choices=output_formats, default='png')
+    waiting_times = SelectField('Waiting times on the edges', choices=waiting_statistics, default='')
     submit = SubmitField('Submit')
 
+compare_modes = [('log', 'the footprints of both logs'), ('model', 'the first log with the Alpha Petri net of the second log')]
+
+class compareFiles(FlaskForm):
+    file = FileField('First log', validators=[FileRequired(), FileAllowed(['xes', 'csv']), FileSize(app.config['MAX_CONTENT_LENGTH'])])
+    other = FileField('Second log', validators=[FileRequired(), FileAllowed(['xes', 'csv']), FileSize(app.config['MAX_CONTENT_LENGTH'])])
+    mode = SelectField('Compare', choices=compare_modes, default='log')
+    submit = SubmitField('Compare')
+
+def read_log(path, tree=None, timestamps=False):
+    """parse the uploaded file into an event log, csv files are read column-wise, everything else as xes.
+    tree: optional VariantTree that is filled with the traces while parsing
+    timestamps: return a binary_log.BinaryLog that keeps the timestamps of the events
+    """
+    if timestamps:
+        parser = import_xes.importer()
+        read = parser.read_csv_arrays if path.lower().endswith('.csv') else parser.read_xes_arrays
+        log = binary_log.from_arrays(*read(path, timestamps=True))
+        if tree is not None:
+            for trace, freq in log.variants().items():
+                tree.add(trace, freq)
+        return log
+    if path.lower().endswith('.csv'):
+        log = import_xes.importer().read_csv(path)
+        if tree is not None:
+            for trace in log:
+                tree.add(trace)
+        return log
+    return import_xes.importer().read_xes(path, variant_tree=tree)
+
+def graph_output(path, fmt):
+    """describe a drawn graph for the templates: png images are linked under the hash of their content, so a browser never
+    shows the image of an earlier upload, svg and dot sources are embedded in the page.
+    path should be in a directory of the request (see output_directory), files under the fixed names in static/output
+    can be overwritten by a concurrent request at any time
+    """
+    output = {'kind': fmt, 'src': '', 'content': ''}
+    if fmt == 'png':
+        output['src'] = 'artifacts/' + http_cache.publish(path, app.config['ARTIFACT_FOLDER'])
+    else:
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        # drop the xml prolog of svg files, the svg element is placed inline
+        output['content'] = content[content.find('<svg'):] if fmt == 'svg' else content
+    return output
+
+# prefix trees of uploaded logs, keyed by (path, modification time)
+variant_trees = {}
+
+def parse_upload(path, timestamps=False):
+    """parse an uploaded file and keep the variant tree built in the same pass for the variant explorer"""
+    tree = variant_tree.VariantTree()
+    log = read_log(path, tree, timestamps)
+    variant_trees.clear()
+    variant_trees[(path, os.path.getmtime(path))] = tree
+    return log
+
+def uploaded_variant_tree():
+    """return the file name and the variant tree of the most recently uploaded log, (None, None) if there is none"""
+    files = [os.path.join('static/upload', i) for i in os.listdir('static/upload') if i != '.gitkeep']
+    if len(files) == 0:
+        return None, None
+    path = max(files, key=os.path.getmtime)
+    key = (path, os.path.getmtime(path))
+    if key not in variant_trees:
+        parse_upload(path)
+    return os.path.basename(path), variant_trees[key]
+
+matrix_captions = {'footprint': 'Footprint matrix', 'dependency': 'Dependency measures',
+                   'length_two_loop': 'Length-two loop measures', 'long_distance': 'Long-distance dependency measures'}
+
+def matrix_html(kind, matrix, row_page=0, col_page=0):
+    """return one page of a footprint or dependency matrix as a html table, with links to the other pages"""
+    page = matrix_output.page(matrix, row_page, col_page)
+    return matrix_output.to_html(page, matrix_captions[kind], '/matrix/' + kind + '?format=html')
+
 @app.route("/")
 @app.route("/introduction")
 def home():
     return render_template('Introduction.html')                    
 
+def output_directory():
+    """return a temporary directory for the drawings of one request, they are published or embedded before it is removed"""
+    return tempfile.TemporaryDirectory(prefix='request-')
+
+def alpha_outputs(log, fmt, expand=()):
+    """abstract the log to the node budget, mine it and return the keyword arguments for AlphaMiner.html"""
+    log, regions = abstraction.abstract(log, app.config['NODE_BUDGET'], expand)
+    with output_directory() as directory:
+        # graphviz draws the Petri net while the footprint matrix is written as a html table
+        petri_done = submit(render_pool, render, 'petri_net.render', alpha.petri_net_graph(log), directory, fmt)
+        footprint = matrix_html('footprint', matrix_output.footprint(log))
+        # how well the discovered net fits the log, by token replay of the distinct variants
+        replay = conformance.replay_alpha(log)
+        # deadlocks, improper completion and dead transitions, with the firing sequence that leads there
+        sound = soundness.check_alpha(log)
+        petri_net = graph_output(petri_done.result(), fmt)
+    return dict(image_petri=petri_net, image_footprint=footprint, replay=replay, sound=sound, regions=regions, expand=list(expand), fmt=fmt)
+
 @app.route("/alpha_miner", methods = ['POST', 'GET'])
+@profile_request
 def alpha_miner():
     form = uploadFile_alpha()
     image = ''
     if request.method == 'GET':
-        return render_template('AlphaMiner.html', form = form, image = image)
+        expand = request.args.getlist('expand')
+        file, tree = uploaded_variant_tree() if expand else (None, None)
+        if tree is None:
+            return render_template('AlphaMiner.html', form = form, image = image)
+        # drill-down into collapsed regions of the last uploaded log
+        result_msg = 'The file [' + file + '] is shown with ' + ', '.join(expand) + ' expanded.'
+        return render_template('AlphaMiner.html', form = form, msg = result_msg,
+                               **alpha_outputs(tree, request.args.get('output_format', 'png'), expand))
 
-    result_msg = 'File upload failed. Only xes files is accepted.'
+    result_msg = 'File upload failed. Only xes or csv files are accepted.'
     if request.method == 'POST' and form.validate_on_submit():
         # remove the old uploaded files
         files = os.listdir('static/upload')
@@ -53,24 +226,70 @@ def alpha_miner():
         path = os.path.join('static/upload', secure_filename(f.filename))
         f.save(path)
         result_msg = 'The selected file [' + f.filename + '] is uploaded successfully.' 
-        # import the xes file and use alpha to generate a petri net
-        log = import_xes.importer().read_xes(path)
-        alpha.footprint_matrix(log)
-        alpha.draw_petri_net(log)
-        petri_net = 'static/output/petri_net.gv.png'   
-        footprint = 'static/output/footprint_matrix.png'
-        return render_template('AlphaMiner.html', form = form, msg = result_msg, image_petri=petri_net, image_footprint=footprint)
+        # import the xes/csv file and use alpha to generate a petri net
+        log = parse_upload(path)
+        return render_template('AlphaMiner.html', form = form, msg = result_msg, **alpha_outputs(log, form.output_format.data))
 
     return render_template('AlphaMiner.html', form = form, msg = result_msg, image = image)
 
+def draw_cnet_and_bindings(log, fmt, directory):
+    """draw the causal net into directory, return its graph output and the input and output bindings as strings"""
+    cnet_done = submit(render_pool, render, 'cnet.render', hm.cnet_graph(log), directory, fmt)
+    in_bind = str(dict(sorted(hm.input_binding(log).items()))).replace('\'', '')
+    out_bind = str(dict(sorted(hm.output_binding(log).items()))).replace('\'', '')
+    return graph_output(cnet_done.result(), fmt), (in_bind, out_bind)
+
+def heuristic_outputs(log, fmt, threshold_df, threshold_dm, expand=(), statistic='', threshold_l2l=None, threshold_ld=None):
+    """check the cost of the log, abstract it to the node budget and mine it.
+    Return the reason of a restricted result ('' if there is none) and the keyword arguments for HeuristicMiner.html
+    statistic: waiting time statistic shown on the dependency graph, the log needs timestamps (see read_log)
+    threshold_l2l, threshold_ld: thresholds of the length-two loop and long-distance measures, None turns them off
+    """
+    # estimate the cost of the uploaded log before running anything expensive, the limits apply to the upload and not to
+    # its abstraction, which never has more than NODE_BUDGET activities
+    decision, reason = admission.decide(admission.estimate(log), app.config['HEURISTIC_LIMITS'])
+    if decision == 'reject':
+        return reason, dict(image = '')
+    # edges between collapsed regions have no waiting times, they are drawn without
+    waiting = performance.waiting_times(log) if statistic else None
+    log, regions = abstraction.abstract(log, app.config['NODE_BUDGET'], expand)
+    with output_directory() as directory:
+        # the dependency graph is rendered while the causal net and the matrices are mined
+        dg = hm.dependency_graph(log, threshold_df, threshold_dm, fmt, waiting, statistic or 'median', threshold_l2l, threshold_ld)
+        dg_done = submit(render_pool, render, 'dependency_graph.render', dg, directory, fmt)
+        if decision == 'serialise':
+            cnet_done = submit(cnet_serialiser, draw_cnet_and_bindings, log, fmt, directory)
+        if threshold_l2l is None and threshold_ld is None:
+            matrix = matrix_html('dependency', matrix_output.dependency(log))
+        else:
+            # the three measures come from one scan of the log
+            matrix = ''.join(matrix_html(kind, m) for kind, m in matrix_output.heuristic(log).items())
+        dg = graph_output(dg_done.result(), fmt)
+        drill_down = dict(regions=regions, expand=list(expand), fmt=fmt, threshold_df=threshold_df, threshold_dm=threshold_dm,
+                          threshold_l2l=threshold_l2l, threshold_ld=threshold_ld)
+        if decision == 'degrade':
+            return reason, dict(images = (dg, matrix, ''), bindings = ('', ''), **drill_down)
+        cnet, bindings = cnet_done.result() if decision == 'serialise' else draw_cnet_and_bindings(log, fmt, directory)
+    return '', dict(images = (dg, matrix, cnet), bindings = bindings, **drill_down)
+
 @app.route("/heuristic_miner", methods = ['POST', 'GET'])
+@profile_request
 def heuristic_miner():
     form = uploadFile_heuristic()
     image = ''
     if request.method == 'GET':
-        return render_template('HeuristicMiner.html', form = form, image = image)
+        expand = request.args.getlist('expand')
+        file, tree = uploaded_variant_tree() if expand else (None, None)
+        if tree is None:
+            return render_template('HeuristicMiner.html', form = form, image = image)
+        # drill-down into collapsed regions of the last uploaded log
+        result_msg = 'The file [' + file + '] is shown with ' + ', '.join(expand) + ' expanded.'
+        reason, outputs = heuristic_outputs(tree, request.args.get('output_format', 'png'), request.args.get('threshold_df', 0, type=int),
+                                            request.args.get('threshold_dm', 0.0, type=float), expand,
+                                            threshold_l2l=request.args.get('threshold_l2l', type=float), threshold_ld=request.args.get('threshold_ld', type=float))
+        return render_template('HeuristicMiner.html', form = form, msg = result_msg + (' But ' + reason + '.' if reason else ''), **outputs)
         
-    result_msg = 'File upload failed. Only xes files is accepted.'
+    result_msg = 'File upload failed. Only xes or csv files are accepted.'
     if request.method == 'POST' and form.validate_on_submit():
         # clear the old uploaded files before saving the new one
         files = os.listdir('static/upload')
@@ -82,21 +301,209 @@ def heuristic_miner():
         path = os.path.join('static/upload', secure_filename(file.filename))
         file.save(path)
         result_msg = 'The selected file [' + file.filename + '] is uploaded successfully.' 
-        # import the xes file and use hm to generate a petri net
-        log = import_xes.importer().read_xes(path)
-        hm.dm_matrix(log)
-        hm.draw_denpendencyGraph(log, form.threshold_df.data, form.threshold_dm.data)
-        hm.draw_cnet(log)
-        in_bind = str(dict(sorted(hm.input_binding(log).items()))).replace('\'', '')
-        out_bind = str(dict(sorted(hm.output_binding(log).items()))).replace('\'', '')
-        bindings = (in_bind, out_bind)
-        dg = 'static/output/dependency_graph.gv.png'
-        matrix = 'static/output/dm_matrix.png'
-        cnet = 'static/output/cnet.gv.png'
-        images = (dg, matrix, cnet)
-        images = (dg, matrix, cnet)
-        return render_template('HeuristicMiner.html', form = form, msg = result_msg, images = images, bindings = bindings)
+        # import the xes/csv file and use hm to generate a petri net
+        statistic = form.waiting_times.data
+        log = parse_upload(path, timestamps=bool(statistic))
+        reason, outputs = heuristic_outputs(log, form.output_format.data, form.threshold_df.data, float(form.threshold_dm.data), statistic=statistic,
+                                            threshold_l2l=None if form.threshold_l2l.data is None else float(form.threshold_l2l.data),
+                                            threshold_ld=None if form.threshold_ld.data is None else float(form.threshold_ld.data))
+        return render_template('HeuristicMiner.html', form = form, msg = result_msg + (' But ' + reason + '.' if reason else ''), **outputs)
     return render_template('HeuristicMiner.html', form = form, msg = result_msg, image = image)
     
+batch_formats = [('', 'Models only'), ('png', 'PNG image'), ('svg', 'SVG image'), ('dot', 'Graphviz dot')]
+
+class batchFiles(FlaskForm):
+    file = FileField('Zip archive', validators=[FileRequired(), FileAllowed(['zip']), FileSize(app.config['MAX_CONTENT_LENGTH'])])
+    algorithm = SelectField('Algorithm', choices=[('alpha', 'Alpha miner'), ('heuristic', 'Heuristic miner')], default='alpha')
+    threshold_df = IntegerField('Threshold for direct follows', default=0, validators=[InputRequired(), NumberRange(min=0)])
+    threshold_dm = DecimalField('Threshold for dependency measure', default=0, validators =[InputRequired(), NumberRange(0, 1, 0.01)])
+    output_format = SelectField('Images', choices=batch_formats, default='')
+    submit = SubmitField('Mine all')
+
+def compare_uploads(first, second, mode):
+    """parse two uploaded files in a temporary directory, the last upload of the miners is kept, and compare their footprints"""
+    logs = []
+    with tempfile.TemporaryDirectory() as directory:
+        for f in (first, second):
+            path = os.path.join(directory, str(len(logs)) + '_' + secure_filename(f.filename))
+            f.save(path)
+            logs.append(read_log(path))
+    if mode == 'model':
+        return footprint.compare_log_alpha(logs[0], logs[1])
+    return footprint.compare_logs(logs[0], logs[1])
+
+@app.route("/compare", methods = ['POST', 'GET'])
+def compare():
+    form = compareFiles()
+    if request.method == 'GET':
+        return render_template('Compare.html', form = form, result = None)
+    result_msg = 'File upload failed. Only xes or csv files are accepted.'
+    if form.validate_on_submit():
+        result = compare_uploads(form.file.data, form.other.data, form.mode.data)
+        result_msg = 'Compared ' + dict(compare_modes)[form.mode.data] + ': [' + form.file.data.filename + '] and [' + form.other.data.filename + '].'
+        return render_template('Compare.html', form = form, msg = result_msg, result = result)
+    return render_template('Compare.html', form = form, msg = result_msg, result = None)
+
+@app.route("/compare/data", methods = ['POST'])
+def compare_data():
+    """the same comparison as json, e.g. curl -F file=@week1.xes -F other=@week2.xes -F mode=log .../compare/data"""
+    files = [request.files.get('file'), request.files.get('other')]
+    if any(f is None or not f.filename.lower().endswith(('.xes', '.csv')) for f in files):
+        return jsonify(error='two xes or csv files are required: file and other'), 400
+    mode = request.form.get('mode', 'log')
+    if mode not in dict(compare_modes):
+        return jsonify(error='unknown mode: ' + mode), 400
+    return jsonify(compare_uploads(files[0], files[1], mode))
+
+def mine_archive(upload, algorithm, threshold_df, threshold_dm, fmt):
+    """mine every log of an uploaded zip archive and return the result bundle as a zip file in memory.
+    Raise a ValueError if the archive exceeds the limits of app.config
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'logs.zip')
+        upload.save(source)
+        output = os.path.join(directory, 'results.zip')
+        batch.run(source, output, algorithm, threshold_df, threshold_dm, fmt or None, app.config['BATCH_PROCESSES'],
+                  app.config['BATCH_MAX_MEMBERS'], app.config['BATCH_MAX_SIZE'])
+        with open(output, 'rb') as f:
+            return io.BytesIO(f.read())
+
+@app.route("/batch", methods = ['POST', 'GET'])
+def batch_mining():
+    form = batchFiles()
+    if request.method == 'GET':
+        return render_template('Batch.html', form = form)
+    result_msg = 'Upload failed. Only zip archives of xes or csv files are accepted.'
+    if form.validate_on_submit():
+        try:
+            bundle = mine_archive(form.file.data, form.algorithm.data, form.threshold_df.data, float(form.threshold_dm.data), form.output_format.data)
+        except zipfile.BadZipFile:
+            return render_template('Batch.html', form = form, msg = 'The upload is not a valid zip archive.'), 400
+        except ValueError as e:  # too many members or too large when unpacked
+            return render_template('Batch.html', form = form, msg = 'The archive is refused: ' + str(e) + '.'), 400
+        name = os.path.splitext(secure_filename(form.file.data.filename))[0] or 'logs'
+        return send_file(bundle, mimetype='application/zip', as_attachment=True, download_name=name + '-' + form.algorithm.data + '.zip')
+    return render_template('Batch.html', form = form, msg = result_msg)
+
+@app.route("/batch/data", methods = ['POST'])
+def batch_data():
+    """the same bundle without the form, e.g. curl -F file=@logs.zip -F algorithm=heuristic -F threshold_df=2 -o results.zip .../batch/data"""
+    upload = request.files.get('file')
+    if upload is None or not upload.filename.lower().endswith('.zip'):
+        return jsonify(error='a zip archive of xes or csv files is required: file'), 400
+    algorithm = request.form.get('algorithm', 'alpha')
+    fmt = request.form.get('output_format', '')
+    if algorithm not in batch.ALGORITHMS or fmt not in dict(batch_formats):
+        return jsonify(error='unknown algorithm or output format'), 400
+    try:
+        threshold_df = int(request.form.get('threshold_df', 0))
+        threshold_dm = float(request.form.get('threshold_dm', 0))
+    except ValueError:
+        return jsonify(error='threshold_df must be an integer and threshold_dm a number'), 400
+    try:
+        bundle = mine_archive(upload, algorithm, threshold_df, threshold_dm, fmt)
+    except zipfile.BadZipFile:
+        return jsonify(error='the upload is not a valid zip archive'), 400
+    except ValueError as e:  # too many members or too large when unpacked
+        return jsonify(error=str(e)), 400
+    return send_file(bundle, mimetype='application/zip', as_attachment=True, download_name='results.zip')
+
+@app.route("/variant_explorer")
+def variant_explorer():
+    prefix = request.args.getlist('prefix')
+    file, tree = uploaded_variant_tree()
+    if tree is None:
+        return render_template('VariantExplorer.html', file=None, msg='Please upload a log on the Alpha or Heuristic Miner page first.')
+    continuations = sorted(tree.continuations(prefix).items(), key=lambda x: (-x[1], x[0]))
+    return render_template('VariantExplorer.html', file=file, prefix=prefix, total=len(tree), count=tree.count_prefix(prefix),
+                           ends=tree.count_ends(prefix), continuations=continuations)
+
+@app.route("/variant_explorer/data")
+def variant_explorer_data():
+    """the same prefix query as json, e.g. /variant_explorer/data?prefix=a&prefix=b"""
+    prefix = request.args.getlist('prefix')
+    file, tree = uploaded_variant_tree()
+    if tree is None:
+        return jsonify(error='no uploaded log'), 404
+    return jsonify(file=file, prefix=prefix, cases=len(tree), count=tree.count_prefix(prefix),
+                   ends=tree.count_ends(prefix), continuations=tree.continuations(prefix))
+
+@app.route("/matrix/<kind>")
+def matrix_data(kind):
+    """one page of the matrix of the last upload, e.g. /matrix/dependency?row_page=1&col_page=0,
+    json by default or a html table with format=html, or the whole matrix as sparse json with format=coo"""
+    if kind not in matrix_captions:
+        return jsonify(error='unknown matrix: ' + kind), 404
+    file, tree = uploaded_variant_tree()
+    if tree is None:
+        return jsonify(error='no uploaded log'), 404
+    # the variant tree offers the counting methods alpha and hm use, so the log is not parsed again
+    if kind == 'footprint':
+        m = matrix_output.footprint(tree)
+    elif kind == 'dependency':
+        m = matrix_output.dependency(tree)
+    else:
+        m = matrix_output.heuristic(tree)[kind]
+    if request.args.get('format') == 'coo':
+        return jsonify(file=file, **matrix_output.coo(m))
+    row_page = request.args.get('row_page', 0, type=int)
+    col_page = request.args.get('col_page', 0, type=int)
+    if request.args.get('format') == 'html':
+        return matrix_html(kind, m, row_page, col_page)
+    return jsonify(file=file, **matrix_output.to_json(matrix_output.page(m, row_page, col_page)))
+
+@app.route("/artifacts/<name>")
+def artifact(name):
+    """a published png output, its name changes with its content, so it never changes under the same url"""
+    response = send_from_directory(os.path.abspath(app.config['ARTIFACT_FOLDER']), name, max_age=http_cache.MAX_AGE,
+                                   etag=http_cache.etag_of(name))
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.after_request
+def cache_and_compress(response):
+    """validate the generated GET responses by an ETag of their body and compress the text responses.
+    Files (static files, artifacts, downloads) are streamed with their own validators and passed through.
+    """
+    if response.direct_passthrough or response.status_code != 200:
+        return response
+    response.vary.add('Accept-Encoding')
+    if request.method == 'GET' and response.get_etag()[0] is None:
+        response.add_etag()
+        # the pages change with every upload, the browser may keep them but has to ask first
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+    body, encoding = http_cache.compress(response.get_data(), response.mimetype, request.headers.get('Accept-Encoding', ''))
+    if encoding is not None:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        # the ETag belongs to the uncompressed body, If-None-Match compares weakly so a weak ETag still validates
+        etag = response.get_etag()[0]
+        if etag is not None:
+            response.set_etag(etag, weak=True)
+    return response
+
+@app.route("/metrics")
+def metrics_text():
+    """stage durations and log sizes of this process in the Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route("/admin/profiles")
+def profiles():
+    """the profiles written by profiled requests, newest first"""
+    if not app.config['PROFILE_PAGES']:
+        abort(404)
+    return render_template('Profiles.html', reports=profiling.list_profiles(app.config['PROFILE_FOLDER']), mode=app.config['PROFILING'])
+
+@app.route("/admin/profiles/<name>")
+def profile_file(name):
+    """one collapsed-stack (.folded) or report (.json) file of the profile directory"""
+    if not app.config['PROFILE_PAGES']:
+        abort(404)
+    return send_from_directory(os.path.abspath(app.config['PROFILE_FOLDER']), name, mimetype='text/plain' if name.endswith('.folded') else None)
+
 if __name__ == '__main__':
     app.run(host='::1', port=9009)
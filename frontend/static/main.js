@@ -67,4 +67,21 @@ window.addEventListener("scroll", () => {
   } else {
     toTop.classList.remove("active");
   }
-})
\ No newline at end of file
+})
+/**
+ * Lay out and draw graphs that the server delivered as dot source.
+ * The graphviz wasm build is only loaded on pages that contain such a graph.
+ */
+const dotGraphs = document.querySelectorAll(".graph-dot");
+if (dotGraphs.length > 0) {
+  const viz = document.createElement("script");
+  viz.src = "https://cdn.jsdelivr.net/npm/@viz-js/viz@3.2.4/lib/viz-standalone.js";
+  viz.onload = () => {
+    Viz.instance().then(instance => {
+      dotGraphs.forEach(graph => {
+        graph.appendChild(instance.renderSVGElement(graph.dataset.dot));
+      })
+    })
+  };
+  document.head.appendChild(viz);
+}